@@ -1 +1 @@
-from .main import ActionDocs
+from .main import ActionDocs, generate_document
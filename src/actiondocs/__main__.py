@@ -2,13 +2,39 @@ import json
 import logging
 import os
 import sys
+from typing import TYPE_CHECKING, List, Optional
 
+from .cache import ConfigCache, DescriptionCache
+from .git import DEFAULT_COMMIT_MESSAGE, Git, GitError
 from .main import ActionDocs
-from .gha import GHAFormatter
+from .metrics import Metrics
+from .remote import DEFAULT_BASE_URL, RemoteActions
+from .utils import MarkdownConverter, ParallelConverter
+from .gha import (
+    GHAFormatter,
+    GHAHandler,
+    append_step_summary,
+    is_debug,
+    set_output,
+)
+
+if TYPE_CHECKING:
+    import argparse
 
 # An entrypoint to generate action documentation Markdown
 # using environment variables as arguments
 # Usage: python -m actiondocs
+#
+# Or, to render again on every change of the action or template file:
+# Usage: python -m actiondocs --watch
+#
+# Or, to document many actions in one process:
+# Usage: python -m actiondocs --manifest <manifest.yml>
+#        python -m actiondocs --glob '<pattern>/action.yml'
+#
+# Or, to render from in-memory text for other processes (see server):
+# Usage: python -m actiondocs --serve
+#        python -m actiondocs --serve-socket <path>
 
 REQUIRED_ENV_VARS = [
     "ACTION_YAML_FILE",
@@ -21,12 +47,39 @@ REQUIRED_ENV_VARS = [
     "MARKER_END",
 ]
 
+# Optional environment variables (and their default value)
+OPTIONAL_ENV_VARS = {
+    "CACHE_DIR": "",
+    "INCREMENTAL": "false",
+    "METRICS": "false",
+    "METRICS_FILE": "",
+    "RENDER_WORKERS": "",
+    "FINGERPRINT": "false",
+    "CHECK": "false",
+    "STREAMING": "false",
+    "SHARED": "false",
+    "LAYOUT_FILE": "",
+    "JSON_FILE": "",
+    "HTML_FILE": "",
+    "GIT_PUSH": "false",
+    "GIT_PUSH_USER_NAME": "",
+    "GIT_PUSH_USER_EMAIL": "",
+    "GIT_COMMIT_MESSAGE": DEFAULT_COMMIT_MESSAGE,
+    "GIT_COMMIT_SIGNOFF": "false",
+    "REMOTE_BASE_URL": DEFAULT_BASE_URL,
+}
+
 # Logger w/ GHAFormatter for GitHub Actions
+# Debug logging when enabled for the workflow run (or the DEBUG env. var.,
+# in which case debug records are plain lines, to be shown regardless)
 logger = logging.getLogger("root")
-logger.setLevel(logging.DEBUG)
+plain_debug = os.environ.get("DEBUG", "").lower() == "true"
+logger.setLevel(logging.DEBUG if is_debug() or plain_debug else logging.INFO)
 
-handler = logging.StreamHandler()
-formatter = GHAFormatter(fmt="%(name)s - %(levelname)s - %(message)s")
+handler = GHAHandler()
+formatter = GHAFormatter(
+    fmt="%(name)s - %(levelname)s - %(message)s", plain_debug=plain_debug
+)
 handler.setFormatter(formatter)
 logger.addHandler(handler)
 
@@ -36,7 +89,8 @@ def _load_env_vars():
 
     Loads and validates variables from environment.
     If one or more is missing, error out with the list of missing
-    variables and exit 1
+    variables and exit 1. Optional variables are set to their default
+    value when missing (or empty).
     """
     env_vars = dict.fromkeys(REQUIRED_ENV_VARS)
     for var in REQUIRED_ENV_VARS:
@@ -47,8 +101,12 @@ def _load_env_vars():
             logging.error(f"Can't read env. var.: '{var}'")
             pass
 
+    for var, default in OPTIONAL_ENV_VARS.items():
+        env_vars[var] = os.environ.get(var) or default
+        logging.info(f"Read env. var.: '{var}' = '{env_vars[var]}'")
+
     if None in env_vars.values():
-        missing_env_vars = [k for k, v in env_vars.items() if not v]
+        missing_env_vars = [k for k in REQUIRED_ENV_VARS if env_vars[k] is None]
         missing_env_vars_len = len(missing_env_vars)
         missing_env_vars_str = ", ".join(map(str, missing_env_vars))
         logging.error(
@@ -61,8 +119,343 @@ def _load_env_vars():
         return env_vars
 
 
-def main():
+def _parse_args(argv=None) -> "argparse.Namespace":
+    """Parses command-line arguments (for batch mode)"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m actiondocs",
+        description="A GitHub Actions Markdown docs generator. "
+        "Without arguments, a single action is documented "
+        "using environment variables.",
+    )
+    batch = parser.add_mutually_exclusive_group()
+    batch.add_argument(
+        "--manifest",
+        help="YAML manifest of (action file, template, target) jobs",
+    )
+    batch.add_argument(
+        "--glob",
+        help="glob of action files, each documented in the template "
+        "next to it (e.g. 'actions/**/action.yml')",
+    )
+    batch.add_argument(
+        "--serve",
+        action="store_true",
+        help="serve JSON-RPC requests (one per line) on stdin/stdout, "
+        "rendering documents from in-memory text (until stdin is closed)",
+    )
+    batch.add_argument(
+        "--serve-socket",
+        metavar="PATH",
+        help="like --serve, on a Unix socket (until interrupted)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="only check if the documentation is up-to-date, "
+        "without writing anything (exits 1 when stale)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="without --manifest or --glob, render again whenever the "
+        "action or template file changes (until interrupted)",
+    )
+    parser.add_argument(
+        "--changed-files",
+        metavar="FILE",
+        help="with --manifest or --glob, only document the actions affected "
+        "by the files listed in FILE, one per line ('-' for stdin), "
+        "e.g. from 'git diff --name-only'",
+    )
+    parser.add_argument(
+        "--index",
+        metavar="FILE",
+        help="with --changed-files, the index of the files each target file "
+        "is generated from, kept between runs (built when missing)",
+    )
+    parser.add_argument(
+        "--template-name",
+        default="README.md",
+        help="with --glob, the template file name (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--target-name",
+        help="with --glob, the target file name (default: the template)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="directory of the rendered descriptions and parsed action files "
+        "cache, shared by all jobs (or requests, when serving)",
+    )
+    parser.add_argument(
+        "--remote-base-url",
+        default=DEFAULT_BASE_URL,
+        help="with --manifest or --glob, where the action files of remote "
+        "actions are fetched from (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="with --glob, only render the rows of the tables that changed",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="with --glob, stream the inputs and outputs from the action "
+        "files to the target files (for very large actions)",
+    )
+    parser.add_argument(
+        "--layout",
+        metavar="FILE",
+        help="with --glob, the YAML file of the layout of the tables "
+        "(loaded and compiled once for all jobs)",
+    )
+    parser.add_argument(
+        "--shared",
+        action="store_true",
+        help="with --glob, only replace the blocks of each job's action file "
+        "in its target file, under a lock (for target files shared by jobs)",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="with --glob, leave documentation as-is (without generating it) "
+        "when what it's generated from is unchanged",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="with --manifest or --glob, append a summary of timings and "
+        "counters to the GitHub Actions job summary",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="with --manifest or --glob, the JSON file to write timings "
+        "and counters to",
+    )
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        help="with --manifest, --glob or --serve, the number of processes "
+        "converting descriptions in parallel (for large actions)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="with --manifest or --glob, the number of concurrent jobs",
+    )
+    parser.add_argument(
+        "--git-push",
+        action="store_true",
+        help="with --manifest or --glob, commit the changed target files "
+        "together (in a single commit) and push it",
+    )
+    parser.add_argument(
+        "--git-user-name",
+        help="with --git-push, the git user name to commit with "
+        "(default: the configured one)",
+    )
+    parser.add_argument(
+        "--git-user-email",
+        help="with --git-push, the git user email to commit with "
+        "(default: the configured one)",
+    )
+    parser.add_argument(
+        "--git-commit-message",
+        default=DEFAULT_COMMIT_MESSAGE,
+        help="with --git-push, the git commit message (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--git-commit-signoff",
+        action="store_true",
+        help="with --git-push, sign-off the git commit",
+    )
+    return parser.parse_args(argv)
+
+
+def _report_metrics(
+    metrics: Metrics,
+    cache: DescriptionCache,
+    summary: bool,
+    metrics_file: Optional[str],
+):
+    """Writes the metrics of a run (and of its cache)"""
+    metrics.count("cache_hits", cache.hits)
+    metrics.count("cache_misses", cache.misses)
+
+    if summary:
+        append_step_summary(metrics.to_markdown())
+    if metrics_file:
+        metrics.write_json(metrics_file)
+
+
+def _check(action_doc: ActionDocs, target_file: str):
+    """Checks if the documentation is up-to-date (exits 1 if not)"""
+    if action_doc.is_up_to_date(target_file):
+        logging.info(f"Up-to-date: '{target_file}'")
+        set_output("changed", json.dumps(False))
+        return
+
+    logging.error(f"Stale: '{target_file}' (run without checking to update it)")
+    set_output("changed", json.dumps(True))
+    sys.exit(1)
+
+
+def _git_push(
+    target_files: List[str],
+    user_name: Optional[str],
+    user_email: Optional[str],
+    message: str,
+    signoff: bool,
+):
+    """Commits the changed target files and pushes them (exits 1 on failure)
+
+    git isn't run at all when no target file changed.
+    """
+    git = Git(user_name=user_name or None, user_email=user_email or None)
+    try:
+        git.commit_changes(target_files, message=message, signoff=signoff)
+    except GitError as e:
+        logging.error(f"Git: {str(e)}")
+        sys.exit(1)
+
+
+def _converter(render_workers: Optional[int]) -> Optional[MarkdownConverter]:
+    """The converter for descriptions, parallel if <render_workers> is set"""
+    if not render_workers:
+        return None
+    return ParallelConverter(workers=render_workers)
+
+
+def _remote(cache_dir: Optional[str], base_url: str) -> RemoteActions:
+    """The fetcher of remote actions (with the GITHUB_TOKEN env. var., if any)"""
+    return RemoteActions(
+        cache_dir=cache_dir,
+        base_url=base_url,
+        token=os.environ.get("GITHUB_TOKEN") or None,
+    )
+
+
+def _main_serve(args: "argparse.Namespace"):
+    """Serves rendering requests (see RenderServer)"""
+    from .server import DESCRIPTIONS_SIZE, RenderServer
+
+    cache = DescriptionCache(cache_dir=args.cache_dir, memo_size=DESCRIPTIONS_SIZE)
+    converter = _converter(args.render_workers)
+    server = RenderServer(cache=cache, converter=converter)
+    try:
+        if args.serve_socket:
+            server.serve_unix(args.serve_socket)
+        else:
+            logging.info("Serving on stdin/stdout")
+            server.serve(sys.stdin, sys.stdout)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if converter is not None:
+            converter.close()
+        cache.prune()
+
+
+def _affected_jobs(jobs, changed_files: str, index_file: Optional[str]):
+    """The jobs affected by the changed files (see DependencyIndex)"""
+    from .index import DependencyIndex
+
+    if changed_files == "-":
+        changed = sys.stdin.read().splitlines()
+    else:
+        with open(changed_files, "r") as f:
+            changed = f.read().splitlines()
+    changed = [path.strip() for path in changed if path.strip()]
+
+    index = DependencyIndex(index_file)
+    affected = index.affected(jobs, changed)
+    index.save()
+    return affected
+
+
+def _main_batch(args: "argparse.Namespace"):
+    """Documents many actions in one process"""
+    from .batch import jobs_from_glob, load_manifest, run_batch
+
+    if args.manifest:
+        jobs = load_manifest(args.manifest)
+    else:
+        jobs = jobs_from_glob(
+            args.glob,
+            template_name=args.template_name,
+            target_name=args.target_name,
+            **({"incremental": True} if args.incremental else {}),
+            **({"fingerprint": True} if args.fingerprint else {}),
+            **({"streaming": True} if args.streaming else {}),
+            **({"shared": True} if args.shared else {}),
+            **({"layout": args.layout} if args.layout else {}),
+        )
+
+    if args.changed_files:
+        jobs = _affected_jobs(jobs, args.changed_files, args.index)
+
+    cache = DescriptionCache(cache_dir=args.cache_dir)
+    config_cache = ConfigCache(args.cache_dir) if args.cache_dir else None
+    metrics = Metrics() if args.metrics or args.metrics_file else None
+    converter = _converter(args.render_workers)
+    remote = _remote(args.cache_dir, args.remote_base_url)
+    try:
+        results = run_batch(
+            jobs,
+            workers=args.workers,
+            cache=cache,
+            config_cache=config_cache,
+            metrics=metrics,
+            converter=converter,
+            remote=remote,
+            check=args.check,
+        )
+    finally:
+        if converter is not None:
+            converter.close()
+        remote.close()
+    cache.prune()
+
+    if metrics is not None:
+        _report_metrics(metrics, cache, args.metrics, args.metrics_file)
+
+    changed = any(r.ok and r.changed for r in results)
+    set_output("changed", json.dumps(changed))
+
+    if not all(r.ok for r in results) or (args.check and changed):
+        sys.exit(1)
+
+    if args.git_push and not args.check:
+        # Targets can be shared by jobs (e.g. named blocks)
+        target_files = [r.job.target_file for r in results if r.changed]
+        _git_push(
+            list(dict.fromkeys(target_files)),
+            user_name=args.git_user_name,
+            user_email=args.git_user_email,
+            message=args.git_commit_message,
+            signoff=args.git_commit_signoff,
+        )
+
+
+def main(argv=None):
+    # (without arguments, i.e. in the action, argparse isn't even imported)
+    argv = sys.argv[1:] if argv is None else argv
+    args = _parse_args(argv) if argv else None
+    if args is not None and (args.serve or args.serve_socket):
+        return _main_serve(args)
+    if args is not None and (args.manifest or args.glob):
+        return _main_batch(args)
+
     config = _load_env_vars()
+    cache = DescriptionCache(cache_dir=config["CACHE_DIR"] or None)
+    config_cache = ConfigCache(config["CACHE_DIR"]) if config["CACHE_DIR"] else None
+    summary = json.loads(config["METRICS"].lower())
+    metrics = Metrics() if summary or config["METRICS_FILE"] else None
+    converter = _converter(int(config["RENDER_WORKERS"] or 0))
+    remote = _remote(config["CACHE_DIR"] or None, config["REMOTE_BASE_URL"])
 
     # Use json to load boolean strings into boolean types
     action_doc = ActionDocs(
@@ -73,8 +466,56 @@ def main():
         template_file=config["TEMPLATE_FILE"],
         marker_start=config["MARKER_START"],
         marker_end=config["MARKER_END"],
+        cache=cache,
+        config_cache=config_cache,
+        incremental=json.loads(config["INCREMENTAL"].lower()),
+        metrics=metrics,
+        converter=converter,
+        fingerprint=json.loads(config["FINGERPRINT"].lower()),
+        streaming=json.loads(config["STREAMING"].lower()),
+        shared=json.loads(config["SHARED"].lower()),
+        layout=config["LAYOUT_FILE"] or None,
+        remote=remote,
     )
-    action_doc.save(config["TARGET_FILE"])
+    if (args is not None and args.check) or json.loads(config["CHECK"].lower()):
+        return _check(action_doc, config["TARGET_FILE"])
+
+    if args is not None and args.watch:
+        from .watch import Watcher
+
+        Watcher(action_doc, config["TARGET_FILE"]).run()
+        cache.prune()
+        return
+
+    # The target file, and the action in other formats (from the same parse)
+    changed_files = []
+    try:
+        if action_doc.save(config["TARGET_FILE"]):
+            changed_files.append(config["TARGET_FILE"])
+        for fmt, var in [("json", "JSON_FILE"), ("html", "HTML_FILE")]:
+            if config[var] and action_doc.export(config[var], fmt):
+                changed_files.append(config[var])
+    finally:
+        if converter is not None:
+            converter.close()
+        remote.close()
+    cache.prune()
+    changed = len(changed_files) > 0
+
+    if metrics is not None:
+        _report_metrics(metrics, cache, summary, config["METRICS_FILE"])
+
+    # Step output (e.g. to skip steps when no file changed)
+    set_output("changed", json.dumps(changed))
+
+    if json.loads(config["GIT_PUSH"].lower()):
+        _git_push(
+            changed_files,
+            user_name=config["GIT_PUSH_USER_NAME"],
+            user_email=config["GIT_PUSH_USER_EMAIL"],
+            message=config["GIT_COMMIT_MESSAGE"],
+            signoff=json.loads(config["GIT_COMMIT_SIGNOFF"].lower()),
+        )
 
 
 if __name__ == "__main__":
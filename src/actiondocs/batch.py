@@ -0,0 +1,290 @@
+import glob
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from .cache import ConfigCache, DescriptionCache
+from .main import ActionDocs
+from .metrics import Metrics
+from .remote import RemoteActions
+from .utils import MarkdownConverter
+
+# Logger
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+# Options of a job that are passed as-is to ActionDocs
+JOB_OPTIONS = [
+    "include_inputs",
+    "include_outputs",
+    "heading_size",
+    "marker_start",
+    "marker_end",
+    "incremental",
+    "fingerprint",
+    "streaming",
+    "shared",
+    "layout",
+]
+
+
+class BatchJob:
+    """An ActionDocs job (i.e. one action file, template and target)"""
+
+    def __init__(
+        self,
+        action_file: str,
+        template_file: str,
+        target_file: str,
+        **options,
+    ) -> None:
+        illegal_options = [o for o in options.keys() if o not in JOB_OPTIONS]
+        if illegal_options:
+            raise ValueError(illegal_options)
+
+        self.action_file = action_file
+        self.template_file = template_file
+        self.target_file = target_file
+        self.options = options
+
+    def __repr__(self) -> str:
+        return f"BatchJob({self.action_file!r} -> {self.target_file!r})"
+
+    def run(
+        self,
+        cache: Optional[DescriptionCache] = None,
+        config_cache: Optional[ConfigCache] = None,
+        metrics: Optional[Metrics] = None,
+        converter: Optional[MarkdownConverter] = None,
+        remote: Optional[RemoteActions] = None,
+        check: bool = False,
+    ) -> bool:
+        """Generates and saves the documentation of this job
+
+        Args:
+            cache: the cache of rendered descriptions
+            config_cache: the cache of parsed action configurations
+            metrics: the metrics to record timings and counters to
+            converter: the Markdown converter for descriptions
+            remote: the fetcher of remote actions
+            check: if the target file should only be checked
+                (see ActionDocs.is_up_to_date())
+
+        Returns:
+            If the target file changed (or, if checking, is stale)
+        """
+        action_doc = ActionDocs(
+            action_file=self.action_file,
+            template_file=self.template_file,
+            cache=cache,
+            config_cache=config_cache,
+            metrics=metrics,
+            converter=converter,
+            remote=remote,
+            **self.options,
+        )
+        if check:
+            return not action_doc.is_up_to_date(self.target_file)
+        return action_doc.save(self.target_file)
+
+
+class BatchResult:
+    """The outcome of a BatchJob"""
+
+    def __init__(
+        self,
+        job: BatchJob,
+        changed: bool = False,
+        error: Optional[Exception] = None,
+        elapsed: float = 0.0,
+    ) -> None:
+        self.job = job
+        self.changed = changed
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        if self.ok:
+            status = "changed" if self.changed else "unchanged"
+        else:
+            status = f"failed ({self.error})"
+        return f"{self.job!r}: {status} in {self.elapsed:.3f}s"
+
+
+def load_manifest(filename: str) -> List[BatchJob]:
+    """Loads batch jobs from a YAML manifest
+
+    The manifest is of the following structure, where 'defaults' are
+    options applied to every job (unless overridden by the job itself)
+    and 'target_file' defaults to the job's 'template_file':
+
+        defaults:
+          heading_size: 2
+        jobs:
+          - action_file: actions/foo/action.yml
+            template_file: actions/foo/README.md
+          - action_file: actions/bar/action.yml
+            template_file: actions/bar/README.tpl.md
+            target_file: actions/bar/README.md
+            include_outputs: false
+
+    Args:
+        filename: the YAML manifest to read
+
+    Returns:
+        The list of jobs of the manifest
+    """
+    import yaml
+
+    try:
+        with open(filename, "r") as f:
+            manifest = yaml.safe_load(f) or {}
+    except OSError as e:
+        log.error(f"Error loading manifest '{filename}': {str(e)}")
+        raise
+
+    defaults = manifest.get("defaults", {})
+
+    jobs = []
+    for job in manifest.get("jobs", []):
+        job = {**defaults, **job}
+        job.setdefault("target_file", job.get("template_file"))
+        jobs.append(BatchJob(**job))
+
+    return jobs
+
+
+def jobs_from_glob(
+    pattern: str,
+    template_name: str = "README.md",
+    target_name: Optional[str] = None,
+    **options,
+) -> List[BatchJob]:
+    """Creates batch jobs from a glob of action files
+
+    Each action file matching the glob is documented in a template file
+    named <template_name> in the action file's directory.
+
+    Args:
+        pattern: the glob pattern matching action files (supports '**')
+        template_name: the name of the template file, next to each action file
+        target_name: the name of the target file, next to each action file
+            (defaults to <template_name>, i.e. updated in-place)
+        options: ActionDocs options applied to every job
+
+    Returns:
+        The list of jobs, sorted by action file
+    """
+    target_name = target_name or template_name
+
+    jobs = []
+    for action_file in sorted(glob.glob(pattern, recursive=True)):
+        action_dir = os.path.dirname(action_file)
+        jobs.append(
+            BatchJob(
+                action_file=action_file,
+                template_file=os.path.join(action_dir, template_name),
+                target_file=os.path.join(action_dir, target_name),
+                **options,
+            )
+        )
+
+    return jobs
+
+
+def _run_job(
+    job: BatchJob,
+    cache: DescriptionCache,
+    config_cache: Optional[ConfigCache],
+    metrics: Optional[Metrics],
+    converter: Optional[MarkdownConverter],
+    remote: Optional[RemoteActions],
+    check: bool,
+) -> BatchResult:
+    """Runs a job, capturing its outcome instead of raising"""
+    start = time.perf_counter()
+    try:
+        changed = job.run(
+            cache=cache,
+            config_cache=config_cache,
+            metrics=metrics,
+            converter=converter,
+            remote=remote,
+            check=check,
+        )
+    except Exception as e:
+        return BatchResult(job, error=e, elapsed=time.perf_counter() - start)
+    return BatchResult(job, changed=changed, elapsed=time.perf_counter() - start)
+
+
+def run_batch(
+    jobs: List[BatchJob],
+    workers: Optional[int] = None,
+    cache: Optional[DescriptionCache] = None,
+    config_cache: Optional[ConfigCache] = None,
+    metrics: Optional[Metrics] = None,
+    converter: Optional[MarkdownConverter] = None,
+    remote: Optional[RemoteActions] = None,
+    check: bool = False,
+) -> List[BatchResult]:
+    """Runs many jobs concurrently in the current process
+
+    Jobs are run on a thread pool so that the imported libraries
+    (and their state) are shared between jobs. A failing job does not
+    stop the others from running.
+
+    Args:
+        jobs: the jobs to run
+        workers: the maximum number of concurrent jobs
+            (defaults to the ThreadPoolExecutor default)
+        cache: the cache of rendered descriptions, shared by all jobs
+            (if None, an in-memory cache is shared by all jobs)
+        config_cache: the cache of parsed action configurations
+        metrics: the metrics to record timings and counters to,
+            shared by all jobs
+        converter: the Markdown converter for descriptions, shared
+            by all jobs (if None, the converter shared by default)
+        remote: the fetcher of remote actions, shared by all jobs (i.e.
+            their connections and fetched actions)
+        check: if target files should only be checked, stale ones
+            being reported as changed (see BatchJob.run())
+
+    Returns:
+        The result of each job, in the same order as <jobs>
+    """
+    log.info(f"Batch: {len(jobs)} job{'s' if len(jobs) != 1 else ''}")
+
+    cache = cache if cache is not None else DescriptionCache()
+    remote = remote if remote is not None else RemoteActions()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(
+            executor.map(
+                lambda job: _run_job(
+                    job, cache, config_cache, metrics, converter, remote, check
+                ),
+                jobs,
+            )
+        )
+
+    # Report
+    for result in results:
+        if result.ok:
+            log.info(f"Batch: {result!r}")
+        else:
+            log.error(f"Batch: {result!r}")
+
+    failed = len([r for r in results if not r.ok])
+    changed = len([r for r in results if r.ok and r.changed])
+    log.info(
+        f"Batch: {len(results) - failed} succeeded ({changed} changed), "
+        f"{failed} failed"
+    )
+
+    return results
@@ -0,0 +1,382 @@
+import hashlib
+import logging
+import marshal
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .utils import MARKDOWN_EXTENSIONS
+
+# Logger
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+# Default maximum size of an on-disk cache (in bytes)
+DEFAULT_MAX_SIZE = 32 * 1024 * 1024
+
+# Version of the serialized form of cached configs
+CONFIG_CACHE_VERSION = 1
+
+# Files modified less than this long before being cached (in seconds)
+# can't be trusted by their size and mtime alone (see ConfigCache)
+CONFIG_CACHE_RACY_WINDOW = 2.0
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    """Writes a cache entry atomically
+
+    So that concurrent readers never see a partially written entry.
+    A cache that can't be written to isn't fatal (only logged).
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with open(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        log.warning(f"Error writing cache entry '{path}': {str(e)}")
+
+
+class DescriptionCache:
+    """A content-addressed cache of rendered descriptions
+
+    Rendered (HTML) descriptions are cached by a hash of the description
+    text, the Markdown library version and the extensions they're
+    rendered with (i.e. the configuration of the converter), in two
+    layers:
+
+    * In memory, for identical descriptions within the same run
+      (e.g. boilerplate shared by many inputs), optionally bounded in
+      number by evicting the least recently used ones (e.g. for a
+      long-running server)
+    * On disk (optional), for descriptions that haven't changed between
+      runs. The cache directory can be persisted between workflow runs
+      with actions/cache. It's bounded in size by evicting the least
+      recently used entries (see prune()).
+
+    The cache is safe to share between threads (e.g. in batch mode).
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_size: int = DEFAULT_MAX_SIZE,
+        memo_size: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            cache_dir: the on-disk cache directory (if None, the cache
+                is in-memory only)
+            max_size: the maximum size of the on-disk cache (in bytes)
+            memo_size: the maximum number of descriptions kept in memory
+                (if None, unbounded)
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.memo_size = memo_size
+
+        self.hits = 0
+        self.misses = 0
+
+        # (by extensions and description)
+        self._memo = {} if memo_size is None else OrderedDict()
+        self._lock = threading.Lock()
+        self._salts: Dict[Tuple[str, ...], str] = {}
+
+    def _key(self, text: str, extensions: Iterable[str] = MARKDOWN_EXTENSIONS) -> str:
+        """The content address of a description (rendered with <extensions>)"""
+        extensions = tuple(extensions)
+        salt = self._salts.get(extensions)
+        if salt is None:
+            import markdown
+
+            salt = f"{markdown.__version__}:{','.join(extensions)}:"
+            self._salts[extensions] = salt
+        return hashlib.sha256((salt + text).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def _read(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                html = f.read()
+        except OSError:
+            return None
+
+        # Bump the entry as most recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return html
+
+    def _write(self, key: str, html: str) -> None:
+        _atomic_write(self._path(key), html.encode("utf-8"))
+
+    def _memo_get(self, key: Tuple[Tuple[str, ...], str]) -> Optional[str]:
+        """A description from memory (bumped as most recently used)"""
+        if self.memo_size is None:
+            return self._memo.get(key)
+
+        with self._lock:
+            html = self._memo.get(key)
+            if html is not None:
+                self._memo.move_to_end(key)
+        return html
+
+    def _memo_update(
+        self, items: Iterable[Tuple[Tuple[Tuple[str, ...], str], str]]
+    ) -> None:
+        """Keeps descriptions in memory (evicting the least recently used)"""
+        with self._lock:
+            if self.memo_size is None:
+                self._memo.update(items)
+                return
+
+            for key, html in items:
+                self._memo[key] = html
+                self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+    def _count(self, hits: int, misses: int) -> None:
+        """Counts cache hits and misses (from any thread)"""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def render(
+        self,
+        text: str,
+        render_fn: Callable[[str], str],
+        extensions: Iterable[str] = MARKDOWN_EXTENSIONS,
+    ) -> str:
+        """Gets the rendered description from the cache, or renders it
+
+        Args:
+            text: the description to render
+            render_fn: the function rendering <text>, on a cache miss
+            extensions: the python-markdown extensions <render_fn>
+                renders with (see MarkdownConverter)
+
+        Returns:
+            The rendered description
+        """
+        # In-memory
+        extensions = tuple(extensions)
+        html = self._memo_get((extensions, text))
+        if html is not None:
+            self._count(1, 0)
+            return html
+
+        # On disk
+        key = self._key(text, extensions) if self.cache_dir else None
+        html = self._read(key) if key else None
+
+        if html is None:
+            self._count(0, 1)
+            html = render_fn(text)
+            if key:
+                self._write(key, html)
+        else:
+            self._count(1, 0)
+
+        self._memo_update([((extensions, text), html)])
+        return html
+
+    def render_many(
+        self,
+        texts: List[str],
+        render_many_fn: Callable[[List[str]], List[str]],
+        memo: bool = True,
+        extensions: Iterable[str] = MARKDOWN_EXTENSIONS,
+    ) -> List[str]:
+        """Gets many rendered descriptions from the cache, or renders them
+
+        Cache misses are rendered together, in one call.
+
+        Args:
+            texts: the descriptions to render
+            render_many_fn: the function rendering a list of descriptions,
+                on cache misses
+            memo: if the rendered descriptions are kept in memory (e.g.
+                not when streaming, for memory not to grow with them)
+            extensions: the python-markdown extensions <render_many_fn>
+                renders with (see MarkdownConverter)
+
+        Returns:
+            The rendered descriptions, in the same order as <texts>
+        """
+        extensions = tuple(extensions)
+        htmls = [None] * len(texts)
+        keys = {}
+        misses = {}
+        hits = 0
+
+        for i, text in enumerate(texts):
+            # In-memory
+            html = self._memo_get((extensions, text))
+
+            # On disk
+            if html is None and text not in misses:
+                keys[text] = self._key(text, extensions) if self.cache_dir else None
+                html = self._read(keys[text]) if keys[text] else None
+
+            if html is None:
+                misses.setdefault(text, []).append(i)
+            else:
+                hits += 1
+                htmls[i] = html
+
+        hits += sum(len(idx) - 1 for idx in misses.values())
+        self._count(hits, len(misses))
+
+        if misses:
+            rendered = render_many_fn(list(misses.keys()))
+            for (text, idx), html in zip(misses.items(), rendered):
+                if keys[text]:
+                    self._write(keys[text], html)
+                for i in idx:
+                    htmls[i] = html
+
+        if memo:
+            self._memo_update(((extensions, t), h) for t, h in zip(texts, htmls))
+        return htmls
+
+    def prune(self) -> None:
+        """Evicts the least recently used on-disk entries
+
+        Deletes entries, least recently used first, until the on-disk
+        cache is no larger than its maximum size.
+        """
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return
+
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+        total_size = sum(e[1] for e in entries)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+            evicted += 1
+
+        log.info(
+            f"Cache: {self.hits} hits, {self.misses} misses, "
+            f"{evicted} evicted, {total_size} bytes on disk"
+        )
+
+
+class ConfigCache:
+    """An on-disk cache of parsed action configurations
+
+    Parsed configurations are stored in a compact serialized form
+    (marshal), content-addressed by a hash of the action file.
+    An index (by action file path) of the size, mtime and content hash
+    of the action file allows skipping both reading and parsing the
+    action file when its size and mtime didn't change. Otherwise, it's
+    read and hashed (but only parsed if its content changed).
+
+    Like DescriptionCache, it can be persisted with actions/cache
+    (and shares its directory and its size limit).
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        """
+        Args:
+            cache_dir: the on-disk cache directory
+        """
+        self.cache_dir = cache_dir
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.cache_dir, "configs", f"{key}.{kind}")
+
+    def _read(self, path: str) -> Any:
+        try:
+            with open(path, "rb") as f:
+                entry = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        # Bump the entry as most recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def _write(self, path: str, entry: Any) -> bool:
+        try:
+            data = marshal.dumps(entry)
+        except ValueError:
+            # Not serializable (e.g. YAML timestamps)
+            return False
+        _atomic_write(path, data)
+        return True
+
+    def load(self, filename: str, parse_fn: Callable[[bytes], Any]) -> Any:
+        """Gets the parsed configuration of a file, or parses it
+
+        Args:
+            filename: the action file
+            parse_fn: the function parsing the content of <filename>,
+                when it's not in the cache
+
+        Returns:
+            The parsed configuration
+        """
+        st = os.stat(filename)
+        stat = (st.st_size, st.st_mtime_ns)
+
+        index_key = hashlib.sha256(
+            os.path.abspath(filename).encode("utf-8")
+        ).hexdigest()
+        index_path = self._path("index", index_key)
+        index = self._read(index_path)
+
+        # Same size and mtime: trust the indexed content hash (unless the
+        # file was modified right around when it was indexed, in which case
+        # a later modification could have kept the same mtime)
+        if index and index[0] == CONFIG_CACHE_VERSION and tuple(index[1]) == stat:
+            if not index[3]:
+                entry = self._read(self._path("config", index[2]))
+                if entry is not None:
+                    log.debug(f"Config cache: '{filename}' unchanged (stat)")
+                    return entry[1]
+
+        with open(filename, "rb") as f:
+            content = f.read()
+        content_key = hashlib.sha256(content).hexdigest()
+        config_path = self._path("config", content_key)
+
+        entry = self._read(config_path)
+        if entry is not None and entry[0] == CONFIG_CACHE_VERSION:
+            log.debug(f"Config cache: '{filename}' unchanged (content)")
+            config = entry[1]
+        else:
+            config = parse_fn(content)
+            if not self._write(config_path, (CONFIG_CACHE_VERSION, config)):
+                return config
+
+        racy = time.time() - st.st_mtime < CONFIG_CACHE_RACY_WINDOW
+        self._write(index_path, (CONFIG_CACHE_VERSION, stat, content_key, racy))
+        return config
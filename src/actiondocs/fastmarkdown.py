@@ -0,0 +1,264 @@
+import re
+from typing import List, Optional
+
+# A fast renderer of the subset of Markdown commonly used in descriptions:
+# paragraphs, fenced code blocks, inline code, bold and italics (with '*'),
+# inline links, simple lists and blockquotes.
+#
+# It renders the same HTML as python-markdown (with 'fenced_code'), and
+# gives up (i.e. returns None) on anything else, or on anything that
+# python-markdown could render differently than the obvious: raw HTML,
+# entities, escapes, '_' emphasis, headers, rules, indented lines, etc.
+
+# Fenced code blocks, as matched by python-markdown's 'fenced_code'
+FENCED_BLOCK_RE = re.compile(
+    r"""
+    (?P<fence>^(?:~{3,}|`{3,}))[ ]*                          # opening fence
+    ((\{(?P<attrs>[^\n]*)\})|                                # (optional {attrs} or
+    (\.?(?P<lang>[\w#.+-]*)[ ]*)?                            # optional (.)lang
+    (hl_lines=(?P<quot>"|')(?P<hl_lines>.*?)(?P=quot)[ ]*)?) # optional hl_lines)
+    \n                                                       # newline (end of opening fence)
+    (?P<code>.*?)(?<=\n)                                     # the code block
+    (?P=fence)[ ]*$                                          # closing fence
+    """,
+    re.MULTILINE | re.DOTALL | re.VERBOSE,
+)
+
+# Lines consisting of spaces only (emptied by python-markdown)
+BLANK_LINE_RE = re.compile(r"(?<=\n) +\n")
+
+# Characters that aren't supported anywhere (whitespace other than
+# spaces and newlines, and the placeholders of stashed HTML)
+UNSUPPORTED_CHARS_RE = re.compile(r"[^\S \n]|[\x02\x03]")
+
+# Lines that could be anything but paragraph text: indented (code, list
+# continuation), headers, blockquotes, rules and setext header underlines,
+# fences, and lines with trailing spaces (line breaks)
+UNSUPPORTED_LINE_RE = re.compile(r"^(?:[ #>]|[=\-*_ ]+$)|```|~~~|[ ]$", re.MULTILINE)
+
+# Items of an unordered or ordered list
+UL_ITEM_RE = re.compile(r"([*+-])[ ]+")
+OL_ITEM_RE = re.compile(r"\d+\.[ ]+")
+
+# Blockquote lines
+QUOTE_LINE_RE = re.compile(r">[ ]?")
+
+# Inline links (without title), whose text is rendered as well
+LINK_RE = re.compile(r"\[([^\[\]]+)\]\(([\w\-.~:/?#@!$&+,=%]+)\)")
+
+# Characters of inline text that start unsupported constructs: raw HTML,
+# autolinks, entities, escapes, '_' emphasis and reference links/images
+UNSUPPORTED_INLINE_RE = re.compile(r"[<&\\_\[\]]")
+
+# Stashed HTML placeholders
+PLACEHOLDER_RE = re.compile(r"\x02(\d+)\x03")
+
+
+def _escape_code(code: str) -> str:
+    return code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _escape_fence(code: str) -> str:
+    return _escape_code(code).replace('"', "&quot;")
+
+
+def _stash(stash: List[str], html: str) -> str:
+    stash.append(html)
+    return f"\x02{len(stash) - 1}\x03"
+
+
+def _emphasis(text: str) -> Optional[str]:
+    """Renders '**strong**' and '*em*' of inline text
+
+    Only unambiguous emphasis is rendered: every '*' must open or
+    close one (non-nested, non-empty) emphasis, with no space inside.
+    """
+    if "*" not in text:
+        return text.replace(">", "&gt;")
+    if "***" in text:
+        return None
+
+    html = []
+    pos = 0
+    while True:
+        start = text.find("*", pos)
+        if start == -1:
+            break
+        if text.startswith("**", start):
+            tag, delimiter = "strong", "**"
+        else:
+            tag, delimiter = "em", "*"
+        content_start = start + len(delimiter)
+        content_end = text.find(delimiter, content_start + 1)
+        if content_end == -1:
+            return None
+        content = text[content_start:content_end]
+        if "*" in content or content[0].isspace() or content[-1].isspace():
+            return None
+        end = content_end + len(delimiter)
+        if text.startswith("*", end):
+            return None
+
+        html.append(text[pos:start].replace(">", "&gt;"))
+        html.append(f"<{tag}>{content.replace('>', '&gt;')}</{tag}>")
+        pos = end
+
+    html.append(text[pos:].replace(">", "&gt;"))
+    return "".join(html)
+
+
+def _inline(text: str, stash: List[str]) -> Optional[str]:
+    """Renders inline Markdown (with stashed HTML placeholders)"""
+    # Inline code (adjacent ones are matched differently)
+    parts = text.split("`")
+    if len(parts) % 2 == 0 or "``" in text:
+        return None
+    for i in range(1, len(parts), 2):
+        code = parts[i].strip()
+        if not code:
+            return None
+        parts[i] = _stash(stash, f"<code>{_escape_code(code)}</code>")
+    text = "".join(parts)
+
+    if "!" in text and "![" in text:
+        return None
+
+    # Links
+    def link(m):
+        link_text = _emphasis(m.group(1))
+        if link_text is None or UNSUPPORTED_INLINE_RE.search(m.group(1)):
+            return "["  # Unsupported, see below
+        href = m.group(2).replace("&", "&amp;")
+        return _stash(stash, f'<a href="{href}">{link_text}</a>')
+
+    if "[" in text:
+        text = LINK_RE.sub(link, text)
+
+    if UNSUPPORTED_INLINE_RE.search(text):
+        return None
+    return _emphasis(text)
+
+
+def _unstash(html: str, stash: List[str]) -> str:
+    # Links can contain inline code
+    while "\x02" in html:
+        html = PLACEHOLDER_RE.sub(lambda m: stash[int(m.group(1))], html)
+    return html
+
+
+def _paragraph(block: str) -> bool:
+    """If a block (free of unsupported lines) is a paragraph"""
+    return not (UL_ITEM_RE.match(block) or OL_ITEM_RE.match(block))
+
+
+def render(md: str) -> Optional[str]:
+    """Renders Markdown to HTML, as python-markdown would
+
+    Args:
+        md: the Markdown
+
+    Returns:
+        The same HTML as python-markdown (with the 'fenced_code' extension),
+        or None if the Markdown uses constructs that aren't supported
+    """
+    if UNSUPPORTED_CHARS_RE.search(md) or not md.strip():
+        return None
+
+    stash = []
+
+    # Fenced code blocks, stashed in blocks of their own
+    text = BLANK_LINE_RE.sub("\n", md + "\n\n")
+    if "```" in text or "~~~" in text:
+        while True:
+            m = FENCED_BLOCK_RE.search(text)
+            if m is None:
+                break
+            if m.group("attrs") is not None or m.group("hl_lines") is not None:
+                return None
+            lang = m.group("lang")
+            code = _escape_fence(m.group("code"))
+            if lang:
+                html = f'<pre><code class="language-{lang}">{code}</code></pre>'
+            else:
+                html = f"<pre><code>{code}</code></pre>"
+            placeholder = _stash(stash, html)
+            text = f"{text[: m.start()]}\n{placeholder}\n{text[m.end() :]}"
+
+    if UNSUPPORTED_LINE_RE.search(text):
+        # Blockquotes are checked separately, line by line
+        if any(
+            UNSUPPORTED_LINE_RE.search(line)
+            for line in text.split("\n")
+            if not line.startswith(">")
+        ):
+            return None
+
+    html = []
+    previous = None
+    for block in text.split("\n\n"):
+        block = block.lstrip("\n")
+        if not block:
+            continue
+
+        if PLACEHOLDER_RE.fullmatch(block):
+            html.append(block)
+            previous = "pre"
+            continue
+
+        lines = block.split("\n")
+        if block.startswith(">"):
+            # A blockquote (of a single paragraph), unless merged
+            # with a previous one or with lines of another kind
+            if previous == "blockquote":
+                return None
+            content = []
+            for line in lines:
+                m = QUOTE_LINE_RE.match(line)
+                if m is None or m.end() == len(line):
+                    return None
+                content.append(line[m.end() :])
+            content = "\n".join(content)
+            if UNSUPPORTED_LINE_RE.search(content):
+                return None
+            if not _paragraph(content):
+                return None
+            inline = _inline(content, stash)
+            if inline is None:
+                return None
+            html.append(f"<blockquote>\n<p>{inline}</p>\n</blockquote>")
+            previous = "blockquote"
+            continue
+
+        if any(line.startswith(">") for line in lines):
+            return None
+
+        item_re = UL_ITEM_RE if UL_ITEM_RE.match(block) else OL_ITEM_RE
+        if item_re.match(block):
+            # A list (of one-line items), unless merged with a previous one
+            if previous == "list":
+                return None
+            tag = "ul" if item_re is UL_ITEM_RE else "ol"
+            marker = block[0] if tag == "ul" else None
+            items = []
+            for line in lines:
+                m = item_re.match(line)
+                if m is None or (marker and line[0] != marker):
+                    return None
+                item = line[m.end() :]
+                if UNSUPPORTED_LINE_RE.search(item) or not _paragraph(item):
+                    return None
+                inline = _inline(item, stash)
+                if inline is None:
+                    return None
+                items.append(f"<li>{inline}</li>\n")
+            html.append(f"<{tag}>\n{''.join(items)}</{tag}>")
+            previous = "list"
+            continue
+
+        inline = _inline(block, stash)
+        if inline is None:
+            return None
+        html.append(f"<p>{inline}</p>")
+        previous = "p"
+
+    return _unstash("\n".join(html), stash)
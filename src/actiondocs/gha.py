@@ -1,4 +1,5 @@
 import logging
+import os
 
 # GitHub Action Workflow Commands
 # https://docs.github.com/en/actions/using-workflows/workflow-commands-for-github-actions
@@ -90,21 +91,150 @@ def error(message: str, **kwargs) -> None:
     print(GHAAnnotation(cmd_name="error", cmd_value=message, **kwargs).output())
 
 
+def set_output(name: str, value: str) -> None:
+    """Sets the step output <name> to <value>
+
+    Appends to the $GITHUB_OUTPUT file, which is only set
+    when running in GitHub Actions (otherwise does nothing).
+    https://docs.github.com/en/actions/using-workflows/
+    workflow-commands-for-github-actions#setting-an-output-parameter
+    """
+    output_file = os.environ.get("GITHUB_OUTPUT")
+    if not output_file:
+        return
+
+    if "\n" in value:
+        raise ValueError("Multi-line outputs are not supported")
+
+    with open(output_file, "a") as f:
+        f.write(f"{name}={value}\n")
+
+
+def append_step_summary(markdown: str) -> None:
+    """Appends <markdown> to the job summary
+
+    Appends to the $GITHUB_STEP_SUMMARY file, which is only set
+    when running in GitHub Actions (otherwise does nothing).
+    https://docs.github.com/en/actions/using-workflows/
+    workflow-commands-for-github-actions#adding-a-job-summary
+    """
+    summary_file = os.environ.get("GITHUB_STEP_SUMMARY")
+    if not summary_file:
+        return
+
+    with open(summary_file, "a") as f:
+        f.write(markdown)
+
+
+# Workflow command prefixes of log records, by level
+# (records have no parameters, so there's nothing to validate)
+LEVEL_COMMANDS = {
+    logging.DEBUG: GHACommand(cmd_name="debug", cmd_value="").output(),
+    logging.WARNING: GHAAnnotation(cmd_name="warning", cmd_value="").output(),
+    logging.ERROR: GHAAnnotation(cmd_name="error", cmd_value="").output(),
+    logging.CRITICAL: GHAAnnotation(cmd_name="error", cmd_value="").output(),
+}
+
+# Number of buffered records after which GHAHandler writes them
+BUFFER_CAPACITY = 1000
+
+# Title of the groups in which GHAHandler folds debug records
+DEBUG_GROUP_TITLE = "Debug"
+
+
+def is_debug() -> bool:
+    """If the workflow run has debug logging enabled
+
+    https://docs.github.com/en/actions/monitoring-and-troubleshooting-workflows/
+    enabling-debug-logging
+    """
+    return os.environ.get("RUNNER_DEBUG") == "1"
+
 
 class GHAFormatter(logging.Formatter):
     """Logging Formatter wrapper for GitHub Actions
 
     Wraps the standard Formatter formated string with the
     appropriate GitHub Actions Worflow Command depending on log level
+
+    Debug records are written as plain lines if <plain_debug> (the debug
+    command being only shown when the workflow run has debug logging).
     """
+    def __init__(self, *args, plain_debug: bool = False, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.plain_debug = plain_debug
+
     def format(self, record: logging.LogRecord) -> str:
         s = super().format(record)
-        if record.levelno == logging.DEBUG:
-            return GHACommand(cmd_name="debug", cmd_value=s).output()
-        elif record.levelno == logging.WARNING:
-            return GHAAnnotation(cmd_name="warning", cmd_value=s).output()
-        elif record.levelno >= logging.ERROR:
-            return GHAAnnotation(cmd_name="error", cmd_value=s).output()
-        else:
-            # There's no GitHub Actions Workflow command for INFO
+        if record.levelno == logging.DEBUG and self.plain_debug:
             return s
+        if record.levelno >= logging.ERROR:
+            return LEVEL_COMMANDS[logging.ERROR] + s
+        # There's no GitHub Actions Workflow command for INFO
+        return LEVEL_COMMANDS.get(record.levelno, "") + s
+
+
+class GHAHandler(logging.StreamHandler):
+    """Logging Handler for GitHub Actions
+
+    Buffers formatted records and writes them together: when
+    <capacity> records are buffered, when a record of at least
+    <flush_level> is handled, and when closed. Consecutive debug
+    records are folded into a (collapsed) group of the log.
+    Records of disabled levels (see setLevel()) are never formatted.
+    """
+    def __init__(
+        self,
+        stream=None,
+        capacity: int = BUFFER_CAPACITY,
+        flush_level: int = logging.INFO,
+    ) -> None:
+        super().__init__(stream)
+        self.capacity = capacity
+        self.flush_level = flush_level
+        self._buffer = []
+        self._buffered = 0
+        self._grouped = False
+
+    def _group(self, grouped: bool) -> None:
+        """Opens or closes the group of debug records"""
+        if grouped != self._grouped:
+            if grouped:
+                self._buffer.append(f"::group::{DEBUG_GROUP_TITLE}{self.terminator}")
+            else:
+                self._buffer.append(f"::endgroup::{self.terminator}")
+            self._grouped = grouped
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            msg = self.format(record)
+            self._group(record.levelno == logging.DEBUG)
+            self._buffer.append(msg + self.terminator)
+            self._buffered += 1
+
+            if self._buffered >= self.capacity or record.levelno >= self.flush_level:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if self._buffer and self.stream:
+                self.stream.write("".join(self._buffer))
+                self._buffer.clear()
+                self._buffered = 0
+            super().flush()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        self.acquire()
+        try:
+            self._group(False)
+            self.flush()
+        finally:
+            self.release()
+        super().close()
@@ -0,0 +1,157 @@
+import logging
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    import subprocess
+
+# (subprocess is only imported on first use, most runs not committing)
+
+# Logger
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+# Defaults of the commits of generated documentation
+DEFAULT_USER_NAME = "github-actions[bot]"
+DEFAULT_USER_EMAIL = "github-actions[bot]@users.noreply.github.com"
+DEFAULT_COMMIT_MESSAGE = "GitHub Action Auto-Docs"
+
+
+class GitError(Exception):
+    """A git command failed"""
+
+
+def _subcommand(args) -> str:
+    """The subcommand of git arguments (e.g. 'commit' of '-c k=v commit ...')"""
+    args = iter(args)
+    for arg in args:
+        if arg == "-c":
+            next(args, None)
+        elif not arg.startswith("-"):
+            return arg
+    return ""
+
+
+class Git:
+    """Commits (and pushes) files of a git repository
+
+    Runs git commands in <repo_dir> (the current directory by default).
+    The commit author is only set for the commits made (the repository's
+    configuration is left as-is), and defaults to the configured one.
+    """
+
+    def __init__(
+        self,
+        repo_dir: str = ".",
+        user_name: Optional[str] = None,
+        user_email: Optional[str] = None,
+    ) -> None:
+        self.repo_dir = repo_dir
+        self.user_name = user_name
+        self.user_email = user_email
+
+    def _run(self, *args: str, check: bool = True) -> "subprocess.CompletedProcess":
+        """Runs a git command
+
+        Args:
+            args: the git command and its arguments
+            check: if a failure (non-zero exit status) raises GitError
+
+        Returns:
+            The completed command
+        """
+        import subprocess
+
+        cmd = ["git", *args]
+        log.debug(f"Running: {' '.join(cmd)}")
+        try:
+            result = subprocess.run(
+                cmd,
+                cwd=self.repo_dir,
+                capture_output=True,
+                text=True,
+            )
+        except OSError as e:
+            raise GitError(f"Can't run git: {str(e)}") from e
+
+        if check and result.returncode != 0:
+            raise GitError(
+                f"'git {_subcommand(args)}' failed ({result.returncode}): "
+                f"{result.stderr.strip()}"
+            )
+        return result
+
+    def add(self, paths: List[str]) -> None:
+        """Stages files"""
+        self._run("add", "--", *paths)
+
+    def has_staged_changes(self, paths: List[str]) -> bool:
+        """If staged files differ from HEAD"""
+        result = self._run("diff", "--cached", "--quiet", "--", *paths, check=False)
+        if result.returncode not in (0, 1):
+            raise GitError(f"'git diff' failed: {result.stderr.strip()}")
+        return result.returncode == 1
+
+    def commit(self, paths: List[str], message: str, signoff: bool = False) -> None:
+        """Commits (only) staged files, whatever else is staged"""
+        identity = []
+        if self.user_name:
+            identity += ["-c", f"user.name={self.user_name}"]
+        if self.user_email:
+            identity += ["-c", f"user.email={self.user_email}"]
+
+        self._run(
+            *identity,
+            "commit",
+            *(["--signoff"] if signoff else []),
+            "-m",
+            message,
+            "--",
+            *paths,
+        )
+
+    def push(self) -> None:
+        """Pushes the current branch to its upstream"""
+        self._run("push")
+
+    def commit_changes(
+        self,
+        paths: List[str],
+        message: str = DEFAULT_COMMIT_MESSAGE,
+        signoff: bool = False,
+        push: bool = True,
+    ) -> bool:
+        """Commits changed files together (and pushes them)
+
+        Nothing is run without files, nor committed when they're
+        the same as in HEAD (e.g. a target file written again after
+        having been edited by hand).
+
+        Args:
+            paths: the changed files (e.g. target files)
+            message: the commit message
+            signoff: if the commit is signed-off
+            push: if the commit is pushed
+
+        Returns:
+            If a commit was made
+
+        Raises:
+            GitError: if a git command failed
+        """
+        if not paths:
+            log.info("Git: nothing to commit")
+            return False
+
+        self.add(paths)
+        if not self.has_staged_changes(paths):
+            log.info("Git: nothing to commit (same as HEAD)")
+            return False
+
+        self.commit(paths, message, signoff=signoff)
+        log.info(f"Git: committed {', '.join(paths)}")
+
+        if push:
+            self.push()
+            log.info("Git: pushed")
+
+        return True
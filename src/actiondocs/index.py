@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+from .batch import BatchJob
+from .main import ActionDocs
+from .utils import write_if_changed
+
+# Logger
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+# Version of the index format (indexes of other versions are rebuilt)
+INDEX_VERSION = 2
+
+
+def _job_key(job: BatchJob) -> dict:
+    """What the sources of a job depend on (besides its template's content)"""
+    return {
+        "action_file": os.path.normpath(job.action_file),
+        "template_file": os.path.normpath(job.template_file),
+        "options": job.options,
+    }
+
+
+class DependencyIndex:
+    """The source files of target files, to only regenerate affected targets
+
+    For each target file (of a BatchJob): its template file, the action
+    files its template documents (see ActionDocs.get_action_files()),
+    its layout file (if any), and itself (e.g. to undo edits by hand).
+
+    The index is persisted (when a filename is given) so that, given the
+    changed files (e.g. from 'git diff --name-only'), only the templates
+    that changed (or of jobs that changed) are scanned again: the work is
+    proportional to the change, not to the number of targets.
+
+    Paths are normalized (see os.path.normpath()), and must be relative to
+    the same directory as the changed files (e.g. the repository's root).
+    """
+
+    def __init__(self, filename: Optional[str] = None) -> None:
+        """
+        Args:
+            filename: the file of the index (if None, the index is
+                only kept in memory)
+        """
+        self.filename = filename
+        self.scanned = 0
+        self._entries: Dict[str, dict] = {}
+
+        if filename is not None:
+            self._load()
+
+    def _load(self) -> None:
+        """Loads the index (an unreadable index is rebuilt)"""
+        try:
+            with open(self.filename, "r") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            log.warning(f"Index: can't load '{self.filename}': {str(e)}")
+            return
+
+        if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+            log.info(f"Index: '{self.filename}' is outdated, rebuilding it")
+            return
+        self._entries = index["targets"]
+
+    def save(self) -> None:
+        """Writes the index (if it has a file, and it changed)"""
+        if self.filename is None:
+            return
+        index = {"version": INDEX_VERSION, "targets": self._entries}
+        data = json.dumps(index, indent=1, sort_keys=True).encode("utf-8")
+        if write_if_changed(self.filename, data):
+            log.info(f"Index: wrote '{self.filename}'")
+
+    def _scan(self, job: BatchJob) -> List[str]:
+        """The source files of a job (scanning its template)"""
+        self.scanned += 1
+        action_doc = ActionDocs(
+            action_file=job.action_file,
+            template_file=job.template_file,
+            **job.options,
+        )
+        try:
+            action_files = action_doc.get_action_files()
+        except OSError as e:
+            # e.g. a deleted template: the job fails when run
+            log.warning(f"Index: can't scan '{job.template_file}': {str(e)}")
+            action_files = [os.path.normpath(job.action_file)]
+
+        sources = {os.path.normpath(job.template_file), *action_files}
+        sources.add(os.path.normpath(job.target_file))
+        layout = job.options.get("layout")
+        if isinstance(layout, str):
+            sources.add(os.path.normpath(layout))
+        return sorted(sources)
+
+    def sources(self, job: BatchJob, changed: Iterable[str] = ()) -> List[str]:
+        """The source files of a job
+
+        Indexed, unless the job isn't indexed, changed, or its template
+        is one of the <changed> files (normalized).
+
+        Args:
+            job: the job
+            changed: the changed files (normalized)
+
+        Returns:
+            The source files (normalized, sorted)
+        """
+        target = os.path.normpath(job.target_file)
+        key = _job_key(job)
+
+        entry = self._entries.get(target)
+        if entry is None or entry["job"] != key or key["template_file"] in changed:
+            entry = {"job": key, "sources": self._scan(job)}
+            self._entries[target] = entry
+        return entry["sources"]
+
+    def affected(self, jobs: List[BatchJob], changed: Iterable[str]) -> List[BatchJob]:
+        """The jobs with at least one changed source file
+
+        The index is updated with <jobs> (i.e. targets of other jobs
+        are forgotten).
+
+        Args:
+            jobs: every job (e.g. of a manifest)
+            changed: the changed files (e.g. from 'git diff --name-only')
+
+        Returns:
+            The affected jobs, in the same order as <jobs>
+        """
+        changed = {os.path.normpath(path) for path in changed}
+
+        affected = [
+            job for job in jobs if changed.intersection(self.sources(job, changed))
+        ]
+
+        targets = {os.path.normpath(job.target_file) for job in jobs}
+        for target in [t for t in self._entries if t not in targets]:
+            del self._entries[target]
+
+        log.info(
+            f"Index: {len(affected)} of {len(jobs)} "
+            f"job{'s' if len(jobs) != 1 else ''} affected by "
+            f"{len(changed)} changed file{'s' if len(changed) != 1 else ''} "
+            f"({self.scanned} template{'s' if self.scanned != 1 else ''} scanned)"
+        )
+        return affected
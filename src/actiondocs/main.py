@@ -1,14 +1,77 @@
 import logging
-import re
+import os
+from contextlib import nullcontext
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Union
 
-import yaml
-
-from .utils import markdown_to_github_html_for_table
+from .cache import ConfigCache, DescriptionCache
+from .manifest import (
+    ROW_CHECK_SEPARATOR,
+    BlockManifest,
+    document_fingerprint,
+    previous_rows,
+    row_check,
+    row_hash,
+)
+from .metrics import Metrics
+from .model import ActionSpec, input_spec, output_spec
+from .remote import (
+    WORKFLOWS_DIR,
+    ActionRef,
+    RemoteActions,
+    find_workflow_uses,
+    workflow_files,
+)
+from .markers import (
+    Block,
+    StreamContent,
+    find_all_blocks,
+    is_streamable,
+    mapped,
+    stream_substitute,
+    substitute,
+)
+from .renderers import (
+    DEFAULT_LAYOUT,
+    RENDERERS,
+    MarkdownRenderer,
+    Renderer,
+    TableLayout,
+    load_layout,
+)
+from .utils import (
+    AtomicFileWriter,
+    FileLock,
+    MarkdownConverter,
+    default_converter,
+    file_content_equals,
+    is_multiline,
+    lock_filename,
+    write_if_changed,
+)
+from .yamlstream import StreamingUnsupported, iter_section
 
 # Logger
 log = logging.getLogger(__name__)
 log.addHandler(logging.NullHandler())
 
+# Number of items (inputs or outputs) rendered together when streaming
+STREAM_CHUNK_SIZE = 1000
+
+
+@lru_cache(maxsize=None)
+def yaml_safe_loader():
+    """The YAML safe loader class (imports yaml on first use)
+
+    The (much faster) libyaml-based loader, when available.
+    """
+    try:
+        from yaml import CSafeLoader as YAMLSafeLoader
+    except ImportError:
+        from yaml import SafeLoader as YAMLSafeLoader
+    return YAMLSafeLoader
+
 
 class ActionDocs:
     """A GitHub Action Markdown docs generator"""
@@ -22,8 +85,21 @@ class ActionDocs:
         template_file: str = "README.md",
         marker_start: str = "<!--doc_begin-->",
         marker_end: str = "<!--doc_end-->",
+        cache: Optional[DescriptionCache] = None,
+        converter: Optional[MarkdownConverter] = None,
+        config_cache: Optional[ConfigCache] = None,
+        incremental: bool = False,
+        metrics: Optional[Metrics] = None,
+        fingerprint: bool = False,
+        streaming: bool = False,
+        remote: Optional[RemoteActions] = None,
+        shared: bool = False,
+        layout: Union[str, TableLayout, None] = None,
     ):
-        """Load action configuration and template
+        """Configure the generator
+
+        The action configuration and template are loaded on first use
+        (see 'action_config' and 'template').
 
         For action configuration attributes, see:
         https://docs.github.com/en/actions/creating-actions/metadata-syntax-for-github-actions
@@ -39,6 +115,32 @@ class ActionDocs:
                 will take place
             marker_end: the closing marker to which the substitution
                 will take place
+            cache: the cache of rendered descriptions (if None, an
+                in-memory cache is used for this instance only)
+            converter: the Markdown converter for descriptions (if None,
+                the converter shared by default is used)
+            config_cache: the cache of parsed action configurations
+                (if None, action files are always parsed)
+            incremental: if generated blocks should embed a manifest
+                of their rows, so that only changed rows are rendered
+                on the next run (see BlockManifest)
+            metrics: the metrics to record timings and counters to
+                (if None, nothing is recorded)
+            fingerprint: if generated blocks should embed the fingerprint
+                of the document, so that it's left as-is (without being
+                generated) while its fingerprint is unchanged
+            streaming: if documents should be saved streaming the inputs
+                and outputs from the action files (see save()), for memory
+                not to grow with their number (ignored if incremental)
+            remote: the fetcher of remote actions, for named blocks with
+                a 'uses' option and 'workflows' blocks (if None, one
+                without on-disk cache is created on first use)
+            shared: if the target file is shared with other (concurrent)
+                writers, e.g. matrix jobs: only the blocks of this action
+                file are replaced, in the latest content of the target
+                file, under a lock (see _save_shared())
+            layout: the layout of the Markdown tables, or its YAML file
+                (see TableLayout and load_layout(); if None, the default)
         """
         # Arguments
         self.include_inputs = include_inputs
@@ -46,12 +148,50 @@ class ActionDocs:
         self.heading_size = heading_size
         self.marker_start = marker_start
         self.marker_end = marker_end
+        self.incremental = incremental
+        self.fingerprint = fingerprint
+        self.streaming = streaming
+        self.shared = shared
+        if isinstance(layout, str):
+            layout = load_layout(layout)
+        self.layout = layout if layout is not None else DEFAULT_LAYOUT
+        self.cache = cache if cache is not None else DescriptionCache()
+        self.config_cache = config_cache
+        self.metrics = metrics
+        self._converter = converter
+        self._remote = remote
+
+        # Other action configs (by path) and rendered blocks
+        # (by name, path, heading size and included sections)
+        self._action_configs = {}
+        self._blocks_markdown = {}
+
+        # Workflow files documented by 'workflows' blocks (once rendered),
+        # and if the remote actions of the template were fetched
+        self._workflow_files = set()
+        self._remote_fetched = False
+
+        # Models (by config) and renderers (by format)
+        self._specs = {}
+        self._renderers = {}
 
-        # action config
-        self.action_config = self._load_yaml(action_file)
+        # Row hashes and checks (by config and section) and, when not
+        # in-place, previous blocks contents (by name and options), if
+        # incremental
+        self._row_hashes = {}
+        self._row_checks = {}
+        self._previous_blocks = {}
 
-        # Template file
-        self.template = self._load_text(template_file)
+        # Fingerprint of the document (computed on first use)
+        self._fingerprint = None
+
+        # action config (loaded on first use, see 'action_config')
+        self.action_file = action_file
+        self._action_config = None
+
+        # Template file (loaded on first use, see 'template')
+        self.template_file = template_file
+        self._template = None
 
         # Debug (arguments)
         for k, v in locals().items():
@@ -59,18 +199,162 @@ class ActionDocs:
                 continue
             log.debug(f"Arg: {k} = '{v}'")
 
-        # Debug (action config)
-        log.debug(f"Action config: {self.action_config}")
+    @classmethod
+    def from_text(
+        cls,
+        action_yaml: Union[str, dict],
+        template: str,
+        action_file: str = "action.yml",
+        **kwargs,
+    ) -> "ActionDocs":
+        """Configure the generator from in-memory text (e.g. an editor's buffers)
+
+        Nothing is read from disk, except the action files of named blocks
+        with a 'path' (other than <action_file>).
+
+        Args:
+            action_yaml: the action configuration (YAML), or its parsed
+                configuration (e.g. parsed once for many documents)
+            template: the template
+            action_file: the name of the action file (e.g. for named
+                blocks with a 'path')
+            kwargs: the other arguments (see __init__()), except
+                'fingerprint' (fingerprints are of files)
+
+        Returns:
+            The generator
+        """
+        if kwargs.get("fingerprint"):
+            raise ValueError("Fingerprints can't be used with in-memory text")
+
+        action_docs = cls(action_file=action_file, **kwargs)
+        if isinstance(action_yaml, str):
+            with action_docs._span("load_yaml"):
+                action_yaml = cls._parse_yaml(action_yaml)
+        # An empty action file is an action without inputs nor outputs
+        action_docs.action_config = action_yaml or {}
+        action_docs.template = template
+        return action_docs
+
+    @property
+    def converter(self) -> MarkdownConverter:
+        """The Markdown converter (the default is created on first use)"""
+        if self._converter is None:
+            self._converter = default_converter()
+        return self._converter
+
+    @property
+    def remote(self) -> RemoteActions:
+        """The fetcher of remote actions (the default is created on first use)"""
+        if self._remote is None:
+            self._remote = RemoteActions()
+        return self._remote
+
+    @property
+    def action_config(self) -> dict:
+        """The action configuration (loaded from the action file on first use)"""
+        if self._action_config is None:
+            self._action_config = self._load_yaml(self.action_file)
+
+            # Debug (action config, which can be large)
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(f"Action config: {self._action_config}")
+        return self._action_config
+
+    @action_config.setter
+    def action_config(self, action_config: dict) -> None:
+        self._action_config = action_config
+        # Invalidate the rendered blocks
+        self._blocks_markdown.clear()
+        self._specs.clear()
+        self._row_hashes.clear()
+        self._row_checks.clear()
+
+    @property
+    def template(self) -> str:
+        """The template (loaded from the template file on first use)"""
+        if self._template is None:
+            with self._span("load_template", file=self.template_file):
+                self._template = self._load_text(self.template_file)
+        return self._template
+
+    @template.setter
+    def template(self, template: str) -> None:
+        self._template = template
+
+    @property
+    def source_files(self) -> List[str]:
+        """The files the document is generated from
+
+        i.e. the action file, the template file, and the action files
+        of named blocks and workflow files of 'workflows' blocks (once
+        they were loaded)
+        """
+        return [
+            self.action_file,
+            self.template_file,
+            *self._action_configs,
+            *sorted(self._workflow_files),
+        ]
+
+    def invalidate(self, filename: str) -> None:
+        """Forgets what was loaded (and rendered) from a file
+
+        e.g. when it changed, so that it's loaded again on next use.
+
+        Args:
+            filename: the file (one of the source files)
+        """
+        self._fingerprint = None
+
+        path = os.path.normpath(filename)
+        if path == os.path.normpath(self.template_file):
+            self.template = None
+        if path == os.path.normpath(self.action_file):
+            self.action_config = None
+        if path in self._workflow_files:
+            self._workflow_files.discard(path)
+            self._blocks_markdown.clear()
+        if path in self._action_configs:
+            del self._action_configs[path]
+            self._blocks_markdown.clear()
+            self._specs.clear()
+            self._row_hashes.clear()
+            self._row_checks.clear()
+
+    def _span(self, name: str, **attributes):
+        """Times a span in the metrics, if any (see Metrics.span())"""
+        if self.metrics is None:
+            return nullcontext()
+        return self.metrics.span(name, **attributes)
+
+    def _count(self, name: str, n: int = 1) -> None:
+        """Increments a counter in the metrics, if any"""
+        if self.metrics is not None:
+            self.metrics.count(name, n)
 
     def _load_yaml(self, filename: str) -> dict:
-        """Loads a YAML file"""
+        """Loads a YAML file
+
+        Through the cache of parsed configurations, if any.
+        """
         try:
-            with open(filename, "r") as f:
-                return yaml.safe_load(f)
+            with self._span("load_yaml", file=filename):
+                if self.config_cache is not None:
+                    return self.config_cache.load(filename, self._parse_yaml)
+                with open(filename, "rb") as f:
+                    return self._parse_yaml(f)
         except OSError as e:
             log.error(f"Error loading YAML '{filename}': {str(e)}")
             raise
 
+    @staticmethod
+    def _parse_yaml(stream) -> dict:
+        """Parses YAML (from a str, bytes or file object)"""
+        import yaml
+
+        return yaml.load(stream, Loader=yaml_safe_loader())
+
     def _load_text(self, filename: str) -> str:
         """Loads a text file"""
         try:
@@ -80,108 +364,208 @@ class ActionDocs:
             log.error(f"Error loading '{filename}': {str(e)}")
             raise
 
-    def _get_markdown_table_inputs(self, config: dict) -> str:
+    def _convert_descriptions(
+        self, descs: List[str], one_line: bool = False, memo: bool = True
+    ) -> List[str]:
+        """Converts descriptions for Markdown table cells (cached)
+
+        Multi-line descriptions are converted all at once
+        (one-line descriptions are rendered as-is, unless <one_line>).
+
+        Args:
+            descs: the descriptions to convert (e.g. of a whole table)
+            one_line: if one-line descriptions are converted to HTML as
+                well (not cached, being cheap to convert)
+            memo: if converted descriptions are kept in memory by the
+                cache (see DescriptionCache.render_many())
+
+        Returns:
+            The converted descriptions, in the same order as <descs>
+        """
+        if one_line:
+            # (from the descriptions as they were, multi-line ones being
+            # one-line once converted)
+            single = [i for i, desc in enumerate(descs) if not is_multiline(desc)]
+            descs = self._convert_descriptions(descs)
+            converted = self.converter.convert_many(
+                [descs[i] for i in single], one_line=True
+            )
+            for i, desc in zip(single, converted):
+                descs[i] = desc
+            return descs
+
+        multiline = [i for i, desc in enumerate(descs) if is_multiline(desc)]
+        if not multiline:
+            return list(descs)
+
+        observe = self.metrics.conversion if self.metrics is not None else None
+        converted = self.cache.render_many(
+            [descs[i] for i in multiline],
+            lambda mds: self.converter.convert_many(mds, observe=observe),
+            memo=memo,
+            extensions=self.converter.extensions,
+        )
+
+        descs = list(descs)
+        for i, desc in zip(multiline, converted):
+            descs[i] = desc
+        return descs
+
+    def _get_row_hashes(self, config: dict, section: str) -> List[str]:
+        """The hashes of the rows of a section (computed once per config)"""
+        key = (id(config), section)
+        if key not in self._row_hashes:
+            # (keeping a reference to the config, so that its id is unique)
+            items = (config[section] or {}).items()
+            layout = self.layout.key
+            hashes = [row_hash(section, k, v, layout) for k, v in items]
+            self._row_hashes[key] = (config, hashes)
+        return self._row_hashes[key][1]
+
+    def _check_rows(self, config: dict, section: str, table: str, count: int) -> None:
+        """Keeps the checks of the rows of a rendered table (see row_check())
+
+        For the manifest (see _get_manifest()). None for a table with
+        rows of several lines (e.g. of a default value with a newline)
+        as such rows can't be read back from the table (see
+        previous_rows()), so that they're left out of the manifest.
+        """
+        if not self.incremental:
+            return
+        rows = table.split("\n")[2:]
+        checks = [row_check(row) for row in rows] if len(rows) == count else None
+        # (keeping a reference to the config, so that its id is unique)
+        self._row_checks[(id(config), section)] = (config, checks)
+
+    def _reused_rows(
+        self, config: dict, section: str, previous: Optional[Dict[str, str]]
+    ) -> Dict[int, str]:
+        """The previously generated rows of a section that are unchanged
+
+        Args:
+            config: the action configuration
+            section: 'inputs' or 'outputs'
+            previous: previously generated rows, by row hash
+
+        Returns:
+            The unchanged rows, by index
+        """
+        if not previous:
+            return {}
+
+        hashes = self._get_row_hashes(config, section)
+        reused = {i: previous[h] for i, h in enumerate(hashes) if h in previous}
+        self._count("rows_reused", len(reused))
+        log.debug(f"{section.capitalize()}: {len(reused)} unchanged")
+        return reused
+
+    def _get_spec(self, config: dict) -> ActionSpec:
+        """The model of an action configuration (built once per config)"""
+        key = id(config)
+        if key not in self._specs:
+            # (keeping a reference to the config, so that its id is unique)
+            self._specs[key] = (config, ActionSpec.from_config(config))
+        return self._specs[key][1]
+
+    def get_spec(self, path: Optional[str] = None) -> ActionSpec:
+        """The model of an action (see ActionSpec)
+
+        Args:
+            path: the action file (defaults to the instance's)
+        """
+        return self._get_spec(self._get_action_config(path))
+
+    def get_renderer(self, fmt: str) -> Renderer:
+        """The renderer of a format (see RENDERERS)
+
+        Renderers of every format share the instance's converted
+        descriptions (and their cache).
+
+        Args:
+            fmt: the format, e.g. 'markdown', 'html' or 'json'
+        """
+        if fmt not in self._renderers:
+            try:
+                renderer_class = RENDERERS[fmt]
+            except KeyError:
+                raise ValueError(f"Unknown format '{fmt}'") from None
+            if renderer_class is MarkdownRenderer:
+                renderer = renderer_class(self._convert_descriptions, self.layout)
+            else:
+                renderer = renderer_class(self._convert_descriptions)
+            self._renderers[fmt] = renderer
+        return self._renderers[fmt]
+
+    def _get_markdown_table_inputs(
+        self, config: dict, previous: Optional[Dict[str, str]] = None
+    ) -> str:
         """Generates the action's 'inputs' as a Markdown table
 
         Generates a GitHub-flavoured markdown table of
-        the action inputs configuration. Supports multi-line Markdown
-        for the 'description' field by converting to specific minified HTML
-        that GitHub is known to render correctly.
+        the action inputs configuration (see MarkdownRenderer).
 
         Args:
             config: the action configuration
+            previous: previously generated rows, by row hash, which are
+                copied verbatim when unchanged (see BlockManifest)
 
         Returns:
             Markdown table of the action's inputs
         """
-        try:
-            inputs_config = config["inputs"]
-            log.info(f"Inputs: {len(inputs_config)}")
-        except KeyError:
+        inputs = self._get_spec(config).inputs
+        if inputs is None:
             log.info(f"Inputs: None")
             return "None"
+        log.info(f"Inputs: {len(inputs)}")
+        self._count("inputs", len(inputs))
 
-        rows = []
-
-        # Header
-        rows.append("|Input|Description|Default|Required|")
-        rows.append("|-----|-----------|-------|:------:|")
-
-        for k, v in inputs_config.items():
-            # <input_id> (required)
-            input_id = f"`{k}`"
-
-            # <input_id>.description (required)
-            # <input_id>.deprecationMessage (optional)
-            desc = v["description"]
-            if "deprecationMessage" in v:
-                desc += "\n\n" + f"**Depricated:** {v['deprecationMessage']}"
-            desc = markdown_to_github_html_for_table(desc)
-
-            # <input_id>.default (optional)
-            default = f"`{v['default']}`" if "default" in v else "n/a"
-
-            # <input_id>.required (optional)
-            required = v["required"] if "required" in v else False
-            required = "yes" if required else "no"
-
-            # Append markdown rows
-            # Strip any trailing end-of-line char from the action file
-            # (e.g. trailing \n on multi-line yaml)
-            rows.append(
-                f"|{input_id.rstrip()}"
-                f"|{desc.rstrip()}"
-                f"|{default.rstrip()}"
-                f"|{required.rstrip()}"
-                f"|"
-            )
+        # Unchanged rows (by index)
+        reused = self._reused_rows(config, "inputs", previous)
 
-        # Join rows with newlines
-        return "\n".join(rows)
+        renderer: MarkdownRenderer = self.get_renderer("markdown")
+        table = renderer.inputs_table(inputs, reused)
+        self._check_rows(config, "inputs", table, len(inputs))
+        return table
 
-    def _get_markdown_table_outputs(self, config: dict) -> str:
+    def _get_markdown_table_outputs(
+        self, config: dict, previous: Optional[Dict[str, str]] = None
+    ) -> str:
         """Generates the action's 'outputs' as a Markdown table
 
         Generates a GitHub-flavoured markdown table of
-        the action outputs configuration. Supports multi-line Markdown
-        for the 'description' field by converting to specific minified HTML
-        that GitHub is known to render correctly.
+        the action outputs configuration (see MarkdownRenderer).
 
         Args:
             config: the action configuration
+            previous: previously generated rows, by row hash, which are
+                copied verbatim when unchanged (see BlockManifest)
 
         Returns:
             Markdown table of the action's outputs
         """
-        try:
-            outputs_config = config["outputs"]
-            log.info(f"Outputs: {len(outputs_config)}")
-        except KeyError:
+        outputs = self._get_spec(config).outputs
+        if outputs is None:
             log.info(f"Outputs: None")
             return "None"
+        log.info(f"Outputs: {len(outputs)}")
+        self._count("outputs", len(outputs))
 
-        rows = []
-
-        # Header
-        rows.append("|Output|Description|")
-        rows.append("|------|-----------|")
-
-        for k, v in outputs_config.items():
-            # <output_id> (required)
-            output_id = f"`{k}`"
-
-            # <output_id>.description (required)
-            desc = markdown_to_github_html_for_table(v["description"])
+        # Unchanged rows (by index)
+        reused = self._reused_rows(config, "outputs", previous)
 
-            # Append markdown line
-            # Strip any trailing end-of-line char from the action file
-            # (e.g. trailing \n on multi-line yaml)
-            rows.append(f"|{output_id.rstrip()}" f"|{desc.rstrip()}" f"|")
+        renderer: MarkdownRenderer = self.get_renderer("markdown")
+        table = renderer.outputs_table(outputs, reused)
+        self._check_rows(config, "outputs", table, len(outputs))
+        return table
 
-        # Join rows with newlines
-        return "\n".join(rows)
-
-    def _get_full_markdown(self, config: dict) -> str:
+    def _get_full_markdown(
+        self,
+        config: dict,
+        include_inputs: Optional[bool] = None,
+        include_outputs: Optional[bool] = None,
+        heading_size: Optional[int] = None,
+        previous: Optional[Dict[str, Dict[str, str]]] = None,
+    ) -> str:
         """Generates the full action configuration as Markdown
 
         Generates a Markdown string of the following structure:
@@ -193,68 +577,817 @@ class ActionDocs:
 
         Args:
             config: the action configuration
+            include_inputs: if the 'inputs' section should be included
+                (defaults to the instance's)
+            include_outputs: if the 'outputs' section should be included
+                (defaults to the instance's)
+            heading_size: the Markdown heading size for the section titles
+                (defaults to the instance's)
+            previous: previously generated rows, by section and row hash,
+                which are copied verbatim when unchanged
 
         Returns:
             The full Markdown of the action configuration
         """
+        if include_inputs is None:
+            include_inputs = self.include_inputs
+        if include_outputs is None:
+            include_outputs = self.include_outputs
+        if heading_size is None:
+            heading_size = self.heading_size
+        if previous is None:
+            previous = {}
+
         md = ""
 
         # Add inputs
-        if self.include_inputs:
-            md += f"{'#' * self.heading_size} Inputs"
+        if include_inputs:
+            md += f"{'#' * heading_size} Inputs"
             md += "\n"
-            md += self._get_markdown_table_inputs(config)
+            with self._span("render_inputs"):
+                md += self._get_markdown_table_inputs(config, previous.get("inputs"))
             md += "\n"
 
         # Add output
-        if self.include_outputs:
-            md += f"{'#' * self.heading_size} Outputs"
+        if include_outputs:
+            md += f"{'#' * heading_size} Outputs"
             md += "\n"
-            md += self._get_markdown_table_outputs(config)
+            with self._span("render_outputs"):
+                md += self._get_markdown_table_outputs(config, previous.get("outputs"))
+
+        # Debug (without splitting the Markdown unless needed)
+        if log.isEnabledFor(logging.DEBUG):
+            for line in md.splitlines():
+                log.debug(f"md: {line}")
+
+        return md
+
+    def _get_action_config(self, path: Optional[str] = None) -> dict:
+        """The configuration of an action file (loaded once per file)
+
+        Args:
+            path: the action file (defaults to the instance's)
+        """
+        if path is None:
+            return self.action_config
+
+        path = os.path.normpath(path)
+        if path == os.path.normpath(self.action_file):
+            return self.action_config
+
+        if path not in self._action_configs:
+            self._action_configs[path] = self._load_yaml(path)
+        return self._action_configs[path]
+
+    def _fetch_remote_actions(self) -> None:
+        """Fetches the remote actions of the template's blocks, concurrently
+
+        i.e. of named blocks with a 'uses' option, and used by the
+        workflows of 'workflows' blocks (see RemoteActions.fetch_all()).
+        Once, before the first is rendered.
+        """
+        if self._remote_fetched:
+            return
+        self._remote_fetched = True
+
+        if self._template is not None:
+            blocks = find_all_blocks(self._template, self.marker_start, self.marker_end)
+        else:
+            with mapped(self.template_file) as mm:
+                blocks = find_all_blocks(mm, self.marker_start, self.marker_end)
+
+        refs = []
+        for block in blocks:
+            if block.name == "workflows":
+                refs += find_workflow_uses(block.options.get("path", WORKFLOWS_DIR))
+            elif self._is_generated(block) and "uses" in block.options:
+                try:
+                    refs.append(ActionRef.from_uses(block.options["uses"]))
+                except ValueError:
+                    pass
+
+        with self._span("fetch_remote", actions=len(refs)):
+            self.remote.fetch_all(refs)
+
+    def _get_remote_config(self, uses: str) -> dict:
+        """The configuration of a remote action (see RemoteActions.load())
+
+        Args:
+            uses: the remote action, e.g. 'actions/checkout@v4'
+        """
+        self._fetch_remote_actions()
+        return self.remote.load(ActionRef.from_uses(uses))
+
+    @staticmethod
+    def _block_id(block: Block) -> tuple:
+        """Identifies a block across documents (by name and options)"""
+        return block.name, tuple(sorted(block.options.items()))
+
+    def _load_previous_blocks(self, filename: str) -> None:
+        """Loads the previous content of the blocks of a target file
+
+        When the target file isn't the template, its blocks hold the
+        previously generated Markdown (and manifests), not the template's.
+
+        Args:
+            filename: the target file
+        """
+        self._previous_blocks = {}
+        try:
+            if os.path.samefile(filename, self.template_file):
+                return
+            with open(filename, "r", encoding="utf-8") as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError):
+            return
+
+        for block in find_all_blocks(text, self.marker_start, self.marker_end):
+            self._previous_blocks[self._block_id(block)] = text[block.start : block.end]
+
+    def _get_previous_rows(self, block: Block) -> Dict[str, Dict[str, str]]:
+        """The previously generated rows of a block, by section and row hash
+
+        From the target file's block (see _load_previous_blocks()), or else
+        the template's. Empty when the block has no manifest.
+        """
+        content = self._previous_blocks.get(self._block_id(block), block.previous)
+        manifest = BlockManifest.parse(content) if content else None
+        if manifest is None:
+            return {}
+
+        return {
+            "inputs": previous_rows(
+                content, manifest, "inputs", self.layout.inputs_header
+            ),
+            "outputs": previous_rows(
+                content, manifest, "outputs", self.layout.outputs_header
+            ),
+        }
+
+    def _get_manifest(
+        self, config: dict, include_inputs: bool, include_outputs: bool
+    ) -> BlockManifest:
+        """The manifest of a block documenting <config>"""
+        rows = {}
+        if self.incremental:
+            for section, include in [
+                ("inputs", include_inputs),
+                ("outputs", include_outputs),
+            ]:
+                _, checks = self._row_checks.get((id(config), section), (None, None))
+                if include and checks is not None:
+                    hashes = self._get_row_hashes(config, section)
+                    rows[section] = [
+                        f"{h}{ROW_CHECK_SEPARATOR}{c}" for h, c in zip(hashes, checks)
+                    ]
+
+        fingerprint = self.get_fingerprint() if self.fingerprint else None
+        return BlockManifest(rows, fingerprint)
+
+    @staticmethod
+    def _is_generated(block: Block) -> bool:
+        """If a block is generated (i.e. isn't an unknown named block)"""
+        return block.name in [None, "inputs", "outputs", "all", "workflows"]
+
+    def _is_owned(self, block: Block) -> bool:
+        """If a block documents this action file (i.e. is written when shared)
+
+        The unnamed block, and named blocks whose 'path' is the action
+        file (or without a 'path'). Not remote actions' blocks.
+        """
+        if block.name is None:
+            return True
+        if block.name == "workflows" or "uses" in block.options:
+            return False
+        if not self._is_generated(block):
+            return False
+        path = block.options.get("path", self.action_file)
+        return os.path.normpath(path) == os.path.normpath(self.action_file)
+
+    def _documented_action_files(self, blocks: List[Block]) -> List[str]:
+        """The action files documented by generated blocks (normalized)
+
+        Including the workflow files of 'workflows' blocks, but not
+        remote actions (which aren't files).
+        """
+        action_files = set()
+        for block in blocks:
+            if block.name is None:
+                if self.include_inputs or self.include_outputs:
+                    action_files.add(self.action_file)
+            elif block.name == "workflows":
+                action_files.update(
+                    workflow_files(block.options.get("path", WORKFLOWS_DIR))
+                )
+            elif "uses" not in block.options:
+                action_files.add(block.options.get("path", self.action_file))
+        return sorted(os.path.normpath(f) for f in action_files)
+
+    def get_action_files(self) -> List[str]:
+        """The action files documented by the template file
+
+        i.e. the action file, and the action files of named blocks
+        (see Block). The template is only scanned for markers (neither
+        it nor the action files are parsed).
+
+        Returns:
+            The action files (normalized, sorted)
+        """
+        with mapped(self.template_file) as mm:
+            blocks = [
+                b
+                for b in find_all_blocks(mm, self.marker_start, self.marker_end)
+                if self._is_generated(b)
+            ]
+            return self._documented_action_files(blocks)
+
+    def get_fingerprint(self) -> str:
+        """The fingerprint of the document
+
+        Of everything the document is generated from: the options, the
+        template file outside of the generated blocks, and the content
+        of the documented action files (see document_fingerprint()).
+        Neither the template nor the action files are parsed.
+
+        Remote actions are only fingerprinted by their reference (i.e.
+        in the template): pin them to a commit SHA for their documentation
+        not to be left stale.
 
-        # Debug
-        for line in md.splitlines():
-            log.debug(f"md: {line}")
+        Returns:
+            The fingerprint (hexadecimal)
+        """
+        if self._fingerprint is not None:
+            return self._fingerprint
+
+        options = {
+            "include_inputs": self.include_inputs,
+            "include_outputs": self.include_outputs,
+            "heading_size": self.heading_size,
+            "marker_start": self.marker_start,
+            "marker_end": self.marker_end,
+            "incremental": self.incremental,
+            "layout": self.layout.key,
+        }
+
+        with mapped(self.template_file) as mm, memoryview(mm) as view:
+            blocks = [
+                b
+                for b in find_all_blocks(mm, self.marker_start, self.marker_end)
+                if self._is_generated(b)
+            ]
+
+            action_files = self._documented_action_files(blocks)
+
+            parts = []
+            pos = 0
+            for block in blocks:
+                parts.append(view[pos : block.start])
+                pos = block.end
+            parts.append(view[pos:])
+
+            self._fingerprint = document_fingerprint(options, parts, action_files)
+            del parts
+
+        return self._fingerprint
+
+    def _target_fingerprint_matches(self, filename: str) -> bool:
+        """If every generated block of a target file has the fingerprint
+
+        i.e. if the target file is up-to-date (as far as its
+        fingerprints tell: blocks edited by hand aren't detected).
+        If shared, only the blocks of this action file are checked.
+        """
+        fingerprint = self.get_fingerprint()
+
+        try:
+            with mapped(filename) as mm:
+                blocks = [
+                    b
+                    for b in find_all_blocks(mm, self.marker_start, self.marker_end)
+                    if self._is_generated(b) and (not self.shared or self._is_owned(b))
+                ]
+
+                for block in blocks:
+                    # (the manifest is the first thing in generated blocks)
+                    end = mm.find(b"-->", block.start, block.end)
+                    if end == -1:
+                        return False
+                    content = str(mm[block.start : end + 3], "utf-8", "replace")
+                    manifest = BlockManifest.parse(content)
+                    if manifest is None or manifest.fingerprint != fingerprint:
+                        return False
+        except OSError:
+            return False
+
+        return len(blocks) > 0
+
+    def _get_block_markdown(self, block: Block) -> Optional[str]:
+        """The Markdown to insert between the markers of a block
+
+        The unnamed block documents the action as configured. Named blocks
+        document either the 'inputs', the 'outputs' or 'all' (both) of the
+        action, or of the action file given by their 'path' option, with
+        the heading size given by their 'heading_size' option (if any).
+        Or, with a 'uses' option, of a remote action (e.g. 'uses=
+        actions/checkout@v4'). 'workflows' blocks document all the remote
+        actions used by the workflows of their 'path' (see
+        _get_workflows_markdown()). Each is only rendered once, however
+        many times it's referenced.
 
+        If incremental (or fingerprinted), the Markdown starts with the
+        manifest of the block (see BlockManifest). If incremental, the
+        rows of the previous content of the block that are unchanged
+        are reused as-is.
+
+        (wrapped in newlines to make sure the markers stay on their own line)
+
+        Args:
+            block: the block
+
+        Returns:
+            The Markdown, or None for unknown named blocks
+        """
+        path = block.options.get("path")
+        uses = block.options.get("uses")
+        heading_size = int(block.options.get("heading_size", self.heading_size))
+
+        key = (
+            block.name,
+            path,
+            uses,
+            heading_size,
+            self.include_inputs,
+            self.include_outputs,
+        )
+        if key in self._blocks_markdown:
+            return self._blocks_markdown[key]
+
+        if block.name is None:
+            include_inputs = self.include_inputs
+            include_outputs = self.include_outputs
+            # (the action file isn't needed when nothing is included)
+            include = include_inputs or include_outputs
+            config = self.action_config if include else {}
+        elif block.name == "workflows":
+            md = self._get_workflows_markdown(path or WORKFLOWS_DIR, heading_size)
+            if self.fingerprint:
+                manifest = BlockManifest({}, self.get_fingerprint())
+                md = manifest.to_comment() + "\n" + md
+            md = "\n" + md + "\n"
+            self._blocks_markdown[key] = md
+            return md
+        elif block.name in ["inputs", "outputs", "all"]:
+            include_inputs = block.name in ["inputs", "all"]
+            include_outputs = block.name in ["outputs", "all"]
+            if uses is not None:
+                config = self._get_remote_config(uses)
+            else:
+                config = self._get_action_config(path)
+        else:
+            log.warning(f"Unknown block '{block.name}' (left as-is)")
+            self._blocks_markdown[key] = None
+            return None
+
+        previous = self._get_previous_rows(block) if self.incremental else None
+        md = self._get_full_markdown(
+            config,
+            include_inputs=include_inputs,
+            include_outputs=include_outputs,
+            heading_size=heading_size,
+            previous=previous,
+        )
+        if block.name is not None:
+            md = md.rstrip("\n")
+
+        if self.incremental or self.fingerprint:
+            manifest = self._get_manifest(config, include_inputs, include_outputs)
+            md = manifest.to_comment() + "\n" + md
+
+        md = "\n" + md + "\n"
+        self._blocks_markdown[key] = md
         return md
 
+    def _get_workflows_markdown(self, workflows_dir: str, heading_size: int) -> str:
+        """The Markdown of the remote actions used by workflows
+
+        Each action (see find_workflow_uses()) under its own heading,
+        its inputs and outputs under headings one size smaller.
+
+        Args:
+            workflows_dir: the directory of the workflow files
+            heading_size: the Markdown heading size for the action titles
+
+        Returns:
+            The Markdown ('None' if the workflows use no remote action)
+        """
+        self._workflow_files.update(
+            os.path.normpath(f) for f in workflow_files(workflows_dir)
+        )
+        self._fetch_remote_actions()
+
+        refs = find_workflow_uses(workflows_dir)
+        log.info(f"Workflow actions: {len(refs)}")
+        if not refs:
+            return "None"
+
+        sections = []
+        for ref in refs:
+            md = self._get_full_markdown(
+                self.remote.load(ref),
+                include_inputs=True,
+                include_outputs=True,
+                heading_size=heading_size + 1,
+            )
+            sections.append(f"{'#' * heading_size} `{ref.uses}`\n" + md.rstrip("\n"))
+        return "\n".join(sections)
+
+    def render(self, fmt: str = "markdown") -> str:
+        """Renders the action in a format (see get_renderer())
+
+        The action as configured (i.e. its action file, included sections
+        and heading size), rendered on its own (not in the template).
+
+        Args:
+            fmt: the format, e.g. 'markdown', 'html' or 'json'
+
+        Returns:
+            The rendered action
+        """
+        spec = self.get_spec()
+        with self._span("render", format=fmt):
+            return self.get_renderer(fmt).render(
+                spec,
+                include_inputs=self.include_inputs,
+                include_outputs=self.include_outputs,
+                heading_size=self.heading_size,
+            )
+
+    def export(self, filename: str, fmt: str) -> bool:
+        """Writes the action rendered in a format to file, if it changed
+
+        See render() and save().
+
+        Args:
+            filename: the file to save the rendered action to
+            fmt: the format, e.g. 'markdown', 'html' or 'json'
+
+        Returns:
+            If the file changed
+        """
+        content = self.render(fmt)
+        try:
+            with self._span("write", file=filename):
+                changed = write_if_changed(filename, content.encode("utf-8"))
+        except IOError as e:
+            log.error(f"Error saving '{filename}': {str(e)}")
+            raise
+
+        if changed:
+            log.info(f"Wrote {fmt} to '{filename}'")
+        else:
+            log.info(f"Unchanged '{filename}'")
+        return changed
+
     def generate(self) -> str:
         """Inserts the Markdown between two markers in a file
 
         Inserts or replaces the lines between two markers in a file with the
-        generated action documentation markdown.
+        generated action documentation markdown. Named blocks (see Block)
+        are filled in the same pass.
 
         Returns:
             the full substituted document
         """
 
-        # Prepare markers for regex
-        marker_start = re.escape(self.marker_start)
-        marker_end = re.escape(self.marker_end)
+        # Generate the final document (insert Markdown between markers)
+        template = self.template
+        with self._span("substitute"):
+            document = substitute(
+                template,
+                self.marker_start,
+                self.marker_end,
+                self._get_block_markdown,
+                named=True,
+            )
+
+        return document
+
+    def _get_block_markdown_bytes(self, block: Block) -> Optional[bytes]:
+        """See _get_block_markdown() (as bytes)"""
+        md = self._get_block_markdown(block)
+        return md.encode("utf-8") if md is not None else None
 
-        # Compile regex
-        marker_regex = re.compile(rf"(?<={marker_start}).*(?={marker_end})", re.DOTALL)
+    def _save_streamed(self, filename: str) -> bool:
+        """Writes the document to file, streamed from the template file
 
-        # Generate the final document (insert Markdown between markers)
-        # (wrapping in newlines to make sure the markers stay on their own line)
-        document = marker_regex.sub(
-            "\n" + self._get_full_markdown(self.action_config) + "\n", self.template
+        The template is never loaded in memory: its content outside of
+        the markers is copied straight from the template file.
+
+        Args:
+            filename: the file to save the resulting document to
+
+        Returns:
+            If the file changed
+        """
+        with AtomicFileWriter(filename) as f:
+            with self._span("substitute", streamed=True):
+                stream_substitute(
+                    self.template_file,
+                    f,
+                    self.marker_start,
+                    self.marker_end,
+                    self._get_block_markdown_bytes,
+                    named=True,
+                )
+            with self._span("write", file=filename):
+                return f.commit()
+
+    def _save_shared(self, filename: str) -> bool:
+        """Writes the blocks of this action file to a shared file
+
+        The blocks are rendered first (see _is_owned()). Then, under an
+        advisory lock of the target file (see FileLock), the target file
+        is read again and the blocks replaced in its latest content, or
+        in the template's when it's another file (with the latest content
+        of the other blocks). The target file is replaced atomically:
+        other writers' blocks are never lost, and writers only wait for
+        each other to merge, not to render.
+
+        Args:
+            filename: the file to save the resulting document to
+
+        Returns:
+            If the file changed
+        """
+        blocks = find_all_blocks(self.template, self.marker_start, self.marker_end)
+        owned = {}
+        for block in blocks:
+            if self._is_owned(block):
+                owned[self._block_id(block)] = self._get_block_markdown(block)
+
+        with self._span("lock", file=filename), FileLock(lock_filename(filename)):
+            try:
+                with open(filename, "r", encoding="utf-8") as f:
+                    latest = f.read()
+            except FileNotFoundError:
+                latest = None
+
+            # The blocks of other writers, as they are now
+            try:
+                in_place = latest is not None and os.path.samefile(
+                    filename, self.template_file
+                )
+            except OSError:
+                in_place = False
+            if in_place:
+                template, others = latest, {}
+            else:
+                template, others = self.template, {}
+                for block in find_all_blocks(
+                    latest or "", self.marker_start, self.marker_end
+                ):
+                    others[self._block_id(block)] = latest[block.start : block.end]
+
+            def replacement(block: Block) -> Optional[str]:
+                block_id = self._block_id(block)
+                if block_id in owned:
+                    return owned[block_id]
+                return others.get(block_id)
+
+            with self._span("substitute", shared=True):
+                document = substitute(
+                    template,
+                    self.marker_start,
+                    self.marker_end,
+                    replacement,
+                    named=True,
+                )
+            with self._span("write", file=filename):
+                return write_if_changed(filename, document.encode("utf-8"))
+
+    def is_up_to_date(self, filename: str) -> bool:
+        """If a file's content is already the document
+
+        Without writing anything. If fingerprinted, as far as the file's
+        fingerprint tells (see get_fingerprint()), without generating
+        the document.
+
+        Args:
+            filename: the file to check
+
+        Returns:
+            If the file is up-to-date
+        """
+        if self.fingerprint:
+            return self._target_fingerprint_matches(filename)
+
+        return file_content_equals(filename, self.generate().encode("utf-8"))
+
+    def _iter_table(
+        self, path: str, section: str, renderer: MarkdownRenderer
+    ) -> Iterator[str]:
+        """The Markdown table of a section, streamed from an action file
+
+        Rows are rendered by chunks of STREAM_CHUNK_SIZE, as the items
+        of the section are read (see iter_section()).
+
+        Args:
+            path: the action file
+            section: 'inputs' or 'outputs'
+            renderer: the renderer of the rows
+
+        Returns:
+            The table, by chunks
+        """
+        with self._span("load_yaml", file=path, streamed=True):
+            items = iter_section(path, section, yaml_safe_loader())
+        if items is None:
+            log.info(f"{section.capitalize()}: None")
+            yield "None"
+            return
+
+        layout = renderer.layout
+        if section == "inputs":
+            spec, rows = input_spec, renderer.input_rows
+            yield layout.inputs_header + "\n" + layout.inputs_separator
+        else:
+            spec, rows = output_spec, renderer.output_rows
+            yield layout.outputs_header + "\n" + layout.outputs_separator
+
+        count = 0
+        chunk = list(islice(items, STREAM_CHUNK_SIZE))
+        while chunk:
+            with self._span(f"render_{section}", streamed=True):
+                md = "\n" + "\n".join(rows([spec(k, v) for k, v in chunk]))
+            yield md
+            count += len(chunk)
+            chunk = list(islice(items, STREAM_CHUNK_SIZE))
+
+        log.info(f"{section.capitalize()}: {count}")
+        self._count(section, count)
+
+    def _iter_block_markdown(self, block: Block) -> Iterator[str]:
+        """The Markdown of a block, streamed (see _get_block_markdown())"""
+        path = block.options.get("path", self.action_file)
+        heading_size = int(block.options.get("heading_size", self.heading_size))
+        if block.name is None:
+            include_inputs = self.include_inputs
+            include_outputs = self.include_outputs
+        else:
+            include_inputs = block.name in ["inputs", "all"]
+            include_outputs = block.name in ["outputs", "all"]
+
+        # Converted descriptions aren't kept in memory (by the cache)
+        renderer = MarkdownRenderer(
+            lambda descs, one_line: self._convert_descriptions(
+                descs, one_line, memo=False
+            ),
+            self.layout,
         )
 
-        return document
+        yield "\n"
+        if self.fingerprint:
+            manifest = BlockManifest({}, self.get_fingerprint())
+            yield manifest.to_comment() + "\n"
+        if include_inputs:
+            yield f"{'#' * heading_size} Inputs\n"
+            yield from self._iter_table(path, "inputs", renderer)
+            # (named blocks end with their last table)
+            if include_outputs or block.name is None:
+                yield "\n"
+        if include_outputs:
+            yield f"{'#' * heading_size} Outputs\n"
+            yield from self._iter_table(path, "outputs", renderer)
+        yield "\n"
 
-    def save(self, filename):
-        """Writes the document to file
+    def _get_block_chunks(self, block: Block) -> Optional[StreamContent]:
+        """See _iter_block_markdown() (as bytes, None for unknown blocks)"""
+        if not self._is_generated(block):
+            log.warning(f"Unknown block '{block.name}' (left as-is)")
+            return None
+        # (remote actions are small, and already in memory)
+        if block.name == "workflows" or "uses" in block.options:
+            return self._get_block_markdown_bytes(block)
+        return (md.encode("utf-8") for md in self._iter_block_markdown(block))
+
+    def _save_yaml_streamed(self, filename: str) -> bool:
+        """Writes the document to file, streamed from the action file(s)
+
+        As _save_streamed(), but the tables are also streamed: the items
+        of the sections of the action files are read, rendered and written
+        by chunks (see _iter_table()). Neither the action configurations
+        nor the tables (nor the document) are ever entirely in memory.
 
         Args:
             filename: the file to save the resulting document to
+
+        Returns:
+            If the file changed
+
+        Raises:
+            StreamingUnsupported: if an action file can't be streamed
+                (nothing is written)
         """
-        document = self.generate()
+        with AtomicFileWriter(filename) as f:
+            with self._span("substitute", streamed=True):
+                stream_substitute(
+                    self.template_file,
+                    f,
+                    self.marker_start,
+                    self.marker_end,
+                    self._get_block_chunks,
+                    named=True,
+                    previous=False,
+                )
+            with self._span("write", file=filename):
+                return f.commit()
+
+    def save(self, filename: str) -> bool:
+        """Writes the document to file, if it changed
+
+        The file is left untouched when its content is already the
+        document. Otherwise, it's replaced atomically (i.e. it's never
+        left partially written).
+
+        Unless the template was already loaded (or set), the document is
+        streamed from the template file (see _save_streamed()). If
+        streaming, and unless the action configuration was already
+        loaded (or set), from the action file(s) too (see
+        _save_yaml_streamed()).
+
+        If fingerprinted, the file is left untouched, without generating
+        the document, when its fingerprint is the document's.
+
+        If shared, only the blocks of this action file are written, in the
+        target file's latest content (see _save_shared()), without
+        streaming.
+
+        Args:
+            filename: the file to save the resulting document to
+
+        Returns:
+            If the file changed
+        """
+        if self.fingerprint and self._target_fingerprint_matches(filename):
+            log.info(f"Unchanged '{filename}' (fingerprint)")
+            return False
+
+        # Stream from the template file, unless it's not equivalent
+        # to reading it as text (i.e. it has '\r' line endings)
+        try:
+            streamed = self._template is None and is_streamable(self.template_file)
+        except OSError as e:
+            log.error(f"Error loading '{self.template_file}': {str(e)}")
+            raise
+
+        # Previously generated rows, when not generating in-place
+        if self.incremental:
+            self._load_previous_blocks(filename)
+
+        # Stream from the action files too, unless the action
+        # configuration was already loaded (or set)
+        yaml_streamed = (
+            streamed
+            and self.streaming
+            and not self.incremental
+            and self._action_config is None
+        )
 
         try:
-            with open(filename, "w") as f:
-                f.write(document)
-                log.info(f"Wrote to '{filename}'")
+            if self.shared:
+                changed = self._save_shared(filename)
+            elif yaml_streamed:
+                try:
+                    changed = self._save_yaml_streamed(filename)
+                except StreamingUnsupported as e:
+                    log.info(f"Can't stream the action file(s) ({str(e)})")
+                    changed = self._save_streamed(filename)
+            elif streamed:
+                changed = self._save_streamed(filename)
+            else:
+                document = self.generate()
+                with self._span("write", file=filename):
+                    changed = write_if_changed(filename, document.encode("utf-8"))
         except IOError as e:
             log.error(f"Error saving '{filename}': {str(e)}")
             raise
+
+        if changed:
+            log.info(f"Wrote to '{filename}'")
+        else:
+            log.info(f"Unchanged '{filename}'")
+        return changed
+
+
+def generate_document(action_yaml: str, template: str, **kwargs) -> str:
+    """Generates a document from in-memory text (see ActionDocs.from_text())
+
+    Args:
+        action_yaml: the action configuration (YAML)
+        template: the template
+        kwargs: the other arguments of ActionDocs (e.g. a shared 'cache')
+
+    Returns:
+        The full substituted document
+    """
+    return ActionDocs.from_text(action_yaml, template, **kwargs).generate()
@@ -0,0 +1,249 @@
+import hashlib
+import importlib.util
+import json
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+# Manifest of a generated block, as a hidden HTML comment (on its own line)
+# e.g. <!--actiondocs fingerprint=... inputs=1a2b3c4d5e6f:9f8e7d6c,... outputs=...-->
+MANIFEST_PREFIX = "<!--actiondocs "
+MANIFEST_SUFFIX = "-->"
+
+# Version of the row hashes
+# (to be bumped whenever the rendering of rows changes)
+ROW_HASH_VERSION = 1
+
+# Version of the fingerprints
+# (to be bumped whenever what they cover changes)
+FINGERPRINT_VERSION = 1
+
+# Sections of the manifest with row hashes
+SECTIONS = ["inputs", "outputs"]
+
+# Separator of the hash of a row's definition and of its Markdown
+ROW_CHECK_SEPARATOR = ":"
+
+
+def row_hash(section: str, key: str, definition: dict, layout: str = "") -> str:
+    """The hash of the definition of an input or output
+
+    Args:
+        section: 'inputs' or 'outputs'
+        key: the input or output id
+        definition: the input or output configuration
+        layout: the key of the layout of the rows (see TableLayout),
+            empty for the default layout
+
+    Returns:
+        A short hash (hexadecimal)
+    """
+    values = [ROW_HASH_VERSION, section, key, definition]
+    if layout:
+        values.append(layout)
+    data = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=6).hexdigest()
+
+
+def row_check(row: str) -> str:
+    """The hash of the Markdown of a row (to detect rows edited by hand)
+
+    Returns:
+        A short hash (hexadecimal)
+    """
+    return hashlib.blake2b(row.encode("utf-8"), digest_size=4).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _generator_version() -> str:
+    """The version of the generator
+
+    The digest of the source of actiondocs and of the version module of
+    python-markdown (which is read, without importing python-markdown).
+    """
+    files = []
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    files += [os.path.join(package_dir, f) for f in sorted(os.listdir(package_dir))]
+
+    spec = importlib.util.find_spec("markdown")
+    if spec is not None and spec.submodule_search_locations:
+        files.append(os.path.join(spec.submodule_search_locations[0], "__meta__.py"))
+
+    h = hashlib.blake2b(digest_size=16)
+    for filename in files:
+        if not filename.endswith(".py"):
+            continue
+        h.update(os.path.basename(filename).encode("utf-8") + b"\0")
+        try:
+            with open(filename, "rb") as f:
+                h.update(f.read())
+        except OSError:
+            h.update(b"\0missing")
+    return h.hexdigest()
+
+
+def document_fingerprint(
+    options: dict, template_parts: Iterable, action_files: List[str]
+) -> str:
+    """The fingerprint of everything a document is generated from
+
+    Args:
+        options: the generation options
+        template_parts: the parts of the template (bytes-like) that
+            are kept as-is (i.e. outside of the generated blocks)
+        action_files: the documented action files (if an action file
+            can't be read, it's fingerprinted as missing)
+
+    Returns:
+        The fingerprint (hexadecimal)
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(
+        json.dumps(
+            [FINGERPRINT_VERSION, _generator_version(), options], sort_keys=True
+        ).encode("utf-8")
+    )
+
+    for part in template_parts:
+        h.update(len(part).to_bytes(8, "little"))
+        h.update(part)
+
+    for filename in action_files:
+        h.update(filename.encode("utf-8") + b"\0")
+        try:
+            with open(filename, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(chunk)
+        except OSError:
+            h.update(b"\0missing")
+
+    return h.hexdigest()
+
+
+class BlockManifest:
+    """The manifest of a generated block
+
+    Embedded in the block as a hidden HTML comment, it holds the
+    fingerprint of the document (see document_fingerprint()) and/or the
+    hash of the definition of each row (input or output) of the block's
+    tables, in order, with the hash of the row's Markdown (see
+    row_check()). On the next run, the whole document can be left
+    as-is if its fingerprint didn't change, and otherwise rows whose
+    hash didn't change (and that weren't edited) can be copied verbatim
+    instead of being rendered again.
+    """
+
+    __slots__ = ("rows", "fingerprint")
+
+    def __init__(
+        self,
+        rows: Optional[Dict[str, List[str]]] = None,
+        fingerprint: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            rows: the row hashes (e.g. '<definition hash>:<row check>'),
+                by section ('inputs' or 'outputs')
+            fingerprint: the fingerprint of the document
+        """
+        self.rows = rows or {}
+        self.fingerprint = fingerprint
+
+    def to_comment(self) -> str:
+        """The manifest, as a hidden HTML comment"""
+        fields = [
+            f"{section}={','.join(self.rows[section])}"
+            for section in SECTIONS
+            if section in self.rows
+        ]
+        if self.fingerprint:
+            fields.insert(0, f"fingerprint={self.fingerprint}")
+        return f"{MANIFEST_PREFIX}{' '.join(fields)}{MANIFEST_SUFFIX}"
+
+    @classmethod
+    def parse(cls, content: str) -> Optional["BlockManifest"]:
+        """Parses the manifest of a block
+
+        Args:
+            content: the content of the block
+
+        Returns:
+            The manifest, or None if there's none
+        """
+        start = content.find(MANIFEST_PREFIX)
+        if start == -1:
+            return None
+        start += len(MANIFEST_PREFIX)
+
+        end = content.find(MANIFEST_SUFFIX, start)
+        if end == -1:
+            return None
+
+        rows = {}
+        fingerprint = None
+        for field in content[start:end].split():
+            name, _, value = field.partition("=")
+            if name in SECTIONS:
+                rows[name] = value.split(",") if value else []
+            elif name == "fingerprint":
+                fingerprint = value
+
+        return cls(rows, fingerprint)
+
+
+def table_rows(content: str, header: str, start: int = 0) -> Optional[List[str]]:
+    """The rows of a generated Markdown table
+
+    Args:
+        content: the content of the block with the table
+        header: the table header row
+        start: where the generated Markdown starts in <content>
+
+    Returns:
+        The table rows (without the header and the separator rows),
+        or None if there's no such table
+    """
+    # (the header on its own line)
+    start = content.find(f"\n{header}\n", start)
+    if start == -1:
+        return None
+
+    lines = content[start + 1 :].split("\n")
+
+    rows = []
+    for line in lines[2:]:
+        if not line.startswith("|"):
+            break
+        rows.append(line)
+    return rows
+
+
+def previous_rows(
+    content: str, manifest: BlockManifest, section: str, header: str
+) -> Dict[str, str]:
+    """The rows of a previously generated table, by row hash
+
+    Args:
+        content: the content of the block with the table
+        manifest: the manifest of the block
+        section: 'inputs' or 'outputs'
+        header: the table header row
+
+    Returns:
+        The rows by hash, empty when the table and the manifest don't
+        match (e.g. rows were added), and without the rows that were
+        edited (i.e. whose Markdown doesn't match its hash)
+    """
+    # (the generated Markdown starts after the manifest)
+    start = content.find(MANIFEST_SUFFIX, content.find(MANIFEST_PREFIX))
+    hashes = manifest.rows.get(section)
+    rows = table_rows(content, header, start)
+    if hashes is None or rows is None or len(hashes) != len(rows):
+        return {}
+
+    previous = {}
+    for entry, row in zip(hashes, rows):
+        h, _, check = entry.partition(ROW_CHECK_SEPARATOR)
+        if check == row_check(row):
+            previous[h] = row
+    return previous
@@ -0,0 +1,349 @@
+import mmap
+import re
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import (
+    AnyStr,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Tuple,
+    Union,
+)
+
+# Size of the chunks copied from a template to its target (in bytes)
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class Block:
+    """The content between two markers
+
+    Either the (unnamed) block between <marker_start> and <marker_end>,
+    or a named block, whose markers are derived from them by inserting
+    a name (and options) before any trailing '-->', e.g.:
+
+        <!--doc_begin:inputs-->
+        <!--doc_end:inputs-->
+
+        <!--doc_begin:outputs path=sub/action.yml heading_size=2-->
+        <!--doc_end:outputs-->
+    """
+
+    __slots__ = ("start", "end", "name", "options", "previous")
+
+    def __init__(
+        self,
+        start: int,
+        end: int,
+        name: Optional[str] = None,
+        options: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.start = start
+        self.end = end
+        self.name = name
+        self.options = options or {}
+        # The (previous) content of the block, once substituting
+        self.previous = None
+
+    def __repr__(self) -> str:
+        return f"Block({self.start}, {self.end}, {self.name!r}, {self.options!r})"
+
+
+def find_blocks(
+    buf: AnyStr, marker_start: AnyStr, marker_end: AnyStr
+) -> List[Tuple[int, int]]:
+    """Finds the content between two markers
+
+    Finds the content from the end of the first <marker_start> to the
+    beginning of the last <marker_end> after it (i.e. greedily). In
+    linear time, without backtracking, and without copying <buf>, which
+    can be a str, bytes or mmap.
+
+    Has the same semantics as substituting the regex
+    "(?<=<marker_start>).*(?=<marker_end>)" (DOTALL) in <buf>, which
+    (very rarely) matches twice: when <marker_start> is directly
+    followed by the last <marker_end>, that empty content is
+    matched as well.
+
+    Args:
+        buf: the buffer to search
+        marker_start: the opening marker
+        marker_end: the closing marker
+
+    Returns:
+        The list of (start, end) spans of content between the markers,
+        in order (empty when there are no markers)
+    """
+    start = buf.find(marker_start)
+    if start == -1:
+        return []
+    start += len(marker_start)
+
+    end = buf.rfind(marker_end, start)
+    if end == -1:
+        return []
+
+    blocks = [(start, end)]
+
+    # Empty match at the end of a non-empty one
+    if end > start and buf[end - len(marker_start) : end] == marker_start:
+        blocks.append((end, end))
+
+    return blocks
+
+
+def _split_marker(marker: str) -> Tuple[str, str]:
+    """Splits a marker around where a block name goes
+
+    e.g. '<!--doc_begin-->' to ('<!--doc_begin', '-->')
+    """
+    if marker.endswith("-->"):
+        return marker[:-3], "-->"
+    return marker, ""
+
+
+@lru_cache(maxsize=None)
+def _named_start_regex(marker_start: str, binary: bool) -> Pattern:
+    """The regex of a named opening marker (see Block)"""
+    prefix, suffix = _split_marker(marker_start)
+    # Without a suffix, option values can't stop before it
+    value = r"\S+?" if suffix else r"\S+"
+    pattern = (
+        rf"{re.escape(prefix)}:(\w+)((?:\s+[\w-]+={value})*)\s*{re.escape(suffix)}"
+    )
+    return re.compile(pattern.encode("utf-8") if binary else pattern)
+
+
+def _named_end_marker(marker_end: str, name: str) -> str:
+    """The named closing marker of a block (see Block)"""
+    prefix, suffix = _split_marker(marker_end)
+    return f"{prefix}:{name}{suffix}"
+
+
+def find_named_blocks(buf: AnyStr, marker_start: str, marker_end: str) -> List[Block]:
+    """Finds the named blocks
+
+    Scans <buf> once, in order: each named opening marker is closed
+    by the next closing marker of the same name. Named blocks can't be
+    nested. Opening markers without a closing marker are ignored.
+
+    Args:
+        buf: the buffer to search (str, bytes or mmap)
+        marker_start: the (unnamed) opening marker
+        marker_end: the (unnamed) closing marker
+
+    Returns:
+        The named blocks, in order
+    """
+    binary = not isinstance(buf, str)
+    regex = _named_start_regex(marker_start, binary)
+
+    blocks = []
+    pos = 0
+    while True:
+        m = regex.search(buf, pos)
+        if m is None:
+            break
+
+        name, options = m.group(1), m.group(2)
+        if binary:
+            name, options = name.decode("utf-8"), options.decode("utf-8")
+
+        end_marker = _named_end_marker(marker_end, name)
+        if binary:
+            end_marker = end_marker.encode("utf-8")
+
+        end = buf.find(end_marker, m.end())
+        if end == -1:
+            pos = m.end()
+            continue
+
+        options = dict(o.split("=", 1) for o in options.split())
+        blocks.append(Block(m.end(), end, name, options))
+        pos = end + len(end_marker)
+
+    return blocks
+
+
+def find_all_blocks(buf: AnyStr, marker_start: str, marker_end: str) -> List[Block]:
+    """Finds the unnamed and named blocks
+
+    Named blocks overlapping the (greedy) unnamed block are ignored
+    (i.e. the unnamed block takes precedence, as it did before
+    named blocks).
+
+    Args:
+        buf: the buffer to search (str, bytes or mmap)
+        marker_start: the (unnamed) opening marker
+        marker_end: the (unnamed) closing marker
+
+    Returns:
+        The blocks, in order
+    """
+    if isinstance(buf, str):
+        spans = find_blocks(buf, marker_start, marker_end)
+    else:
+        spans = find_blocks(
+            buf, marker_start.encode("utf-8"), marker_end.encode("utf-8")
+        )
+
+    blocks = [Block(start, end) for start, end in spans]
+
+    for block in find_named_blocks(buf, marker_start, marker_end):
+        if not any(block.start <= end and block.end >= start for start, end in spans):
+            blocks.append(block)
+
+    return sorted(blocks, key=lambda b: b.start)
+
+
+# A replacement for the content of blocks: either the content itself, or
+# a function of the block returning the content (or None to leave it as-is)
+Replacement = Union[AnyStr, Callable[[Block], Optional[AnyStr]]]
+
+# The content of blocks when streaming, which can be chunks of bytes
+StreamContent = Union[bytes, Iterable[bytes]]
+StreamReplacement = Union[StreamContent, Callable[[Block], Optional[StreamContent]]]
+
+
+def _replacement(replacement: Replacement, block: Block) -> Optional[AnyStr]:
+    return replacement(block) if callable(replacement) else replacement
+
+
+def substitute(
+    text: str,
+    marker_start: str,
+    marker_end: str,
+    replacement: Replacement,
+    named: bool = False,
+) -> str:
+    """Replaces the content between markers in a string
+
+    See find_blocks() for the semantics of the (unnamed) markers.
+    <replacement> is inserted literally.
+
+    Args:
+        text: the string in which to substitute
+        marker_start: the opening marker
+        marker_end: the closing marker
+        replacement: the content of the blocks, or a function of
+            the block returning it (None leaves the block as-is),
+            the block's current content being its 'previous' attribute
+        named: if named blocks should be substituted too
+
+    Returns:
+        The substituted string
+    """
+    if named:
+        blocks = find_all_blocks(text, marker_start, marker_end)
+    else:
+        blocks = [Block(s, e) for s, e in find_blocks(text, marker_start, marker_end)]
+
+    parts = []
+    pos = 0
+    for block in blocks:
+        block.previous = text[block.start : block.end]
+        content = _replacement(replacement, block)
+        if content is None:
+            continue
+        parts.append(text[pos : block.start])
+        parts.append(content)
+        pos = block.end
+    parts.append(text[pos:])
+
+    return "".join(parts)
+
+
+@contextmanager
+def mapped(filename: str) -> Iterator[Union[mmap.mmap, bytes]]:
+    """Memory-maps a file (read-only)
+
+    An empty file (which mmap can't map) is b''.
+    """
+    with open(filename, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            mm = None
+
+    if mm is None:
+        yield b""
+        return
+
+    with mm:
+        yield mm
+
+
+def _copy(f: BinaryIO, view: memoryview) -> None:
+    """Copies a memoryview to a file by chunks"""
+    for i in range(0, len(view), COPY_CHUNK_SIZE):
+        f.write(view[i : i + COPY_CHUNK_SIZE])
+
+
+def stream_substitute(
+    template_file: str,
+    f: BinaryIO,
+    marker_start: str,
+    marker_end: str,
+    replacement: StreamReplacement,
+    named: bool = False,
+    previous: bool = True,
+) -> None:
+    """Replaces the content between markers from a file to another
+
+    Same as substitute(), but on bytes, from <template_file> to the
+    binary file object <f>: the template is memory-mapped, and its
+    content outside of the blocks is copied straight to <f>
+    (i.e. it's never entirely in memory).
+
+    Args:
+        template_file: the file in which to substitute
+        f: the (binary) file object to write the substituted document to
+        marker_start: the opening marker
+        marker_end: the closing marker
+        replacement: the content (bytes, or chunks of bytes) of the
+            blocks, or a function of the block returning it (None leaves
+            the block as-is), the block's current content being its
+            'previous' attribute
+        named: if named blocks should be substituted too
+        previous: if the blocks' current content should be decoded
+            (as their 'previous' attribute)
+    """
+    with mapped(template_file) as mm, memoryview(mm) as view:
+        if named:
+            blocks = find_all_blocks(mm, marker_start, marker_end)
+        else:
+            spans = find_blocks(
+                mm, marker_start.encode("utf-8"), marker_end.encode("utf-8")
+            )
+            blocks = [Block(s, e) for s, e in spans]
+
+        pos = 0
+        for block in blocks:
+            if previous:
+                block.previous = str(view[block.start : block.end], "utf-8")
+            content = _replacement(replacement, block)
+            if content is None:
+                continue
+            _copy(f, view[pos : block.start])
+            if isinstance(content, bytes):
+                f.write(content)
+            else:
+                for chunk in content:
+                    f.write(chunk)
+            pos = block.end
+        _copy(f, view[pos:])
+
+
+def is_streamable(template_file: str) -> bool:
+    """If a template can be substituted as bytes
+
+    i.e. if stream_substitute() gives the same result as reading the file
+    as (universal newlines) text, which converts '\\r\\n' and '\\r'.
+    """
+    with mapped(template_file) as mm:
+        return mm.find(b"\r") == -1
@@ -0,0 +1,135 @@
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+# Logger
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+# A function called at the end of every span, with
+# its name, duration (in seconds) and attributes
+Hook = Callable[[str, float, Dict[str, Any]], None]
+
+# Length of the excerpt of the slowest converted description
+EXCERPT_LENGTH = 80
+
+
+class Metrics:
+    """Timings and counters of a run
+
+    Spans are timed (wall-clock) phases of a run, aggregated by name,
+    e.g. 'load_yaml', 'render_inputs' or 'write'. Spans can be nested
+    (e.g. 'render_inputs' within 'substitute' when streaming), so their
+    durations can overlap. Markdown conversions (of multi-line
+    descriptions) are spans named 'convert', whose slowest is kept.
+
+    Metrics can be shared between threads (e.g. in batch mode).
+    """
+
+    def __init__(self) -> None:
+        # Spans: name -> [count, total seconds]
+        self.spans: Dict[str, List] = {}
+        self.counters: Dict[str, int] = {}
+        self.slowest_conversion = None
+        self._hooks: List[Hook] = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Hook) -> None:
+        """Adds a function called at the end of every span (see Hook)"""
+        self._hooks.append(hook)
+
+    def record(self, name: str, seconds: float, **attributes) -> None:
+        """Records a span that already ended
+
+        Args:
+            name: the name of the span
+            seconds: its duration
+            attributes: its attributes, passed to hooks
+        """
+        with self._lock:
+            span = self.spans.setdefault(name, [0, 0.0])
+            span[0] += 1
+            span[1] += seconds
+
+        for hook in self._hooks:
+            hook(name, seconds, attributes)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[None]:
+        """Times a span (see record())"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, **attributes)
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Increments a counter"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def conversion(self, md: str, seconds: float) -> None:
+        """Records a Markdown conversion
+
+        Args:
+            md: the converted Markdown
+            seconds: the duration of the conversion
+        """
+        with self._lock:
+            if self.slowest_conversion is None or seconds > self.slowest_conversion[0]:
+                self.slowest_conversion = (seconds, md[:EXCERPT_LENGTH])
+        self.record("convert", seconds, md=md)
+
+    def to_dict(self) -> dict:
+        """The metrics, as a JSON-serializable dict"""
+        with self._lock:
+            spans = {
+                name: {"count": count, "seconds": seconds}
+                for name, (count, seconds) in self.spans.items()
+            }
+            slowest = self.slowest_conversion
+
+        return {
+            "spans": spans,
+            "counters": dict(self.counters),
+            "slowest_conversion": (
+                {"seconds": slowest[0], "excerpt": slowest[1]} if slowest else None
+            ),
+        }
+
+    def to_markdown(self) -> str:
+        """The metrics, as a Markdown summary"""
+        metrics = self.to_dict()
+
+        lines = [
+            "### actiondocs metrics",
+            "|Span|Count|Total (ms)|",
+            "|----|----:|---------:|",
+        ]
+        for name, span in metrics["spans"].items():
+            lines.append(f"|{name}|{span['count']}|{span['seconds'] * 1e3:.1f}|")
+
+        if metrics["counters"]:
+            lines += ["", "|Counter|Value|", "|-------|----:|"]
+            for name, value in metrics["counters"].items():
+                lines.append(f"|{name}|{value}|")
+
+        slowest = metrics["slowest_conversion"]
+        if slowest:
+            excerpt = slowest["excerpt"].splitlines()[0] if slowest["excerpt"] else ""
+            lines += [
+                "",
+                f"Slowest conversion: {slowest['seconds'] * 1e3:.1f}ms "
+                f"(`{excerpt.replace('`', '')}`)",
+            ]
+
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, filename: str) -> None:
+        """Writes the metrics to a JSON file"""
+        with open(filename, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        log.info(f"Metrics written to '{filename}'")
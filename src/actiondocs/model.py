@@ -0,0 +1,153 @@
+from typing import Any, List, Optional
+
+# The model of an action, as documented: built from the action configuration
+# in a single (validating) pass, and rendered to any format (see renderers)
+#
+# For action configuration attributes, see:
+# https://docs.github.com/en/actions/creating-actions/metadata-syntax-for-github-actions
+
+
+class InputSpec:
+    """An input of an action"""
+
+    __slots__ = ("name", "description", "default", "required", "deprecation_message")
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        default: Optional[str] = None,
+        required: bool = False,
+        deprecation_message: Optional[str] = None,
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.default = default
+        self.required = required
+        self.deprecation_message = deprecation_message
+
+    def __repr__(self) -> str:
+        return f"InputSpec({self.name!r})"
+
+
+class OutputSpec:
+    """An output of an action"""
+
+    __slots__ = ("name", "description")
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+
+    def __repr__(self) -> str:
+        return f"OutputSpec({self.name!r})"
+
+
+def _section(config: dict, section: str) -> Optional[dict]:
+    """A section ('inputs' or 'outputs') of the action configuration
+
+    Returns:
+        The section, or None when the action doesn't have it
+    """
+    if section not in config:
+        return None
+    items = config[section]
+    if items is None:
+        return {}
+    if not isinstance(items, dict):
+        raise ValueError(f"Invalid '{section}': not a mapping")
+    return items
+
+
+def _definition(section: str, name: Any, definition: Any) -> dict:
+    """An input or output definition, with its (required) description"""
+    kind = section[:-1]
+    if not isinstance(definition, dict):
+        raise ValueError(f"Invalid {kind} '{name}': not a mapping")
+    if not isinstance(definition.get("description"), str):
+        raise ValueError(f"Invalid {kind} '{name}': 'description' must be a string")
+    return definition
+
+
+def input_spec(name: Any, definition: Any) -> InputSpec:
+    """The model of an input, from its definition (see ActionSpec.from_config())"""
+    definition = _definition("inputs", name, definition)
+    return InputSpec(
+        name=str(name),
+        description=definition["description"],
+        default=str(definition["default"]) if "default" in definition else None,
+        required=bool(definition.get("required", False)),
+        deprecation_message=(
+            str(definition["deprecationMessage"])
+            if "deprecationMessage" in definition
+            else None
+        ),
+    )
+
+
+def output_spec(name: Any, definition: Any) -> OutputSpec:
+    """The model of an output, from its definition (see ActionSpec.from_config())"""
+    definition = _definition("outputs", name, definition)
+    return OutputSpec(name=str(name), description=definition["description"])
+
+
+class ActionSpec:
+    """An action, as documented (see from_config())"""
+
+    __slots__ = ("name", "description", "inputs", "outputs")
+
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        inputs: Optional[List[InputSpec]] = None,
+        outputs: Optional[List[OutputSpec]] = None,
+    ) -> None:
+        """
+        Args:
+            name: the name of the action
+            description: the description of the action
+            inputs: the inputs, in order (None if the action has none)
+            outputs: the outputs, in order (None if the action has none)
+        """
+        self.name = name
+        self.description = description
+        self.inputs = inputs
+        self.outputs = outputs
+
+    def __repr__(self) -> str:
+        return f"ActionSpec({self.name!r})"
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ActionSpec":
+        """Builds the model of an action from its configuration
+
+        Defaults are kept as they're written (as strings, the way
+        GitHub passes inputs), and 'required' as its truth value.
+
+        Args:
+            config: the action configuration (i.e. the parsed action file)
+
+        Returns:
+            The action
+
+        Raises:
+            ValueError: if the configuration is invalid
+        """
+        if not isinstance(config, dict):
+            raise ValueError("Invalid action configuration: not a mapping")
+
+        inputs = _section(config, "inputs")
+        if inputs is not None:
+            inputs = [input_spec(k, v) for k, v in inputs.items()]
+
+        outputs = _section(config, "outputs")
+        if outputs is not None:
+            outputs = [output_spec(k, v) for k, v in outputs.items()]
+
+        return cls(
+            name=config.get("name"),
+            description=config.get("description"),
+            inputs=inputs,
+            outputs=outputs,
+        )
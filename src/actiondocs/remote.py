@@ -0,0 +1,420 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .utils import write_if_changed
+
+if TYPE_CHECKING:
+    import queue
+
+# (http.client, urllib.parse, queue and concurrent.futures are only imported
+# on first use, most documents having no remote action)
+
+# Logger
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+# Where action files of remote actions are fetched from
+DEFAULT_BASE_URL = "https://raw.githubusercontent.com"
+
+# Where the workflows using remote actions are
+WORKFLOWS_DIR = ".github/workflows"
+
+# Number of concurrent requests (and of pooled connections)
+DEFAULT_WORKERS = 8
+
+# Timeout of requests (in seconds)
+DEFAULT_TIMEOUT = 10.0
+
+# Action file names, in order of precedence
+ACTION_FILE_NAMES = ["action.yml", "action.yaml"]
+
+# A remote action reference (of a 'uses'), e.g. actions/checkout@v4
+USES_REGEX = re.compile(r"^([\w.-]+)/([\w.-]+)((?:/[^@\s]+)?)@(\S+)$")
+
+# A commit SHA, i.e. a ref whose content never changes
+PINNED_REF_REGEX = re.compile(r"^[0-9a-f]{40}$")
+
+
+class RemoteError(Exception):
+    """A remote action couldn't be fetched"""
+
+
+class ActionRef:
+    """A remote action reference, i.e. <owner>/<repo>[/<path>]@<ref>"""
+
+    __slots__ = ("owner", "repo", "path", "ref")
+
+    def __init__(self, owner: str, repo: str, path: str, ref: str) -> None:
+        self.owner = owner
+        self.repo = repo
+        self.path = path
+        self.ref = ref
+
+    @classmethod
+    def from_uses(cls, uses: str) -> "ActionRef":
+        """The reference of a step's 'uses'
+
+        Raises:
+            ValueError: if it's not a remote action (e.g. a local action,
+                './path', or a Docker image, 'docker://image')
+        """
+        m = USES_REGEX.match(uses.strip())
+        if m is None or "/.github/workflows/" in m.group(3) + "/":
+            raise ValueError(f"Not a remote action: '{uses}'")
+        owner, repo, path, ref = m.groups()
+        return cls(owner, repo, path.strip("/"), ref)
+
+    @property
+    def uses(self) -> str:
+        path = f"/{self.path}" if self.path else ""
+        return f"{self.owner}/{self.repo}{path}@{self.ref}"
+
+    @property
+    def pinned(self) -> bool:
+        """If the reference is a commit SHA (i.e. its content never changes)"""
+        return PINNED_REF_REGEX.match(self.ref) is not None
+
+    def urls(self, base_url: str) -> List[str]:
+        """The URLs of the candidate action files"""
+        from urllib.parse import quote
+
+        path = "/".join(p for p in [self.owner, self.repo, self.ref, self.path] if p)
+        return [
+            f"{base_url.rstrip('/')}/{quote(path)}/{name}" for name in ACTION_FILE_NAMES
+        ]
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ActionRef) and self.uses == other.uses
+
+    def __hash__(self) -> int:
+        return hash(self.uses)
+
+    def __repr__(self) -> str:
+        return f"ActionRef({self.uses!r})"
+
+
+def find_workflow_uses(workflows_dir: str = WORKFLOWS_DIR) -> List[ActionRef]:
+    """The remote actions used by the steps of workflows
+
+    Local actions, Docker images and reusable workflows are ignored.
+
+    Args:
+        workflows_dir: the directory of the workflow files
+
+    Returns:
+        The (unique) remote actions, sorted
+    """
+    import yaml
+
+    refs = set()
+    for filename in workflow_files(workflows_dir):
+        with open(filename, "rb") as f:
+            workflow = yaml.safe_load(f) or {}
+
+        jobs = workflow.get("jobs") if isinstance(workflow, dict) else None
+        for job in (jobs or {}).values():
+            steps = job.get("steps") if isinstance(job, dict) else None
+            for step in steps or []:
+                uses = step.get("uses") if isinstance(step, dict) else None
+                if not isinstance(uses, str):
+                    continue
+                try:
+                    refs.add(ActionRef.from_uses(uses))
+                except ValueError:
+                    log.debug(f"Skipping '{uses}' ({filename})")
+
+    return sorted(refs, key=lambda r: r.uses)
+
+
+def workflow_files(workflows_dir: str = WORKFLOWS_DIR) -> List[str]:
+    """The workflow files of a directory (sorted)"""
+    return sorted(
+        glob.glob(os.path.join(glob.escape(workflows_dir), "*.yml"))
+        + glob.glob(os.path.join(glob.escape(workflows_dir), "*.yaml"))
+    )
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections, reused between requests (and threads)
+
+    Each connection is used by one request at a time. At most <size> idle
+    connections are kept per host.
+    """
+
+    def __init__(self, size: int = DEFAULT_WORKERS, timeout: float = DEFAULT_TIMEOUT):
+        self.size = size
+        self.timeout = timeout
+        self.connections = 0
+        self._idle: Dict[Tuple[str, str], "queue.LifoQueue"] = {}
+        self._lock = threading.Lock()
+
+    def _queue(self, key: Tuple[str, str]) -> "queue.LifoQueue":
+        import queue
+
+        with self._lock:
+            if key not in self._idle:
+                self._idle[key] = queue.LifoQueue(maxsize=self.size)
+            return self._idle[key]
+
+    def _connect(self, scheme: str, netloc: str):
+        """A new (not yet connected) HTTP(S) connection"""
+        import http.client
+
+        with self._lock:
+            self.connections += 1
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(netloc, timeout=self.timeout)
+
+    def request(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """Makes a GET request, on an idle connection if any
+
+        A request failing on an idle connection (e.g. closed by the server
+        since) is made again on a new connection.
+
+        Returns:
+            The status, headers (lower-case names) and body of the response
+        """
+        import http.client
+        import queue
+        from urllib.parse import urlsplit
+
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        idle = self._queue(key)
+
+        try:
+            conn, reused = idle.get_nowait(), True
+        except queue.Empty:
+            conn, reused = self._connect(*key), False
+
+        while True:
+            try:
+                conn.request("GET", target, headers=headers or {})
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if not reused:
+                    raise
+                conn, reused = self._connect(*key), False
+
+        if response.will_close:
+            conn.close()
+        else:
+            try:
+                idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+        headers = {k.lower(): v for k, v in response.getheaders()}
+        return response.status, headers, body
+
+    def close(self) -> None:
+        """Closes the idle connections"""
+        import queue
+
+        with self._lock:
+            idles = list(self._idle.values())
+        for idle in idles:
+            while True:
+                try:
+                    idle.get_nowait().close()
+                except queue.Empty:
+                    break
+
+
+class RemoteActions:
+    """Fetches (and parses) the action files of remote actions
+
+    Action files are fetched concurrently on pooled keep-alive connections
+    (see fetch_all()), and parsed once per run. With a cache directory,
+    they're kept on disk with their ETag between runs: actions pinned to a
+    commit SHA aren't requested again, and others are requested
+    conditionally (a 304 response has no body).
+
+    Safe to share between threads (e.g. in batch mode).
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        base_url: str = DEFAULT_BASE_URL,
+        workers: int = DEFAULT_WORKERS,
+        token: Optional[str] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        """
+        Args:
+            cache_dir: the on-disk cache directory (if None, action files
+                are fetched on every run)
+            base_url: where action files are fetched from
+                (<base_url>/<owner>/<repo>/<ref>/<path>/action.yml)
+            workers: the number of concurrent requests
+            token: a GitHub token (e.g. for private repositories)
+            timeout: the timeout of requests (in seconds)
+        """
+        self.cache_dir = cache_dir
+        self.base_url = base_url
+        self.workers = workers
+        self.token = token
+        self.pool = ConnectionPool(size=workers, timeout=timeout)
+
+        self.requests = 0
+        self.not_modified = 0
+        self.cache_hits = 0
+
+        self._configs = {}
+        self._locks: Dict[ActionRef, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, "remote", key[:2], key)
+
+    def _read(self, url: str) -> Optional[dict]:
+        """The cached response of a URL: {'etag': ..., 'body': ...}"""
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, url: str, etag: Optional[str], body: Optional[str]) -> None:
+        """Caches the response of a URL
+
+        A cache that can't be written to isn't fatal (only logged).
+        """
+        if not self.cache_dir:
+            return
+        path = self._path(url)
+        entry = {"url": url, "etag": etag, "body": body}
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_if_changed(path, json.dumps(entry).encode("utf-8"))
+        except OSError as e:
+            log.warning(f"Error writing cache entry '{path}': {str(e)}")
+
+    def _get(self, url: str, pinned: bool) -> Optional[str]:
+        """The content of a URL (None if not found), cached
+
+        Args:
+            url: the URL
+            pinned: if the content of the URL never changes (including
+                not being found)
+        """
+        entry = self._read(url)
+        if entry is not None and pinned:
+            with self._lock:
+                self.cache_hits += 1
+            return entry["body"]
+
+        headers = {"User-Agent": "actiondocs"}
+        if self.token:
+            headers["Authorization"] = f"token {self.token}"
+        if entry is not None and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+
+        import http.client
+
+        try:
+            status, response_headers, body = self.pool.request(url, headers)
+        except (http.client.HTTPException, OSError) as e:
+            raise RemoteError(f"Error fetching '{url}': {str(e)}") from e
+        with self._lock:
+            self.requests += 1
+
+        if status == 304 and entry is not None:
+            with self._lock:
+                self.not_modified += 1
+            return entry["body"]
+        if status == 404:
+            if pinned:
+                self._write(url, None, None)
+            return None
+        if status != 200:
+            raise RemoteError(f"Error fetching '{url}': HTTP {status}")
+
+        text = body.decode("utf-8")
+        self._write(url, response_headers.get("etag"), text)
+        return text
+
+    def fetch(self, ref: ActionRef) -> str:
+        """The action file of a remote action (see ACTION_FILE_NAMES)
+
+        Raises:
+            RemoteError: if it can't be fetched (or doesn't exist)
+        """
+        for url in ref.urls(self.base_url):
+            text = self._get(url, ref.pinned)
+            if text is not None:
+                return text
+        raise RemoteError(f"No action file found for '{ref.uses}'")
+
+    def load(self, ref: ActionRef) -> dict:
+        """The configuration of a remote action (fetched and parsed once)
+
+        Raises:
+            RemoteError: if it can't be fetched (or parsed)
+        """
+        with self._lock:
+            lock = self._locks.setdefault(ref, threading.Lock())
+
+        # (one fetch per action, whatever the number of threads)
+        with lock:
+            if ref not in self._configs:
+                import yaml
+
+                try:
+                    config = yaml.safe_load(self.fetch(ref)) or {}
+                except yaml.YAMLError as e:
+                    config = RemoteError(f"Invalid action file of '{ref.uses}': {e}")
+                except RemoteError as e:
+                    config = e
+                self._configs[ref] = config
+
+        config = self._configs[ref]
+        if isinstance(config, RemoteError):
+            raise config
+        return config
+
+    def fetch_all(self, refs: List[ActionRef]) -> None:
+        """Fetches (and parses) remote actions concurrently
+
+        Failures are raised when their configuration is loaded
+        (see load()).
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        refs = list(dict.fromkeys(refs))
+        if not refs:
+            return
+
+        def load(ref: ActionRef) -> None:
+            try:
+                self.load(ref)
+            except RemoteError as e:
+                log.error(str(e))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(load, refs))
+
+        log.info(
+            f"Remote actions: {len(refs)} ({self.requests} requests, "
+            f"{self.not_modified} not modified, {self.cache_hits} cached)"
+        )
+
+    def close(self) -> None:
+        self.pool.close()
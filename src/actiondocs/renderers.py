@@ -0,0 +1,465 @@
+import hashlib
+import html
+import json
+import os
+from functools import lru_cache
+from string import Formatter
+from typing import Callable, Dict, List, Optional
+
+from .model import ActionSpec, InputSpec, OutputSpec
+
+# Converts descriptions (e.g. of a whole table) to HTML, in order, and
+# one-line descriptions as well if the flag is set (else kept as-is)
+Convert = Callable[[List[str], bool], List[str]]
+
+# Markdown tables header and separator rows
+INPUTS_HEADER = "|Input|Description|Default|Required|"
+INPUTS_SEPARATOR = "|-----|-----------|-------|:------:|"
+OUTPUTS_HEADER = "|Output|Description|"
+OUTPUTS_SEPARATOR = "|------|-----------|"
+
+# Markdown tables rows templates (see compile_row())
+INPUTS_ROW = "|`{name}`|{description}|{default}|{required}|"
+OUTPUTS_ROW = "|`{name}`|{description}|"
+
+DEFAULT_TEMPLATES = [INPUTS_HEADER, INPUTS_SEPARATOR, INPUTS_ROW]
+DEFAULT_TEMPLATES += [OUTPUTS_HEADER, OUTPUTS_SEPARATOR, OUTPUTS_ROW]
+
+# Fields of the rows templates of each table, in the order they're
+# passed to compiled rows (see compile_row()):
+# * name: the input or output name
+# * description: the description (converted, with its deprecation message)
+# * default: the default value as code, or 'n/a'
+# * default_value: the default value as-is (empty if none)
+# * required: 'yes' or 'no'
+# * deprecation_message: the deprecation message (empty if none)
+ROW_FIELDS = {
+    "inputs": (
+        "name",
+        "description",
+        "default",
+        "default_value",
+        "required",
+        "deprecation_message",
+    ),
+    "outputs": ("name", "description"),
+}
+
+
+def input_description(spec: InputSpec) -> str:
+    """The description of an input, with its deprecation message (if any)"""
+    if spec.deprecation_message is None:
+        return spec.description
+    return spec.description + "\n\n" + f"**Depricated:** {spec.deprecation_message}"
+
+
+@lru_cache(maxsize=None)
+def compile_row(template: str, section: str) -> Callable[..., str]:
+    """Compiles a row template into a function formatting rows
+
+    Templates are text with fields between braces, e.g. '|`{name}`|',
+    braces being escaped by doubling them (i.e. '{{' and '}}'). They're
+    compiled to a function evaluating a single f-string (i.e. as fast
+    as a hard-coded one), once per template (e.g. across batch jobs).
+
+    Args:
+        template: the row template
+        section: 'inputs' or 'outputs' (see ROW_FIELDS)
+
+    Returns:
+        The function, taking the fields (as strings) in order
+
+    Raises:
+        ValueError: if the template is invalid (e.g. an unknown field)
+    """
+    fields = ROW_FIELDS[section]
+
+    try:
+        parsed = list(Formatter().parse(template))
+    except ValueError as e:
+        raise ValueError(f"Invalid {section} row template {template!r}: {e}") from None
+
+    parts = []
+    for literal, field, format_spec, conversion in parsed:
+        if literal:
+            literal = literal.replace("{", "{{").replace("}", "}}")
+            parts.append("f" + repr(literal))
+        if field is None:
+            continue
+        if field not in fields or format_spec or conversion:
+            raise ValueError(
+                f"Invalid {section} row template {template!r}: unknown field "
+                f"{field!r} (one of: {', '.join(fields)})"
+            )
+        parts.append("f'{" + field + "}'")
+
+    source = f"lambda {', '.join(fields)}: {' '.join(parts) or repr('')}"
+    return eval(compile(source, f"<{section} row template>", "eval"), {})
+
+
+class TableLayout:
+    """The layout of the Markdown tables (header, separator and rows)
+
+    Each table has a header and a separator row (as-is), and a row
+    template (see compile_row()). Rows are single lines starting
+    with '|' (as Markdown table rows).
+    """
+
+    def __init__(
+        self, inputs: Optional[dict] = None, outputs: Optional[dict] = None
+    ) -> None:
+        """
+        Args:
+            inputs: the 'header', 'separator' and 'row' of the table of
+                inputs (each defaults to the default layout's)
+            outputs: the same, for the table of outputs
+
+        Raises:
+            ValueError: if a template is invalid
+        """
+        templates = {}
+        for section, table, defaults in [
+            ("inputs", inputs, (INPUTS_HEADER, INPUTS_SEPARATOR, INPUTS_ROW)),
+            ("outputs", outputs, (OUTPUTS_HEADER, OUTPUTS_SEPARATOR, OUTPUTS_ROW)),
+        ]:
+            table = table or {}
+            if not isinstance(table, dict):
+                raise ValueError(f"Invalid {section} layout: not a mapping")
+            unknown = set(table) - {"header", "separator", "row"}
+            if unknown:
+                raise ValueError(f"Invalid {section} layout: unknown {sorted(unknown)}")
+
+            for key, default in zip(["header", "separator", "row"], defaults):
+                template = table.get(key, default)
+                if not isinstance(template, str):
+                    raise ValueError(f"Invalid {section} {key}: not a string")
+                if not template.startswith("|") or "\n" in template:
+                    raise ValueError(
+                        f"Invalid {section} {key} {template!r}: "
+                        "not a single line starting with '|'"
+                    )
+                templates[f"{section}_{key}"] = template
+
+        self.inputs_header = templates["inputs_header"]
+        self.inputs_separator = templates["inputs_separator"]
+        self.outputs_header = templates["outputs_header"]
+        self.outputs_separator = templates["outputs_separator"]
+        self.input_row = compile_row(templates["inputs_row"], "inputs")
+        self.output_row = compile_row(templates["outputs_row"], "outputs")
+
+        # Identifies the layout (e.g. in row hashes), empty if the default
+        values = list(templates.values())
+        if values == DEFAULT_TEMPLATES:
+            self.key = ""
+        else:
+            data = json.dumps(values).encode("utf-8")
+            self.key = hashlib.blake2b(data, digest_size=6).hexdigest()
+
+    @classmethod
+    def from_file(cls, filename: str) -> "TableLayout":
+        """Loads a layout from a YAML file, e.g.:
+
+        inputs:
+          header: "|Name|Required|Description|"
+          separator: "|----|:------:|-----------|"
+          row: "|`{name}`|{required}|{description}|"
+
+        (see __init__(), missing tables and keys being the default's)
+
+        Raises:
+            ValueError: if the layout is invalid
+        """
+        import yaml
+
+        with open(filename, "rb") as f:
+            layout = yaml.safe_load(f) or {}
+        if not isinstance(layout, dict) or set(layout) - {"inputs", "outputs"}:
+            raise ValueError(f"Invalid layout '{filename}': not inputs and outputs")
+        return cls(layout.get("inputs"), layout.get("outputs"))
+
+
+@lru_cache(maxsize=32)
+def _load_layout(filename: str, mtime_ns: int, size: int) -> TableLayout:
+    return TableLayout.from_file(filename)
+
+
+def load_layout(filename: str) -> TableLayout:
+    """Loads a layout file, once per run while it's unchanged (e.g. in batch mode)
+
+    See TableLayout.from_file().
+    """
+    stat = os.stat(filename)
+    return _load_layout(os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+
+
+# The default layout
+DEFAULT_LAYOUT = TableLayout()
+
+
+class Renderer:
+    """Renders an action (see ActionSpec) to a format
+
+    Descriptions are converted with <convert>, so that renderers
+    sharing it (e.g. ActionDocs' renderers, through its cache of
+    rendered descriptions) share converted descriptions.
+    """
+
+    # If one-line descriptions are converted to HTML as well
+    # (instead of being kept as-is, i.e. as Markdown)
+    convert_one_line = False
+
+    def __init__(self, convert: Convert) -> None:
+        self.convert = convert
+
+    def _convert(self, descs: List[str]) -> List[str]:
+        return self.convert(descs, self.convert_one_line)
+
+    def render(
+        self,
+        spec: ActionSpec,
+        include_inputs: bool = True,
+        include_outputs: bool = True,
+        heading_size: int = 3,
+    ) -> str:
+        """Renders an action
+
+        Args:
+            spec: the action
+            include_inputs: if the inputs should be included
+            include_outputs: if the outputs should be included
+            heading_size: the heading size for the section titles
+
+        Returns:
+            The rendered action
+        """
+        raise NotImplementedError
+
+
+class MarkdownRenderer(Renderer):
+    """GitHub-flavoured Markdown tables (e.g. for README files)
+
+    Multi-line descriptions are converted to specific minified HTML
+    that GitHub is known to render correctly in tables. Tables are
+    laid out as per <layout> (see TableLayout).
+    """
+
+    def __init__(self, convert: Convert, layout: Optional[TableLayout] = None) -> None:
+        super().__init__(convert)
+        self.layout = layout if layout is not None else DEFAULT_LAYOUT
+
+    def input_rows(self, inputs: List[InputSpec]) -> List[str]:
+        """The rows of the Markdown table of inputs (see inputs_table())
+
+        Their descriptions are converted together.
+        """
+        descs = self._convert([input_description(spec) for spec in inputs])
+
+        row = self.layout.input_row
+        rows = []
+        for spec, desc in zip(inputs, descs):
+            # Strip any trailing end-of-line char from the action file
+            # (e.g. trailing \n on multi-line yaml)
+            default = f"`{spec.default}`" if spec.default is not None else "n/a"
+            rows.append(
+                row(
+                    spec.name,
+                    desc.rstrip(),
+                    default.rstrip(),
+                    spec.default.rstrip() if spec.default is not None else "",
+                    "yes" if spec.required else "no",
+                    spec.deprecation_message or "",
+                )
+            )
+        return rows
+
+    def output_rows(self, outputs: List[OutputSpec]) -> List[str]:
+        """The rows of the Markdown table of outputs (see input_rows())"""
+        descs = self._convert([spec.description for spec in outputs])
+        row = self.layout.output_row
+        return [row(spec.name, desc.rstrip()) for spec, desc in zip(outputs, descs)]
+
+    def inputs_table(
+        self, inputs: Optional[List[InputSpec]], reused: Optional[Dict[int, str]] = None
+    ) -> str:
+        """The Markdown table of inputs
+
+        Args:
+            inputs: the inputs (None if the action has none)
+            reused: previously rendered rows, by index, copied as-is
+
+        Returns:
+            The Markdown table
+        """
+        if inputs is None:
+            return "None"
+        reused = reused or {}
+
+        rendered = self.input_rows(
+            [spec for i, spec in enumerate(inputs) if i not in reused]
+        )
+
+        # Header and rows (unchanged or rendered, in order)
+        rendered = iter(rendered)
+        rows = [self.layout.inputs_header, self.layout.inputs_separator]
+        for i in range(len(inputs)):
+            rows.append(reused[i] if i in reused else next(rendered))
+
+        return "\n".join(rows)
+
+    def outputs_table(
+        self,
+        outputs: Optional[List[OutputSpec]],
+        reused: Optional[Dict[int, str]] = None,
+    ) -> str:
+        """The Markdown table of outputs (see inputs_table())"""
+        if outputs is None:
+            return "None"
+        reused = reused or {}
+
+        rendered = self.output_rows(
+            [spec for i, spec in enumerate(outputs) if i not in reused]
+        )
+
+        rendered = iter(rendered)
+        rows = [self.layout.outputs_header, self.layout.outputs_separator]
+        for i in range(len(outputs)):
+            rows.append(reused[i] if i in reused else next(rendered))
+
+        return "\n".join(rows)
+
+    def render(
+        self,
+        spec: ActionSpec,
+        include_inputs: bool = True,
+        include_outputs: bool = True,
+        heading_size: int = 3,
+    ) -> str:
+        md = ""
+        if include_inputs:
+            md += f"{'#' * heading_size} Inputs\n{self.inputs_table(spec.inputs)}\n"
+        if include_outputs:
+            md += f"{'#' * heading_size} Outputs\n{self.outputs_table(spec.outputs)}"
+        return md
+
+
+class HTMLRenderer(Renderer):
+    """HTML tables (e.g. for web pages)"""
+
+    convert_one_line = True
+
+    @staticmethod
+    def _table(headers: List[str], rows: List[List[str]]) -> str:
+        lines = ["<table>", "<thead>"]
+        lines.append("<tr>" + "".join(f"<th>{h}</th>" for h in headers) + "</tr>")
+        lines += ["</thead>", "<tbody>"]
+        for row in rows:
+            lines.append("<tr>" + "".join(f"<td>{c}</td>" for c in row) + "</tr>")
+        lines += ["</tbody>", "</table>"]
+        return "\n".join(lines)
+
+    def render(
+        self,
+        spec: ActionSpec,
+        include_inputs: bool = True,
+        include_outputs: bool = True,
+        heading_size: int = 3,
+    ) -> str:
+        h = f"h{heading_size}"
+        parts = []
+
+        if include_inputs:
+            parts.append(f"<{h}>Inputs</{h}>")
+            if spec.inputs is None:
+                parts.append("<p>None</p>")
+            else:
+                descs = self._convert([input_description(i) for i in spec.inputs])
+                rows = [
+                    [
+                        f"<code>{html.escape(i.name)}</code>",
+                        desc,
+                        (
+                            f"<code>{html.escape(i.default)}</code>"
+                            if i.default is not None
+                            else "n/a"
+                        ),
+                        "yes" if i.required else "no",
+                    ]
+                    for i, desc in zip(spec.inputs, descs)
+                ]
+                parts.append(
+                    self._table(["Input", "Description", "Default", "Required"], rows)
+                )
+
+        if include_outputs:
+            parts.append(f"<{h}>Outputs</{h}>")
+            if spec.outputs is None:
+                parts.append("<p>None</p>")
+            else:
+                descs = self._convert([o.description for o in spec.outputs])
+                rows = [
+                    [f"<code>{html.escape(o.name)}</code>", desc]
+                    for o, desc in zip(spec.outputs, descs)
+                ]
+                parts.append(self._table(["Output", "Description"], rows))
+
+        return "\n".join(parts) + "\n"
+
+
+class JSONRenderer(Renderer):
+    """JSON (e.g. for catalogs of actions)
+
+    Descriptions are both as written (Markdown) and converted to HTML.
+    The heading size doesn't apply.
+    """
+
+    convert_one_line = True
+
+    def render(
+        self,
+        spec: ActionSpec,
+        include_inputs: bool = True,
+        include_outputs: bool = True,
+        heading_size: int = 3,
+    ) -> str:
+        action = {"name": spec.name, "description": spec.description}
+
+        if include_inputs:
+            inputs = None
+            if spec.inputs is not None:
+                descs = self._convert([i.description for i in spec.inputs])
+                inputs = [
+                    {
+                        "name": i.name,
+                        "description": i.description,
+                        "description_html": desc,
+                        "default": i.default,
+                        "required": i.required,
+                        "deprecation_message": i.deprecation_message,
+                    }
+                    for i, desc in zip(spec.inputs, descs)
+                ]
+            action["inputs"] = inputs
+
+        if include_outputs:
+            outputs = None
+            if spec.outputs is not None:
+                descs = self._convert([o.description for o in spec.outputs])
+                outputs = [
+                    {
+                        "name": o.name,
+                        "description": o.description,
+                        "description_html": desc,
+                    }
+                    for o, desc in zip(spec.outputs, descs)
+                ]
+            action["outputs"] = outputs
+
+        return json.dumps(action, indent=2) + "\n"
+
+
+# Renderers, by format
+RENDERERS = {
+    "markdown": MarkdownRenderer,
+    "html": HTMLRenderer,
+    "json": JSONRenderer,
+}
@@ -0,0 +1,322 @@
+import hashlib
+import json
+import logging
+import os
+import socketserver
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Optional
+
+from .cache import DescriptionCache
+from .main import ActionDocs
+from .utils import MarkdownConverter, default_converter
+
+# Logger
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+# A long-running server rendering documents from in-memory text, for clients
+# rendering often (e.g. editor previews, pre-commit hooks), which would
+# otherwise start a process (and import, and convert) for every document.
+#
+# Requests and responses are JSON-RPC 2.0 messages, one per line, e.g.:
+# -> {"jsonrpc": "2.0", "id": 1, "method": "generate",
+#     "params": {"action_yaml": "...", "template": "...", "options": {...}}}
+# <- {"jsonrpc": "2.0", "id": 1, "result": "..."}
+#
+# Methods:
+#   generate(action_yaml, template, options) -> the document
+#   render(action_yaml, format, options) -> the action in a format
+#   stats() -> counters of the server (e.g. requests, cache hits)
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+# Invalid action configurations, templates, etc.
+RENDER_ERROR = -32000
+
+# Options of requests (see ActionDocs)
+OPTIONS = {
+    "include_inputs",
+    "include_outputs",
+    "heading_size",
+    "marker_start",
+    "marker_end",
+    "incremental",
+}
+
+# Number of parsed action configurations kept (by YAML text)
+CONFIGS_SIZE = 64
+
+# Number of converted descriptions kept in memory (see DescriptionCache)
+DESCRIPTIONS_SIZE = 10_000
+
+# Number of requests (of a stdio client) handled concurrently
+WORKERS = 4
+
+
+class RequestError(Exception):
+    """A request failed (see the JSON-RPC 2.0 error codes)"""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class RenderServer:
+    """Renders documents from in-memory text, keeping everything warm
+
+    Requests share a converter and a cache of converted descriptions
+    (both thread-safe), as well as parsed action configurations (by YAML
+    text), so that requests can be handled concurrently and a document
+    rendered again (e.g. after an edit of its template) costs little.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[DescriptionCache] = None,
+        converter: Optional[MarkdownConverter] = None,
+        configs_size: int = CONFIGS_SIZE,
+    ) -> None:
+        """
+        Args:
+            cache: the cache of rendered descriptions (if None, an
+                in-memory cache of DESCRIPTIONS_SIZE descriptions)
+            converter: the Markdown converter (if None, the converter
+                shared by default)
+            configs_size: the number of parsed action configurations kept
+        """
+        if cache is None:
+            cache = DescriptionCache(memo_size=DESCRIPTIONS_SIZE)
+        self.cache = cache
+        self.converter = converter if converter is not None else default_converter()
+        self.configs_size = configs_size
+        self.requests = 0
+        self.errors = 0
+        self._configs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _action_config(self, action_yaml: str) -> Any:
+        """The parsed action configuration (parsed once per YAML text)
+
+        Configurations are only read by generators, and can be shared.
+        """
+        key = hashlib.blake2b(action_yaml.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            if key in self._configs:
+                self._configs.move_to_end(key)
+                return self._configs[key]
+
+        config = ActionDocs._parse_yaml(action_yaml) or {}
+
+        with self._lock:
+            self._configs[key] = config
+            while len(self._configs) > self.configs_size:
+                self._configs.popitem(last=False)
+        return config
+
+    def _action_docs(self, action_yaml: Any, template: Any, options: Any) -> ActionDocs:
+        if not isinstance(action_yaml, str) or not isinstance(template, str):
+            raise RequestError(
+                INVALID_PARAMS, "'action_yaml' and 'template' must be strings"
+            )
+        if not isinstance(options, dict) or not OPTIONS.issuperset(options):
+            raise RequestError(
+                INVALID_PARAMS,
+                f"'options' must be a mapping of: {', '.join(sorted(OPTIONS))}",
+            )
+
+        try:
+            config = self._action_config(action_yaml)
+        except Exception as e:
+            raise RequestError(RENDER_ERROR, f"Invalid action YAML: {str(e)}") from e
+
+        return ActionDocs.from_text(
+            config,
+            template,
+            cache=self.cache,
+            converter=self.converter,
+            **options,
+        )
+
+    def generate(
+        self, action_yaml: str, template: str, options: Optional[dict] = None
+    ) -> str:
+        """Generates a document (see ActionDocs.generate())
+
+        Args:
+            action_yaml: the action configuration (YAML)
+            template: the template
+            options: the options (see OPTIONS)
+
+        Returns:
+            The full substituted document
+        """
+        action_docs = self._action_docs(action_yaml, template, options or {})
+        try:
+            return action_docs.generate()
+        except (OSError, ValueError) as e:
+            raise RequestError(RENDER_ERROR, str(e)) from e
+
+    def render(
+        self, action_yaml: str, format: str = "markdown", options: Optional[dict] = None
+    ) -> str:
+        """Renders an action in a format (see ActionDocs.render())
+
+        Args:
+            action_yaml: the action configuration (YAML)
+            format: the format, e.g. 'markdown', 'html' or 'json'
+            options: the options (see OPTIONS)
+
+        Returns:
+            The rendered action
+        """
+        action_docs = self._action_docs(action_yaml, "", options or {})
+        try:
+            return action_docs.render(format)
+        except ValueError as e:
+            raise RequestError(RENDER_ERROR, str(e)) from e
+
+    def stats(self) -> dict:
+        """Counters of the server"""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "configs": len(self._configs),
+        }
+
+    def _call(self, message: Any) -> Any:
+        """Calls the method of a request"""
+        if (
+            not isinstance(message, dict)
+            or message.get("jsonrpc") != "2.0"
+            or not isinstance(message.get("method"), str)
+        ):
+            raise RequestError(INVALID_REQUEST, "Invalid JSON-RPC 2.0 request")
+
+        method = {
+            "generate": self.generate,
+            "render": self.render,
+            "stats": self.stats,
+        }.get(message["method"])
+        if method is None:
+            raise RequestError(
+                METHOD_NOT_FOUND, f"Unknown method '{message['method']}'"
+            )
+
+        params = message.get("params", {})
+        if not isinstance(params, dict):
+            raise RequestError(INVALID_PARAMS, "'params' must be a mapping")
+        try:
+            return method(**params)
+        except TypeError as e:
+            raise RequestError(INVALID_PARAMS, str(e)) from e
+
+    def handle(self, line: str) -> Optional[str]:
+        """Handles a request
+
+        Args:
+            line: the request (JSON)
+
+        Returns:
+            The response (JSON), or None for notifications (without 'id')
+        """
+        with self._lock:
+            self.requests += 1
+
+        message, request_id = None, None
+        try:
+            try:
+                message = json.loads(line)
+            except ValueError as e:
+                raise RequestError(PARSE_ERROR, f"Invalid JSON: {str(e)}") from e
+            if isinstance(message, dict):
+                request_id = message.get("id")
+            try:
+                result = self._call(message)
+            except RequestError:
+                raise
+            except Exception as e:
+                # Never left without a response (e.g. by a bug)
+                log.exception(f"Request {request_id} failed")
+                raise RequestError(INTERNAL_ERROR, f"Internal error: {str(e)}") from e
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except RequestError as e:
+            log.warning(f"Request {request_id} failed: {e.message}")
+            with self._lock:
+                self.errors += 1
+            response = {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {"code": e.code, "message": e.message},
+            }
+
+        if isinstance(message, dict) and "id" not in message:
+            return None
+        return json.dumps(response)
+
+    def serve(self, rfile: IO[str], wfile: IO[str], workers: int = WORKERS) -> None:
+        """Handles the requests of a stream, until its end
+
+        Requests are handled concurrently (responses can be written
+        in another order than requests, as JSON-RPC allows).
+
+        Args:
+            rfile: the stream to read requests from (e.g. stdin)
+            wfile: the stream to write responses to (e.g. stdout)
+            workers: the number of requests handled concurrently
+        """
+        write_lock = threading.Lock()
+
+        def respond(line: str) -> None:
+            response = self.handle(line)
+            if response is not None:
+                with write_lock:
+                    wfile.write(response + "\n")
+                    wfile.flush()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for line in rfile:
+                if line.strip():
+                    executor.submit(respond, line)
+
+    def unix_server(self, path: str) -> socketserver.ThreadingUnixStreamServer:
+        """A server of the clients of a Unix socket (see serve_unix())"""
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    response = server.handle(line.decode("utf-8"))
+                    if response is not None:
+                        self.wfile.write(response.encode("utf-8") + b"\n")
+
+        if os.path.exists(path):
+            os.unlink(path)
+        unix_server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        unix_server.daemon_threads = True
+        return unix_server
+
+    def serve_unix(self, path: str) -> None:
+        """Handles the requests of clients of a Unix socket, until interrupted
+
+        Clients are handled concurrently (and their requests in order).
+
+        Args:
+            path: the path of the Unix socket (replaced if it exists)
+        """
+        with self.unix_server(path) as unix_server:
+            log.info(f"Serving on '{path}'")
+            try:
+                unix_server.serve_forever()
+            finally:
+                os.unlink(path)
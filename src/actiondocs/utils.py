@@ -1,35 +1,498 @@
+import hashlib
+import os
 import re
+import tempfile
+import threading
+import time
+from typing import Callable, Iterable, List, Optional, Tuple
 
-import markdown
+from . import fastmarkdown
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
-def markdown_to_github_html_for_table(md: str) -> str:
+# python-markdown extensions used to convert descriptions
+# Support code blocks w/ fenced_code
+MARKDOWN_EXTENSIONS = ["fenced_code"]
+
+# Line boundaries, as per str.splitlines()
+LINE_BREAK_RE = re.compile(r"\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+# Whitespace between html tags
+HTML_TAGS_WHITESPACE_RE = re.compile(r">\s*<")
+
+# <code ..> and </code> html tags directly inside <pre></pre>
+HTML_PRE_CODE_RE = re.compile(r"(?<=<pre>)<code.*?>|<\/code>(?=<\/pre>)")
+
+
+def is_multiline(md: str) -> bool:
     """
-    Transforms Markdown into specific HTML that renders
+    If the Markdown needs to be converted to render
     correctly in GitHub flavoured Markdown table cells.
-    (e.g. code blocks)
-    """
+    (i.e. one-line Markdown can be rendered as-is)
 
-    # If the Markdown is one line, it can be rendered as-is
-    if len(md.splitlines()) == 1:
-        return md
+    Equivalent to len(md.splitlines()) != 1, without splitting.
+    """
+    m = LINE_BREAK_RE.search(md)
+    if m is None:
+        # No line, or one line without a line break
+        return md == ""
+    # Unless it's one line with a trailing line break
+    return m.end() != len(md)
 
-    # Convert markdown to html
-    # Support code blocks w/ fenced_code
-    md = markdown.markdown(md, extensions=["fenced_code"])
 
+def html_for_table(html: str) -> str:
+    """
+    Transforms the HTML of Markdown (as rendered by python-markdown)
+    into specific HTML that renders correctly in GitHub flavoured
+    Markdown table cells.
+    """
     # Minify html tags
-    md = re.sub(r">\s*<", "><", md)
+    html = HTML_TAGS_WHITESPACE_RE.sub("><", html)
 
     # Strip <code ..> and </code> html tags when directly inside <pre></pre>
     # The 'fenced_code' python-markdown extension renders markdown
     # code blocks as <pre><code ...></code></pre> but GitHub will only
     # render code blocks preperly in tables as <pre></pre>.
     # <code></code> renders as (inline) code.
-    md = re.sub(r"(?<=<pre>)<code.*?>|<\/code>(?=<\/pre>)", "", md)
+    html = HTML_PRE_CODE_RE.sub("", html)
 
     # Convert remaining newlines to HTML breaks <br />
     # i.e. within multi-line html elements such as <p> or <pre>
-    md = "<br />".join(md.splitlines())
+    return "<br />".join(html.splitlines())
+
+
+class MarkdownConverter:
+    """Converts Markdown to HTML for GitHub flavoured Markdown table cells
+
+    Markdown is rendered by the built-in renderer (see fastmarkdown) when
+    it only uses the constructs it supports, and by python-markdown
+    otherwise (or with other extensions than the default ones): the
+    resulting HTML is the same.
+
+    Keeps a single configured python-markdown instance, which is reset
+    between conversions instead of being re-created (along with its
+    extensions) for each one. Conversions are serialized, so that a
+    converter can be shared between threads (e.g. in batch mode).
+
+    python-markdown is only imported (and configured) on the first
+    conversion the built-in renderer doesn't support: one-line
+    Markdown is rendered as-is.
+    """
+
+    def __init__(self, extensions: List[str] = MARKDOWN_EXTENSIONS) -> None:
+        self.extensions = extensions
+        self._md = None
+        self._fast = list(extensions) == MARKDOWN_EXTENSIONS
+        self._lock = threading.Lock()
+
+    def _convert(self, md: str, one_line: bool = False) -> str:
+        # If the Markdown is one line, it can be rendered as-is
+        if not one_line and not is_multiline(md):
+            return md
+
+        html = fastmarkdown.render(md) if self._fast else None
+        if html is None:
+            if self._md is None:
+                import markdown
+
+                self._md = markdown.Markdown(extensions=self.extensions)
+
+            html = self._md.reset().convert(md)
+
+        return html_for_table(html)
+
+    def convert(self, md: str) -> str:
+        """
+        Transforms Markdown into specific HTML that renders
+        correctly in GitHub flavoured Markdown table cells.
+        (e.g. code blocks)
+        """
+        with self._lock:
+            return self._convert(md)
+
+    def convert_many(
+        self,
+        mds: Iterable[str],
+        observe: Optional[Callable[[str, float], None]] = None,
+        one_line: bool = False,
+    ) -> List[str]:
+        """
+        Transforms many Markdown strings (e.g. all the cells
+        of a table), in order. See convert().
+
+        <observe>, if any, is called with each Markdown string
+        and the duration of its conversion (in seconds).
+
+        If <one_line>, one-line Markdown is converted as well
+        (e.g. for HTML documents, instead of table cells).
+        """
+        with self._lock:
+            if observe is None:
+                return [self._convert(md, one_line) for md in mds]
+
+            htmls = []
+            for md in mds:
+                start = time.perf_counter()
+                htmls.append(self._convert(md, one_line))
+                observe(md, time.perf_counter() - start)
+            return htmls
+
+
+# Minimum number of descriptions for ParallelConverter to convert in parallel
+# (below which starting worker processes costs more than it saves)
+PARALLEL_THRESHOLD = 500
+
+# Number of descriptions sent to a worker process at once
+PARALLEL_CHUNK_SIZE = 100
+
+# The converters of a worker process (by extensions)
+_worker_converters = {}
+
+
+def _convert_chunk(extensions: Tuple[str, ...], mds: List[str]) -> List[tuple]:
+    """Converts a chunk of Markdown strings, in a worker process
+
+    Returns:
+        The (html, duration) of each Markdown string, in order
+    """
+    if extensions not in _worker_converters:
+        _worker_converters[extensions] = MarkdownConverter(list(extensions))
+    converter = _worker_converters[extensions]
+
+    results = []
+    for md in mds:
+        start = time.perf_counter()
+        html = converter._convert(md)
+        results.append((html, time.perf_counter() - start))
+    return results
+
+
+class ParallelConverter(MarkdownConverter):
+    """A MarkdownConverter converting many descriptions in parallel
+
+    convert_many() sends chunks of descriptions to a pool of worker
+    processes (started on first use, and kept until closed), and
+    reassembles them in order: the result is the same as converting
+    serially. Fewer than <threshold> descriptions are converted serially.
+    """
+
+    def __init__(
+        self,
+        extensions: List[str] = MARKDOWN_EXTENSIONS,
+        workers: Optional[int] = None,
+        threshold: int = PARALLEL_THRESHOLD,
+        chunk_size: int = PARALLEL_CHUNK_SIZE,
+    ) -> None:
+        """
+        Args:
+            extensions: the python-markdown extensions
+            workers: the number of worker processes
+                (defaults to the number of processors)
+            threshold: the minimum number of descriptions
+                to convert in parallel
+            chunk_size: the number of descriptions sent to
+                a worker process at once
+        """
+        super().__init__(extensions)
+        self.workers = workers
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                from concurrent.futures import ProcessPoolExecutor
+
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def convert_many(
+        self,
+        mds: Iterable[str],
+        observe: Optional[Callable[[str, float], None]] = None,
+        one_line: bool = False,
+    ) -> List[str]:
+        """See MarkdownConverter.convert_many()
+
+        One-line Markdown (when converted) is always converted serially.
+        """
+        mds = list(mds)
+        if len(mds) < self.threshold or one_line:
+            return super().convert_many(mds, observe=observe, one_line=one_line)
+
+        # Only multi-line Markdown is actually converted
+        multiline = [i for i, md in enumerate(mds) if is_multiline(md)]
+        chunks = [
+            [mds[i] for i in multiline[start : start + self.chunk_size]]
+            for start in range(0, len(multiline), self.chunk_size)
+        ]
+
+        # (Executor.map() returns results in order)
+        extensions = tuple(self.extensions)
+        results = self._get_executor().map(
+            _convert_chunk, [extensions] * len(chunks), chunks
+        )
+
+        htmls = list(mds)
+        converted = (r for chunk in results for r in chunk)
+        for i, (html, seconds) in zip(multiline, converted):
+            htmls[i] = html
+            if observe is not None:
+                observe(mds[i], seconds)
+        return htmls
+
+    def close(self) -> None:
+        """Shuts the worker processes down (if started)"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def __enter__(self) -> "ParallelConverter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# The converter shared by default (created on first use)
+_default_converter = None
+_default_converter_lock = threading.Lock()
+
+
+def default_converter() -> MarkdownConverter:
+    """The MarkdownConverter shared by default"""
+    global _default_converter
+    if _default_converter is None:
+        with _default_converter_lock:
+            if _default_converter is None:
+                _default_converter = MarkdownConverter()
+    return _default_converter
+
+
+def markdown_to_github_html_for_table(md: str) -> str:
+    """
+    Transforms Markdown into specific HTML that renders
+    correctly in GitHub flavoured Markdown table cells.
+    (e.g. code blocks)
+    """
+    return default_converter().convert(md)
+
+
+def _file_sha256(filename: str, chunk_size: int = 1024 * 1024) -> bytes:
+    """The sha256 digest of a file, read by chunks"""
+    h = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+def _read_umask() -> int:
+    """The umask of the process
+
+    From /proc when available (Linux), as the umask can only be set
+    otherwise (i.e. it's briefly 0, for every thread of the process).
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# The umask, read once (at import, before any thread creates files)
+UMASK = _read_umask()
+
+
+def _new_file_mode() -> int:
+    """The mode of a newly created file (i.e. 0o666 minus the umask)"""
+    return 0o666 & ~UMASK
+
+
+def file_content_equals(filename: str, data: bytes) -> bool:
+    """If a file's content is <data>
+
+    Compares sizes first, and only hashes the file if they are equal.
+    A missing file never equals <data>.
+    """
+    try:
+        if os.stat(filename).st_size != len(data):
+            return False
+        return _file_sha256(filename) == hashlib.sha256(data).digest()
+    except FileNotFoundError:
+        return False
+
+
+class AtomicFileWriter:
+    """Writes a file atomically, unless it's already its content
+
+    Content is written to a temporary file in the same directory
+    (hashed along the way). On commit(), it replaces the file only if
+    the content differs, so that the file is never partially written
+    nor needlessly touched. The file's mode is kept when it already exists.
+A symbolic link is written through (its target file is replaced).
+
+    Usage:
+        with AtomicFileWriter(filename) as f:
+            f.write(b"...")
+            changed = f.commit()
+    """
+
+    def __init__(self, filename: str) -> None:
+        # (the target of a symbolic link, instead of the link)
+        self.filename = os.path.realpath(filename)
+        self.size = 0
+
+        self._hash = hashlib.sha256()
+        fd, self._tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(self.filename),
+            prefix=f".{os.path.basename(self.filename)}.",
+            suffix=".tmp",
+        )
+        self._f = open(fd, "wb")
+
+    def write(self, data: bytes) -> None:
+        self._f.write(data)
+        self._hash.update(data)
+        self.size += len(data)
+
+    def _unchanged(self) -> bool:
+        try:
+            if os.stat(self.filename).st_size != self.size:
+                return False
+            return _file_sha256(self.filename) == self._hash.digest()
+        except FileNotFoundError:
+            return False
+
+    def commit(self) -> bool:
+        """Replaces the file, if its content changed
+
+        Returns:
+            If the file changed
+        """
+        if self._unchanged():
+            self.abort()
+            return False
+
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+
+        try:
+            try:
+                mode = os.stat(self.filename).st_mode
+            except FileNotFoundError:
+                mode = _new_file_mode()
+            os.chmod(self._tmp_path, mode)
+
+            os.replace(self._tmp_path, self.filename)
+        except BaseException:
+            self.abort()
+            raise
+        return True
+
+    def abort(self) -> None:
+        """Discards the content written (the file is left untouched)"""
+        self._f.close()
+        try:
+            os.unlink(self._tmp_path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "AtomicFileWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        # Discard if not committed (e.g. on exceptions)
+        if not self._f.closed:
+            self.abort()
+
+
+def write_if_changed(filename: str, data: bytes) -> bool:
+    """Atomically writes <data> to a file, unless it's already its content
+
+    See AtomicFileWriter.
+
+    Args:
+        filename: the file to write to
+        data: the content of the file
+
+    Returns:
+        If the file changed (i.e. was written to)
+    """
+    if file_content_equals(filename, data):
+        return False
+
+    with AtomicFileWriter(filename) as f:
+        f.write(data)
+        return f.commit()
+
+
+def lock_filename(filename: str) -> str:
+    """The lock file of a file shared by writers (see FileLock)"""
+    dirname, basename = os.path.split(filename)
+    return os.path.join(dirname, f".{basename}.lock")
+
+
+class FileLock:
+    """An advisory, exclusive lock on a file (between processes and threads)
+
+    Blocks until the lock is acquired. The lock file is created if it
+    doesn't exist, and is never deleted (so that every writer always
+    locks the same file).
+
+    Usage:
+        with FileLock(lock_filename(filename)):
+            ...
+    """
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self._fd = None
+
+    def acquire(self) -> None:
+        fd = os.open(self.filename, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                # (LK_LOCK gives up after 10 attempts)
+                while True:
+                    try:
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def release(self) -> None:
+        fd, self._fd = self._fd, None
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
 
-    return md
+    def __exit__(self, *exc) -> None:
+        self.release()
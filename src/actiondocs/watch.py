@@ -0,0 +1,152 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .main import ActionDocs
+
+# Logger
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+# Interval between polls of the source files (in seconds)
+# (a few stat() calls: cheap enough to stay well below 100ms from a
+# change to the write)
+POLL_INTERVAL = 0.01
+
+# Time the source files must be left unchanged before rendering (in seconds)
+# (editors can save a file many times in a row, e.g. format-on-save, or
+# write then rename: long enough to merge them, while a change is still
+# written within 100ms)
+DEBOUNCE = 0.03
+
+# The state of a file: (size, mtime, inode), or None if it doesn't exist
+FileState = Optional[Tuple[int, int, int]]
+
+
+def _stat(filename: str) -> FileState:
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+class Watcher:
+    """Saves a document again whenever its source files change
+
+    Polls the source files of an ActionDocs (see ActionDocs.source_files),
+    which is kept between renders: only what was loaded from changed files
+    is loaded again, and descriptions already converted (by its cache)
+    aren't converted again.
+    """
+
+    def __init__(
+        self,
+        action_docs: ActionDocs,
+        target_file: str,
+        interval: float = POLL_INTERVAL,
+        debounce: float = DEBOUNCE,
+    ) -> None:
+        """
+        Args:
+            action_docs: the ActionDocs to render with
+            target_file: the file to save the document to
+            interval: the interval between polls (in seconds)
+            debounce: the time the source files must be left
+                unchanged before rendering (in seconds)
+        """
+        self.action_docs = action_docs
+        self.target_file = target_file
+        self.interval = interval
+        self.debounce = debounce
+        self.renders = 0
+        self._states: Dict[str, FileState] = {}
+
+    def _poll(self) -> List[str]:
+        """The source files that changed since the last poll"""
+        changed = []
+        for filename in self.action_docs.source_files:
+            state = _stat(filename)
+            if self._states.get(filename, state) != state:
+                changed.append(filename)
+            self._states[filename] = state
+        return changed
+
+    def _settle(self, changed: List[str]) -> List[str]:
+        """Waits for the source files to be left unchanged (see debounce)"""
+        changed = set(changed)
+        while True:
+            time.sleep(self.debounce)
+            more = self._poll()
+            if not more:
+                return sorted(changed)
+            changed.update(more)
+
+    def render(self) -> bool:
+        """Saves the document
+
+        Errors (e.g. an action file being edited isn't valid YAML)
+        are logged, and the document is left as-is.
+
+        Returns:
+            If the target file changed
+        """
+        # (files changed since the last poll are rendered as they are now)
+        for filename in self._poll():
+            self.action_docs.invalidate(filename)
+
+        start = time.perf_counter()
+        try:
+            changed = self.action_docs.save(self.target_file)
+        except Exception as e:
+            log.error(f"Error rendering '{self.target_file}': {str(e)}")
+            changed = False
+
+        self.renders += 1
+        log.info(f"Rendered in {(time.perf_counter() - start) * 1e3:.1f}ms")
+
+        # The target isn't a change, when it's a source file (e.g. the
+        # template, saved in-place), unlike other files changed meanwhile
+        target = os.path.abspath(self.target_file)
+        for filename in self._states:
+            if os.path.abspath(filename) == target:
+                self._states[filename] = _stat(filename)
+        return changed
+
+    def check(self) -> bool:
+        """Renders again if any source file changed since the last check
+
+        Returns:
+            If it rendered again
+        """
+        changed = self._poll()
+        if not changed:
+            return False
+
+        changed = self._settle(changed)
+        for filename in changed:
+            log.info(f"Changed: '{filename}'")
+            self.action_docs.invalidate(filename)
+
+        self.render()
+        return True
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """Renders, then renders again on every change
+
+        Args:
+            stop: an event to stop watching (if None, until interrupted)
+        """
+        if stop is None:
+            stop = threading.Event()
+
+        self.render()
+        log.info(f"Watching: {', '.join(self.action_docs.source_files)}")
+
+        try:
+            while not stop.wait(self.interval):
+                self.check()
+        except KeyboardInterrupt:
+            pass
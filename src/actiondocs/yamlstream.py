@@ -0,0 +1,262 @@
+from typing import Any, BinaryIO, Iterator, Optional, Tuple
+
+# Streams the items of a section ('inputs' or 'outputs') of an action file,
+# one at a time, from the YAML parser's events (see iter_section()): only
+# the current item is ever composed and constructed, so that reading an
+# action with 100k inputs takes (roughly) as much memory as with one.
+#
+# Nodes are composed the way yaml.composer.Composer does, and constructed
+# by the loader (i.e. with the same tags, types, anchors and merge keys as
+# a full load), except for what can't be streamed (see StreamingUnsupported).
+
+
+class StreamingUnsupported(Exception):
+    """An action file can't be streamed (e.g. a section that is an alias)
+
+    The action file must be loaded entirely instead.
+    """
+
+
+class _EventComposer:
+    """Composes nodes from the events of a loader (see yaml.composer.Composer)"""
+
+    def __init__(self, stream: BinaryIO, loader_class: type) -> None:
+        self.loader = loader_class(stream)
+        self.anchors = {}
+
+    def close(self) -> None:
+        self.loader.dispose()
+
+    def check(self, *choices: type) -> bool:
+        return self.loader.check_event(*choices)
+
+    def get(self):
+        return self.loader.get_event()
+
+    def _tag(self, event, kind: type, value: Optional[str] = None) -> str:
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = self.loader.resolve(kind, value, event.implicit)
+        return tag
+
+    def _anchor(self, anchor: Optional[str], node, event) -> None:
+        from yaml.composer import ComposerError
+
+        if anchor is None:
+            return
+        if anchor in self.anchors:
+            raise ComposerError(
+                f"found duplicate anchor {anchor!r}; first occurrence",
+                self.anchors[anchor].start_mark,
+                "second occurrence",
+                event.start_mark,
+            )
+        self.anchors[anchor] = node
+
+    def compose(self):
+        """Composes the node of the next event (see Composer.compose_node())"""
+        from yaml import nodes
+        from yaml.composer import ComposerError
+        from yaml.events import AliasEvent, MappingEndEvent, ScalarEvent
+        from yaml.events import SequenceEndEvent, SequenceStartEvent
+
+        event = self.get()
+        if isinstance(event, AliasEvent):
+            if event.anchor not in self.anchors:
+                raise ComposerError(
+                    None,
+                    None,
+                    f"found undefined alias {event.anchor!r}",
+                    event.start_mark,
+                )
+            return self.anchors[event.anchor]
+
+        if isinstance(event, ScalarEvent):
+            tag = self._tag(event, nodes.ScalarNode, event.value)
+            node = nodes.ScalarNode(
+                tag, event.value, event.start_mark, event.end_mark, style=event.style
+            )
+            self._anchor(event.anchor, node, event)
+            return node
+
+        if isinstance(event, SequenceStartEvent):
+            tag = self._tag(event, nodes.SequenceNode)
+            node = nodes.SequenceNode(
+                tag, [], event.start_mark, None, flow_style=event.flow_style
+            )
+            self._anchor(event.anchor, node, event)
+            while not self.check(SequenceEndEvent):
+                node.value.append(self.compose())
+        else:
+            tag = self._tag(event, nodes.MappingNode)
+            node = nodes.MappingNode(
+                tag, [], event.start_mark, None, flow_style=event.flow_style
+            )
+            self._anchor(event.anchor, node, event)
+            while not self.check(MappingEndEvent):
+                key = self.compose()
+                node.value.append((key, self.compose()))
+
+        node.end_mark = self.get().end_mark
+        return node
+
+    def skip(self) -> None:
+        """Skips the node of the next event
+
+        Without composing it, except for anchored nodes (which could be
+        referenced later on).
+        """
+        from yaml.events import AliasEvent, MappingEndEvent, ScalarEvent
+        from yaml.events import SequenceEndEvent
+
+        event = self.loader.peek_event()
+        if not isinstance(event, AliasEvent) and event.anchor is not None:
+            self.compose()
+            return
+
+        self.get()
+        if isinstance(event, (AliasEvent, ScalarEvent)):
+            return
+        # (the C parser only checks exact event classes)
+        while not self.check(SequenceEndEvent, MappingEndEvent):
+            self.skip()
+        self.get()
+
+    def construct(self, node) -> Any:
+        """Constructs the object of a node (see Constructor.construct_document())"""
+        data = self.loader.construct_object(node, deep=True)
+        # Forget the constructed objects (the next node is another item)
+        self.loader.constructed_objects = {}
+        self.loader.recursive_objects = {}
+        return data
+
+
+def _is_merge(node) -> bool:
+    return node.tag == "tag:yaml.org,2002:merge"
+
+
+def _check_rest(composer: _EventComposer, section: str) -> None:
+    """Checks the keys after a section don't include it again
+
+    (a full load keeping the last one, instead of the streamed one)
+    """
+    from yaml.events import MappingEndEvent
+
+    while not composer.check(MappingEndEvent):
+        key_node = composer.compose()
+        if _is_merge(key_node):
+            raise StreamingUnsupported("merge key in the action configuration")
+        if composer.construct(key_node) == section:
+            raise StreamingUnsupported(f"duplicate '{section}' key")
+        composer.skip()
+
+
+def _items(
+    composer: _EventComposer, stream: BinaryIO, section: str
+) -> Iterator[Tuple[Any, Any]]:
+    """The (key, value) items of the current mapping, constructed one by one
+
+    Then, the rest of the action configuration is checked (see
+    _check_rest()).
+    """
+    from yaml.events import MappingEndEvent
+
+    seen = set()
+    try:
+        while not composer.check(MappingEndEvent):
+            key_node = composer.compose()
+            if _is_merge(key_node):
+                raise StreamingUnsupported("merge key in a section")
+            key = composer.construct(key_node)
+            # (a later duplicate would replace the item, in place)
+            try:
+                if key in seen:
+                    raise StreamingUnsupported(f"duplicate key {key!r} in a section")
+                seen.add(key)
+            except TypeError:
+                raise StreamingUnsupported(f"unhashable key {key!r}") from None
+
+            yield key, composer.construct(composer.compose())
+
+        composer.get()
+        _check_rest(composer, section)
+    finally:
+        composer.close()
+        stream.close()
+
+
+def iter_section(
+    filename: str, section: str, loader_class: type
+) -> Optional[Iterator[Tuple[Any, Any]]]:
+    """The items of a section of an action file, constructed one by one
+
+    The action file is parsed up to the section, and then item by item
+    as the items are consumed. Nodes of other sections aren't composed
+    (except for anchored nodes).
+
+    Args:
+        filename: the action file
+        section: 'inputs' or 'outputs'
+        loader_class: the (safe) loader class, e.g. yaml.CSafeLoader
+
+    Returns:
+        The (name, definition) items of the section (empty if it's null),
+        or None if the action doesn't have the section
+
+    Raises:
+        StreamingUnsupported: if the action file can't be streamed
+            (e.g. it's empty, the section is an alias, or the section
+            key is duplicated), possibly while consuming the items
+        yaml.YAMLError: if the action file is invalid
+    """
+    from yaml import nodes
+    from yaml.events import (
+        DocumentStartEvent,
+        MappingEndEvent,
+        MappingStartEvent,
+        ScalarEvent,
+    )
+
+    stream = open(filename, "rb")
+    composer = _EventComposer(stream, loader_class)
+    try:
+        composer.get()
+        if not composer.check(DocumentStartEvent):
+            raise StreamingUnsupported("empty action file")
+        composer.get()
+        if not composer.check(MappingStartEvent):
+            raise StreamingUnsupported("action configuration isn't a mapping")
+        event = composer.get()
+        if composer._tag(event, nodes.MappingNode) != "tag:yaml.org,2002:map":
+            raise StreamingUnsupported("action configuration isn't a mapping")
+
+        while not composer.check(MappingEndEvent):
+            key_node = composer.compose()
+            if _is_merge(key_node):
+                raise StreamingUnsupported("merge key in the action configuration")
+            if composer.construct(key_node) != section:
+                composer.skip()
+                continue
+
+            event = composer.loader.peek_event()
+            if isinstance(event, ScalarEvent):
+                if composer.construct(composer.compose()) is not None:
+                    raise StreamingUnsupported(f"'{section}' isn't a mapping")
+                _check_rest(composer, section)
+                composer.close()
+                stream.close()
+                return iter(())
+            if not isinstance(event, MappingStartEvent) or event.anchor is not None:
+                raise StreamingUnsupported(f"'{section}' isn't a plain mapping")
+            if composer._tag(event, nodes.MappingNode) != "tag:yaml.org,2002:map":
+                raise StreamingUnsupported(f"'{section}' isn't a mapping")
+            composer.get()
+            return _items(composer, stream, section)
+    except BaseException:
+        composer.close()
+        stream.close()
+        raise
+
+    composer.close()
+    stream.close()
+    return None
@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from corpus import generate_action_yaml, generate_template
+
+from actiondocs import ActionDocs
+from actiondocs.markers import Block, substitute
+
+# Benchmarks ActionDocs on synthetic action files and templates
+# Every phase is timed separately, and its peak memory recorded
+# Usage: python tests/benchmark.py [--output results.json]
+
+# Number of inputs (and outputs) of the synthetic action files
+DEFAULT_INPUTS = [10, 1000, 10000, 100000]
+
+# Sizes of the synthetic templates
+DEFAULT_TEMPLATE_SIZES = ["1KB", "1MB", "50MB"]
+
+SIZE_UNITS = {"KB": 1024, "MB": 1024**2, "GB": 1024**3}
+
+
+def parse_size(size: str) -> int:
+    """Parses a size (e.g. '50MB') to bytes"""
+    for unit, factor in SIZE_UNITS.items():
+        if size.upper().endswith(unit):
+            return int(float(size[: -len(unit)]) * factor)
+    return int(size)
+
+
+def _phases(
+    action_file: str, template_file: str, target_file: str
+) -> Dict[str, Callable]:
+    """The phases of a run, in order, sharing the same ActionDocs"""
+    ad = ActionDocs(action_file=action_file, template_file=template_file)
+    state = {}
+
+    def load_yaml():
+        ad.action_config
+
+    def load_template():
+        ad.template
+
+    def render_tables():
+        state["md"] = ad._get_block_markdown(Block(0, 0))
+
+    def substitute_markers():
+        substitute(ad.template, ad.marker_start, ad.marker_end, state["md"])
+
+    def save():
+        # Streamed from the template file (the tables are already rendered)
+        ad.template = None
+        ad.save(target_file)
+
+    return {
+        "load_yaml": load_yaml,
+        "load_template": load_template,
+        "render_tables": render_tables,
+        "substitute": substitute_markers,
+        "save": save,
+    }
+
+
+def _run(action_file: str, template_file: str, tmp_dir: str) -> Dict[str, dict]:
+    """Runs all phases, timed, then again, with memory tracing"""
+    results = {}
+
+    # Timing
+    target_file = os.path.join(tmp_dir, "target_timing.md")
+    for name, phase in _phases(action_file, template_file, target_file).items():
+        start = time.perf_counter()
+        phase()
+        results[name] = {"seconds": time.perf_counter() - start}
+
+    # Peak memory (separately, since tracing slows everything down)
+    target_file = os.path.join(tmp_dir, "target_memory.md")
+    tracemalloc.start()
+    try:
+        for name, phase in _phases(action_file, template_file, target_file).items():
+            tracemalloc.clear_traces()
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            phase()
+            results[name]["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return results
+
+
+def run_benchmark(inputs: List[int], template_sizes: List[int]) -> dict:
+    """Benchmarks every combination of action file and template sizes
+
+    Args:
+        inputs: the numbers of inputs (and outputs) of the action files
+        template_sizes: the sizes of the templates (in bytes)
+
+    Returns:
+        The results
+    """
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n in inputs:
+            action_file = os.path.join(tmp_dir, f"action_{n}.yml")
+            with open(action_file, "w") as f:
+                f.write(generate_action_yaml(inputs=n, outputs=n))
+
+            for size in template_sizes:
+                template_file = os.path.join(tmp_dir, f"template_{size}.md")
+                if not os.path.exists(template_file):
+                    with open(template_file, "w") as f:
+                        f.write(generate_template(size))
+
+                phases = _run(action_file, template_file, tmp_dir)
+                results.append(
+                    {
+                        "inputs": n,
+                        "outputs": n,
+                        "template_size": size,
+                        "phases": phases,
+                    }
+                )
+
+                summary = ", ".join(
+                    f"{k} {v['seconds'] * 1e3:.1f}ms/{v['peak_bytes'] / 1024**2:.1f}MB"
+                    for k, v in phases.items()
+                )
+                print(f"{n} inputs, {size} bytes template: {summary}", file=sys.stderr)
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks ActionDocs")
+    parser.add_argument(
+        "--inputs",
+        type=int,
+        nargs="+",
+        default=DEFAULT_INPUTS,
+        help="numbers of inputs (and outputs) (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--template-sizes",
+        nargs="+",
+        default=DEFAULT_TEMPLATE_SIZES,
+        help="sizes of the templates (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--output",
+        default="benchmark.json",
+        help="the JSON results file (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.inputs, [parse_size(s) for s in args.template_sizes])
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import random
+from typing import List
+
+# Synthetic action files and templates, for benchmarks and equivalence tests
+
+# Description kinds, and their weights
+DESCRIPTION_KINDS = {
+    "single_line": 5,
+    "multi_line": 3,
+    "fenced_code": 2,
+}
+
+# Proportion of inputs with a deprecation message
+DEPRECATED_RATIO = 0.1
+
+# A line of template filler text
+FILLER_LINE = "Lorem ipsum dolor sit amet, *consectetur* adipiscing `elit`.\n"
+
+# Fragments of the lines of Markdown descriptions: the common
+# subset (code, emphasis, links)...
+INLINE_FRAGMENTS = [
+    "Does thing",
+    "with some details",
+    " ",
+    "`code`",
+    "`a < b && c`",
+    "` spaced `",
+    "**bold**",
+    "*italics*",
+    "**two words**",
+    "a*b*c",
+    "[a link](https://github.com/a_b?c=1&d=2)",
+    "[`code` link](#anchor)",
+    "[*em* link](./README.md)",
+    "x > y",
+    '"quoted"',
+    ":warning:",
+    "(see below)",
+    "1.",
+    "-",
+]
+
+# ... and some of everything else
+UNSUPPORTED_FRAGMENTS = [
+    "*",
+    "***",
+    "``",
+    "snake_case",
+    "<b>html</b>",
+    "<https://github.com>",
+    "&amp;",
+    "\\*",
+    "![image](a.png)",
+    "[ref][1]",
+    "two  ",
+]
+
+# Proportion of unsupported fragments
+UNSUPPORTED_RATIO = 0.02
+
+# Blocks of Markdown descriptions, and their weights
+BLOCK_KINDS = {
+    "paragraph": 6,
+    "fenced_code": 2,
+    "list": 2,
+    "blockquote": 1,
+    # Not supported
+    "header": 0.2,
+    "rule": 0.2,
+    "indented": 0.2,
+}
+
+
+def _description(rng: random.Random, i: int) -> str:
+    """A random description (as a YAML value, indented for an input/output)"""
+    kind = rng.choices(
+        list(DESCRIPTION_KINDS.keys()), weights=list(DESCRIPTION_KINDS.values())
+    )[0]
+
+    if kind == "single_line":
+        return f"Does thing {i} with `code`, **bold** and [a link](https://github.com)"
+
+    lines = [f"Does thing {i}.", "", "With *some* details", "over two lines."]
+    if kind == "fenced_code":
+        lines += ["", "```yaml", f"foo: {i}", "bar:", "  - baz", "```"]
+
+    return "|\n" + "".join(f"      {line}\n" if line else "\n" for line in lines)
+
+
+def _markdown_line(rng: random.Random) -> str:
+    """A random line of a Markdown description"""
+    fragments = [
+        rng.choice(
+            UNSUPPORTED_FRAGMENTS
+            if rng.random() < UNSUPPORTED_RATIO
+            else INLINE_FRAGMENTS
+        )
+        for _ in range(rng.randint(1, 5))
+    ]
+    return " ".join(fragments).strip() or "text"
+
+
+def _markdown_block(rng: random.Random) -> str:
+    """A random block of a Markdown description"""
+    kind = rng.choices(list(BLOCK_KINDS.keys()), weights=list(BLOCK_KINDS.values()))[0]
+    lines = [_markdown_line(rng) for _ in range(rng.randint(1, 3))]
+
+    if kind == "fenced_code":
+        fence = rng.choice(["```", "~~~"])
+        lang = rng.choice(["", "yaml", "bash"])
+        code = rng.choice(["foo: bar", 'run: echo "<a> & b"', "  - indented", ""])
+        return f"{fence}{lang}\n{code}\n{fence}"
+    if kind == "list":
+        marker = rng.choice(["* ", "- ", "1. "])
+        return "\n".join(marker + line for line in lines)
+    if kind == "blockquote":
+        return "\n".join("> " + line for line in lines)
+    if kind == "header":
+        return "### " + lines[0]
+    if kind == "rule":
+        return "\n".join(lines) + "\n---"
+    if kind == "indented":
+        return "\n".join("    " + line for line in lines)
+    return "\n".join(lines)
+
+
+def generate_markdown(count: int, seed: int = 0) -> List[str]:
+    """Generates synthetic multi-line Markdown descriptions
+
+    Args:
+        count: the number of descriptions
+        seed: the random seed (the same seed generates the same descriptions)
+
+    Returns:
+        The descriptions
+    """
+    rng = random.Random(seed)
+    mds = []
+    for _ in range(count):
+        blocks = [_markdown_block(rng) for _ in range(rng.randint(1, 4))]
+        separators = rng.choices(["\n", "\n\n", "\n\n\n"], k=len(blocks))
+        md = "".join(sep + block for sep, block in zip(separators, blocks))
+        mds.append(md.lstrip("\n") + "\n")
+    return mds
+
+
+def generate_action_yaml(inputs: int, outputs: int, seed: int = 0) -> str:
+    """Generates a synthetic action file
+
+    Args:
+        inputs: the number of inputs
+        outputs: the number of outputs
+        seed: the random seed (the same seed generates the same file)
+
+    Returns:
+        The action file YAML
+    """
+    rng = random.Random(seed)
+    parts = [f"name: Synthetic action ({inputs} inputs, {outputs} outputs)\n"]
+
+    if inputs:
+        parts.append("inputs:\n")
+    for i in range(inputs):
+        parts.append(f"  input_{i}:\n")
+        parts.append(f"    description: {_description(rng, i)}")
+        if not parts[-1].endswith("\n"):
+            parts.append("\n")
+        if rng.random() < 0.5:
+            parts.append(f"    default: value_{i}\n")
+        if rng.random() < 0.3:
+            parts.append("    required: true\n")
+        if rng.random() < DEPRECATED_RATIO:
+            parts.append(f"    deprecationMessage: Use input_{i + 1} instead\n")
+
+    if outputs:
+        parts.append("outputs:\n")
+    for i in range(outputs):
+        parts.append(f"  output_{i}:\n")
+        parts.append(f"    description: {_description(rng, i)}")
+        if not parts[-1].endswith("\n"):
+            parts.append("\n")
+
+    return "".join(parts)
+
+
+def generate_template(
+    size: int,
+    marker_start: str = "<!--doc_begin-->",
+    marker_end: str = "<!--doc_end-->",
+) -> str:
+    """Generates a synthetic template, with markers in the middle
+
+    Args:
+        size: the approximate size of the template (in bytes)
+        marker_start: the opening marker
+        marker_end: the closing marker
+
+    Returns:
+        The template
+    """
+    half = FILLER_LINE * max(1, size // len(FILLER_LINE) // 2)
+    return f"{half}{marker_start}\nTo be replaced\n{marker_end}\n{half}"
@@ -0,0 +1,899 @@
+import argparse
+import copy
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import corpus
+import markdown
+import yaml
+
+from actiondocs import ActionDocs
+from actiondocs.utils import ParallelConverter, markdown_to_github_html_for_table
+
+# Differential equivalence harness: randomized action files and templates
+# (see generate_case()) are rendered by a reference engine (by default, the
+# baseline implementation, see baseline_generate()) and a candidate engine
+# (e.g. an optimized path), whose outputs must be byte-identical.
+# The first divergence is reported with a minimized reproducer, along with
+# the throughput of both engines (see compare()).
+#
+# Usage: python tests/differential.py --candidate streaming --cases 1000
+
+# Text of names, descriptions and template lines, beyond ASCII
+UNICODE_FRAGMENTS = [
+    "héllo wörld",
+    "日本語のテキスト",
+    "emoji 🚀✨",
+    "עברית",
+    "e\u0301 (combining)",
+    "zero\u200bwidth",
+    "Ω≈ç√∫",
+    "ｆｕｌｌｗｉｄｔｈ",
+    "line\u2028separator",
+]
+
+# Fenced code blocks, incl. nested and unclosed fences
+FENCED_BLOCKS = [
+    "```\ncode\n```",
+    "```yaml\nfoo: bar\n```",
+    "````\n```\ninner\n```\n````",
+    "```\n~~~\ninner\n~~~\n```",
+    "~~~~\n~~~\n~~~~",
+    '```bash   \necho "<a> & b"\n```',
+    "```\nnot closed",
+    "  ```\nindented fence\n  ```",
+    "```\n\n\nblank lines\n\n```",
+]
+
+# Styles of YAML scalars (see _scalar())
+STYLES = ["json", "literal", "literal_keep", "literal_strip", "folded"]
+
+# Raw YAML scalars (i.e. not strings)
+RAW_DEFAULTS = ["1.5", "true", "~", "0o17", "[a, b]", "''"]
+
+# Names of inputs and outputs
+NAMES = ["in", "in-dash", "in_snake", "日本", "with space", "a|b", "`tick`"]
+
+# Lines of templates, outside of blocks
+TEMPLATE_LINES = [
+    "# Title",
+    "",
+    corpus.FILLER_LINE.rstrip("\n"),
+    "Trailing spaces   ",
+    "<!--doc_begin-- > not a marker",
+    "<!-- doc_begin -->",
+    # (unnamed markers, but not on their own line)
+    "Stray <!--doc_end--> marker",
+    "Inline <!--doc_begin--> marker",
+    "Empty <!--doc_begin--><!--doc_end--> block",
+    "| a | table |",
+    "```",
+] + UNICODE_FRAGMENTS
+
+# Stale content of blocks (i.e. previously generated)
+STALE_LINES = [
+    "To be replaced",
+    "|Input|Description|Default|Required|",
+    "|-----|-----------|-------|:------:|",
+    "|`old`|stale|n/a|no|",
+    "<!--actiondocs inputs=0123456789ab outputs=-->",
+    "",
+]
+
+# Generated blocks (name, options), None being the unnamed block
+BLOCKS = [
+    (None, ""),
+    ("inputs", ""),
+    ("outputs", ""),
+    ("all", " heading_size=2"),
+    ("inputs", " heading_size=4"),
+    ("other", ""),
+]
+
+
+class Case:
+    """An action file and a template (see generate_case())
+
+    Inputs and outputs are (name, {key: (value, style)}) items, rendered
+    to YAML as per their style (see _scalar()). The template is lines,
+    with markers on their own.
+    """
+
+    def __init__(
+        self,
+        inputs: Optional[List[Tuple[str, Dict[str, Tuple[str, str]]]]],
+        outputs: Optional[List[Tuple[str, Dict[str, Tuple[str, str]]]]],
+        template: List[str],
+        options: Optional[Dict[str, Any]] = None,
+        final_newline: bool = True,
+        crlf: bool = False,
+        bom: bool = False,
+        action_crlf: bool = False,
+        action_bom: bool = False,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            inputs: the inputs (None if the action has none)
+            outputs: the outputs (None if the action has none)
+            template: the lines of the template
+            options: the options of ActionDocs (e.g. 'heading_size')
+            final_newline: if the template ends with a newline
+            crlf: if the template has '\\r\\n' line endings
+            bom: if the template starts with a UTF-8 BOM
+            action_crlf: if the action file has '\\r\\n' line endings
+            action_bom: if the action file starts with a UTF-8 BOM
+            seed: the seed the case was generated from (if any)
+        """
+        self.inputs = inputs
+        self.outputs = outputs
+        self.template = template
+        self.options = options or {}
+        self.final_newline = final_newline
+        self.crlf = crlf
+        self.bom = bom
+        self.action_crlf = action_crlf
+        self.action_bom = action_bom
+        self.seed = seed
+
+    def _replace(self, **changes) -> "Case":
+        case = copy.deepcopy(self)
+        for name, value in changes.items():
+            setattr(case, name, value)
+        return case
+
+    def action_yaml(self) -> bytes:
+        """The action file"""
+        lines = ["name: Differential action", "description: " + _scalar("A", "json", 0)]
+        for section, items in [("inputs", self.inputs), ("outputs", self.outputs)]:
+            if items is None:
+                continue
+            lines.append(f"{section}:" + ("" if items else " null"))
+            for name, definition in items:
+                lines.append(f"  {json.dumps(name, ensure_ascii=False)}:")
+                for key, (value, style) in definition.items():
+                    lines.append(f"    {key}: {_scalar(value, style, 4)}")
+
+        text = "\n".join(lines) + "\n"
+        if self.action_crlf:
+            text = text.replace("\n", "\r\n")
+        return ("\ufeff" if self.action_bom else "").encode("utf-8") + text.encode(
+            "utf-8"
+        )
+
+    def template_text(self) -> bytes:
+        """The template"""
+        newline = "\r\n" if self.crlf else "\n"
+        text = newline.join(self.template) + (newline if self.final_newline else "")
+        return (("\ufeff" if self.bom else "") + text).encode("utf-8")
+
+    def shrink(self) -> Iterator["Case"]:
+        """Smaller variants of the case (see minimize())"""
+        # Whole sections, then items, then keys and values
+        for section in ["inputs", "outputs"]:
+            items = getattr(self, section)
+            if items is None:
+                continue
+            yield self._replace(**{section: None})
+            for i in range(len(items)):
+                yield self._replace(**{section: items[:i] + items[i + 1 :]})
+            for i, (name, definition) in enumerate(items):
+                for key, (value, style) in definition.items():
+                    if key != "description":
+                        smaller = copy.deepcopy(items)
+                        del smaller[i][1][key]
+                        yield self._replace(**{section: smaller})
+                    for shorter in _shrink_text(value):
+                        smaller = copy.deepcopy(items)
+                        smaller[i][1][key] = (shorter, style)
+                        yield self._replace(**{section: smaller})
+                    if style != "json":
+                        smaller = copy.deepcopy(items)
+                        smaller[i][1][key] = (value, "json")
+                        yield self._replace(**{section: smaller})
+
+        # Lines of the template (markers last, by pairs)
+        for i, line in enumerate(self.template):
+            if not _is_marker(line):
+                yield self._replace(template=self.template[:i] + self.template[i + 1 :])
+        for i, line in enumerate(self.template):
+            if _is_marker(line) and "_begin" in line:
+                end = next(
+                    (
+                        j
+                        for j in range(i + 1, len(self.template))
+                        if _is_marker(self.template[j])
+                    ),
+                    None,
+                )
+                if end is not None:
+                    yield self._replace(
+                        template=self.template[:i] + self.template[end + 1 :]
+                    )
+
+        # Options and encodings
+        for name in ["crlf", "bom", "action_crlf", "action_bom"]:
+            if getattr(self, name):
+                yield self._replace(**{name: False})
+        if not self.final_newline:
+            yield self._replace(final_newline=True)
+        for name in list(self.options):
+            options = dict(self.options)
+            del options[name]
+            yield self._replace(options=options)
+
+    def __str__(self) -> str:
+        return (
+            f"# seed={self.seed} options={self.options!r}\n"
+            f"action.yml = {self.action_yaml()!r}\n"
+            f"README.md = {self.template_text()!r}"
+        )
+
+
+def _is_marker(line: str) -> bool:
+    return (
+        line.startswith("<!--doc_begin")
+        and line.endswith("-->")
+        or (line.startswith("<!--doc_end") and line.endswith("-->"))
+    )
+
+
+def _scalar(text: str, style: str, indent: int) -> str:
+    """A YAML scalar, as the value of a key at <indent>
+
+    Block scalars have an explicit indentation indicator, so that their
+    content can start with spaces. Their chomping (i.e. their trailing
+    newlines) depends on the style: 'literal' (clip), 'literal_keep'
+    and 'literal_strip'.
+    """
+    if style == "raw":
+        return text
+    if style == "json":
+        # (line and paragraph separators are line breaks in YAML)
+        quoted = json.dumps(text, ensure_ascii=False)
+        for char in ["\u2028", "\u2029", "\x85"]:
+            quoted = quoted.replace(char, f"\\u{ord(char):04x}")
+        return quoted
+
+    indicator = {
+        "literal": "|2",
+        "literal_keep": "|2+",
+        "literal_strip": "|2-",
+        "folded": ">2",
+    }[style]
+    padding = " " * (indent + 2)
+    lines = text.split("\n")
+    return indicator + "".join(
+        "\n" + (padding + line if line else "") for line in lines
+    )
+
+
+def _shrink_text(text: str) -> Iterator[str]:
+    """Smaller variants of a text: without a line, then without a character"""
+    lines = text.split("\n")
+    if len(lines) > 1:
+        for i in range(len(lines)):
+            yield "\n".join(lines[:i] + lines[i + 1 :])
+    if len(text) <= 80:
+        for i in range(len(text)):
+            yield text[:i] + text[i + 1 :]
+
+
+def generate_markdown(rng: random.Random) -> str:
+    """A random description, of every kind of Markdown (see corpus)"""
+    blocks = []
+    for _ in range(rng.randint(1, 4)):
+        kind = rng.random()
+        if kind < 0.2:
+            blocks.append(rng.choice(FENCED_BLOCKS))
+        elif kind < 0.35:
+            blocks.append(rng.choice(UNICODE_FRAGMENTS))
+        elif kind < 0.45:
+            blocks.append("**Deprecated:** " + rng.choice(UNICODE_FRAGMENTS))
+        else:
+            blocks.append(corpus.generate_markdown(1, seed=rng.random())[0].rstrip())
+    separators = rng.choices(["\n", "\n\n"], k=len(blocks))
+    md = "".join(sep + block for sep, block in zip(separators, blocks)).lstrip("\n")
+    # Single line, or trailing newlines (e.g. of YAML block scalars)
+    if rng.random() < 0.3:
+        return md.split("\n")[0]
+    return md + rng.choice(["", "\n", "\n\n", "\n\n\n"])
+
+
+def _items(rng: random.Random, section: str) -> list:
+    items = []
+    names = set()
+    for i in range(rng.randint(0, 5)):
+        name = f"{rng.choice(NAMES)}_{i}"
+        names.add(name)
+
+        definition = {
+            "description": (generate_markdown(rng), rng.choice(STYLES + ["json"]))
+        }
+        if section == "inputs":
+            if rng.random() < 0.5:
+                if rng.random() < 0.3:
+                    definition["default"] = (rng.choice(RAW_DEFAULTS), "raw")
+                else:
+                    default = rng.choice(["v", "", "a|b", "  spaced  ", "multi\nline"])
+                    definition["default"] = (default, "json")
+            if rng.random() < 0.4:
+                definition["required"] = (rng.choice(["true", "false", "yes"]), "raw")
+            if rng.random() < 0.3:
+                message = rng.choice(UNICODE_FRAGMENTS + ["Use `other` instead"])
+                definition["deprecationMessage"] = (message, "json")
+        else:
+            if rng.random() < 0.3:
+                definition["value"] = ("${{ steps.step.outputs.out }}", "json")
+        items.append((name, definition))
+    return items
+
+
+def generate_case(seed: int) -> Case:
+    """A random case: action file, template and options
+
+    Covers unicode (incl. BOMs and line separators), '\\r\\n' line
+    endings, nested and unclosed fences, YAML block scalars of every
+    chomping, deprecation messages, stale and nested blocks, and markers
+    at the boundaries of the template.
+
+    Args:
+        seed: the random seed (the same seed generates the same case)
+
+    Returns:
+        The case
+    """
+    rng = random.Random(seed)
+
+    sections = {}
+    for section in ["inputs", "outputs"]:
+        kind = rng.random()
+        sections[section] = None if kind < 0.1 else [] if kind < 0.2 else None
+        if kind >= 0.2:
+            sections[section] = _items(rng, section)
+
+    # Blocks, with lines in between (or markers at the boundaries)
+    template = []
+    blocks = rng.sample(BLOCKS, rng.randint(1, 3))
+    for name, options in blocks:
+        if template or rng.random() < 0.7:
+            template += rng.sample(TEMPLATE_LINES, rng.randint(0, 3))
+        suffix = f":{name}" if name else ""
+        template.append(f"<!--doc_begin{suffix}{options}-->")
+        template += rng.sample(STALE_LINES, rng.randint(0, 3))
+        # (a named block in the unnamed block, which takes precedence)
+        if name is None and rng.random() < 0.2:
+            template += ["<!--doc_begin:outputs-->", "<!--doc_end:outputs-->"]
+        template.append(f"<!--doc_end{suffix}-->")
+    if rng.random() < 0.7:
+        template += rng.sample(TEMPLATE_LINES, rng.randint(1, 3))
+
+    options = {}
+    if rng.random() < 0.3:
+        options["include_inputs"] = rng.random() < 0.5
+    if rng.random() < 0.3:
+        options["include_outputs"] = rng.random() < 0.5
+    if rng.random() < 0.3:
+        options["heading_size"] = rng.randint(1, 4)
+
+    case = Case(
+        sections["inputs"],
+        sections["outputs"],
+        template,
+        options=options,
+        final_newline=rng.random() < 0.8,
+        crlf=rng.random() < 0.2,
+        bom=rng.random() < 0.1,
+        action_crlf=rng.random() < 0.2,
+        action_bom=rng.random() < 0.1,
+        seed=seed,
+    )
+
+    # (scalars that YAML can't represent as-is are quoted instead)
+    try:
+        yaml.safe_load(case.action_yaml())
+    except yaml.YAMLError:
+        for items in [case.inputs or [], case.outputs or []]:
+            for _, definition in items:
+                for key, (value, style) in definition.items():
+                    if style != "raw":
+                        definition[key] = (value, "json")
+    return case
+
+
+class CaseFiles:
+    """The files of a case, in a directory of their own"""
+
+    def __init__(self, case: Case, directory: str) -> None:
+        self.case = case
+        self.directory = directory
+        self.action_file = os.path.join(directory, "action.yml")
+        self.template_file = os.path.join(directory, "README.md")
+        self.target_file = os.path.join(directory, "TARGET.md")
+
+        with open(self.action_file, "wb") as f:
+            f.write(case.action_yaml())
+        with open(self.template_file, "wb") as f:
+            f.write(case.template_text())
+
+    def action_docs(self, **kwargs) -> ActionDocs:
+        """A generator of the case (with its options)"""
+        return ActionDocs(
+            action_file=self.action_file,
+            template_file=self.template_file,
+            **self.case.options,
+            **kwargs,
+        )
+
+    def read_target(self) -> bytes:
+        with open(self.target_file, "rb") as f:
+            return f.read()
+
+
+@contextmanager
+def case_files(case: Case) -> Iterator[CaseFiles]:
+    """Writes a case to a temporary directory (removed afterwards)"""
+    directory = tempfile.mkdtemp(prefix="differential-")
+    try:
+        yield CaseFiles(case, directory)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+# The oracle: a frozen copy of the baseline implementation (python-markdown
+# and a lookbehind/lookahead regex substitution, before any optimization),
+# extended to named blocks (see README) with a regex of its own. Only where
+# the baseline failed: files are read as UTF-8, null sections are empty
+# tables, and the replacement is inserted literally (the baseline's
+# re.sub() processed its backslashes).
+
+
+def baseline_markdown(md: str) -> str:
+    """markdown_to_github_html_for_table(), as of the baseline"""
+    if len(md.splitlines()) == 1:
+        return md
+
+    md = markdown.markdown(md, extensions=["fenced_code"])
+    md = re.sub(r">\s*<", "><", md)
+    md = re.sub(r"(?<=<pre>)<code.*?>|<\/code>(?=<\/pre>)", "", md)
+    return "<br />".join(md.splitlines())
+
+
+def _baseline_inputs(config: dict) -> str:
+    try:
+        inputs_config = config["inputs"] or {}
+    except KeyError:
+        return "None"
+
+    rows = []
+    rows.append("|Input|Description|Default|Required|")
+    rows.append("|-----|-----------|-------|:------:|")
+    for k, v in inputs_config.items():
+        input_id = f"`{k}`"
+        desc = v["description"]
+        if "deprecationMessage" in v:
+            desc += "\n\n" + f"**Depricated:** {v['deprecationMessage']}"
+        desc = baseline_markdown(desc)
+        default = f"`{v['default']}`" if "default" in v else "n/a"
+        required = v["required"] if "required" in v else False
+        required = "yes" if required else "no"
+        rows.append(
+            f"|{input_id.rstrip()}"
+            f"|{desc.rstrip()}"
+            f"|{default.rstrip()}"
+            f"|{required.rstrip()}"
+            f"|"
+        )
+    return "\n".join(rows)
+
+
+def _baseline_outputs(config: dict) -> str:
+    try:
+        outputs_config = config["outputs"] or {}
+    except KeyError:
+        return "None"
+
+    rows = []
+    rows.append("|Output|Description|")
+    rows.append("|------|-----------|")
+    for k, v in outputs_config.items():
+        output_id = f"`{k}`"
+        desc = baseline_markdown(v["description"])
+        rows.append(f"|{output_id.rstrip()}" f"|{desc.rstrip()}" f"|")
+    return "\n".join(rows)
+
+
+def _baseline_full_markdown(
+    config: dict, include_inputs: bool, include_outputs: bool, heading_size: int
+) -> str:
+    md = ""
+    if include_inputs:
+        md += f"{'#' * heading_size} Inputs"
+        md += "\n"
+        md += _baseline_inputs(config)
+        md += "\n"
+    if include_outputs:
+        md += f"{'#' * heading_size} Outputs"
+        md += "\n"
+        md += _baseline_outputs(config)
+    return md
+
+
+# A named block (name, options, content), closed by the next closing
+# marker of the same name
+NAMED_BLOCK_REGEX = re.compile(
+    r"<!--doc_begin:(\w+)((?:\s+[\w-]+=\S+?)*)\s*-->(.*?)<!--doc_end:\1-->",
+    re.DOTALL,
+)
+
+
+def baseline_generate(
+    action_file: str,
+    template_file: str,
+    include_inputs: bool = True,
+    include_outputs: bool = True,
+    heading_size: int = 3,
+) -> str:
+    """ActionDocs.generate(), as of the baseline (plus named blocks)"""
+    with open(action_file, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    with open(template_file, "r", encoding="utf-8") as f:
+        template = f.read()
+
+    marker_regex = re.compile(r"(?<=<!--doc_begin-->).*(?=<!--doc_end-->)", re.DOTALL)
+    unnamed = [m.span() for m in marker_regex.finditer(template)]
+
+    def named(m: re.Match) -> str:
+        name, options, content = m.group(1), m.group(2), m.group(3)
+        start, end = m.span(3)
+        if name not in ["inputs", "outputs", "all"] or any(
+            start <= e and end >= s for s, e in unnamed
+        ):
+            return m.group(0)
+
+        options = dict(o.split("=", 1) for o in options.split())
+        md = _baseline_full_markdown(
+            config,
+            name in ["inputs", "all"],
+            name in ["outputs", "all"],
+            int(options.get("heading_size", heading_size)),
+        )
+        return (
+            m.group(0)[: start - m.start()]
+            + "\n"
+            + md.rstrip("\n")
+            + "\n"
+            + (m.group(0)[end - m.start() :])
+        )
+
+    document = NAMED_BLOCK_REGEX.sub(named, template)
+    # (the named blocks outside of the unnamed block are left where they are)
+    md = _baseline_full_markdown(config, include_inputs, include_outputs, heading_size)
+    return marker_regex.sub(lambda m: "\n" + md + "\n", document)
+
+
+# Engines rendering the document of a case (see CaseFiles)
+Engine = Callable[[CaseFiles], bytes]
+
+
+def baseline_engine(files: CaseFiles) -> bytes:
+    """The document, generated by the baseline implementation (the oracle)"""
+    return baseline_generate(
+        files.action_file, files.template_file, **files.case.options
+    ).encode("utf-8")
+
+
+def _save(files: CaseFiles, **kwargs) -> bytes:
+    files.action_docs(**kwargs).save(files.target_file)
+    return files.read_target()
+
+
+def _save_in_place(files: CaseFiles, **kwargs) -> bytes:
+    shutil.copyfile(files.template_file, files.target_file)
+    ActionDocs(
+        action_file=files.action_file,
+        template_file=files.target_file,
+        **files.case.options,
+        **kwargs,
+    ).save(files.target_file)
+    return files.read_target()
+
+
+def _from_text(files: CaseFiles) -> bytes:
+    # (as the template file is read: universal newlines)
+    with open(files.template_file, "r", encoding="utf-8") as f:
+        template = f.read()
+    return (
+        ActionDocs.from_text(
+            files.case.action_yaml().decode("utf-8"), template, **files.case.options
+        )
+        .generate()
+        .encode("utf-8")
+    )
+
+
+def _incremental_reused(files: CaseFiles) -> bytes:
+    # The second save reuses the rows of the first
+    _save(files, incremental=True)
+    return _save(files, incremental=True)
+
+
+def parallel_engine(converter: ParallelConverter) -> Engine:
+    """The document, generated with a (started) ParallelConverter"""
+    return (
+        lambda files: files.action_docs(converter=converter).generate().encode("utf-8")
+    )
+
+
+# Engines, by name
+ENGINES: Dict[str, Engine] = {
+    "generate": lambda files: files.action_docs().generate().encode("utf-8"),
+    "save": _save,
+    "save_in_place": _save_in_place,
+    "streaming": lambda files: _save(files, streaming=True),
+    "streaming_in_place": lambda files: _save_in_place(files, streaming=True),
+    "shared": lambda files: _save(files, shared=True),
+    "from_text": _from_text,
+    "incremental": lambda files: _save(files, incremental=True),
+    "incremental_reused": _incremental_reused,
+}
+
+# The reference of engines whose output isn't the baseline's by design
+# (e.g. with manifests), by name
+REFERENCES: Dict[str, str] = {"incremental_reused": "incremental"}
+
+
+def _outcome(engine: Callable, arg) -> Tuple[Any, float]:
+    """The output of an engine (or the type of what it raised), and its duration"""
+    start = time.perf_counter()
+    try:
+        output = engine(arg)
+    except Exception as e:
+        output = f"<raised {type(e).__name__}>"
+    return output, time.perf_counter() - start
+
+
+class Divergence:
+    """The first item on which the outputs of two engines differ"""
+
+    def __init__(
+        self, index: int, item: Any, minimized: Any, reference: Any, candidate: Any
+    ) -> None:
+        self.index = index
+        self.item = item
+        self.minimized = minimized
+        self.reference = reference
+        self.candidate = candidate
+
+    def __str__(self) -> str:
+        reference, candidate = self.reference, self.candidate
+        offset = 0
+        if isinstance(reference, type(candidate)):
+            offset = next(
+                (i for i, (a, b) in enumerate(zip(reference, candidate)) if a != b),
+                min(len(reference), len(candidate)),
+            )
+        start = max(0, offset - 40)
+        return (
+            f"Divergence on item #{self.index}, at offset {offset}:\n"
+            f"  reference: {reference[start : offset + 40]!r}\n"
+            f"  candidate: {candidate[start : offset + 40]!r}\n"
+            f"Minimized reproducer:\n{self.minimized}"
+        )
+
+
+class Report:
+    """The outcome of a comparison (see compare())"""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.items = 0
+        self.reference_seconds = 0.0
+        self.candidate_seconds = 0.0
+        self.divergence: Optional[Divergence] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.divergence is None
+
+    def throughput(self) -> Dict[str, float]:
+        """The items per second of each engine"""
+        return {
+            "reference": (
+                self.items / self.reference_seconds if self.reference_seconds else 0.0
+            ),
+            "candidate": (
+                self.items / self.candidate_seconds if self.candidate_seconds else 0.0
+            ),
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "items": self.items,
+            "reference_seconds": self.reference_seconds,
+            "candidate_seconds": self.candidate_seconds,
+            "throughput": self.throughput(),
+            "divergence": str(self.divergence) if self.divergence else None,
+        }
+
+    def __str__(self) -> str:
+        throughput = self.throughput()
+        summary = (
+            f"{self.name}: {self.items} items, "
+            f"reference {throughput['reference']:.1f}/s, "
+            f"candidate {throughput['candidate']:.1f}/s"
+        )
+        if self.divergence is not None:
+            summary += f"\n{self.divergence}"
+        return summary
+
+
+def minimize(item: Any, diverges: Callable[[Any], bool], shrink: Callable) -> Any:
+    """Shrinks an item while it still diverges (greedily)
+
+    Args:
+        item: the diverging item
+        diverges: if an item diverges
+        shrink: the smaller variants of an item
+
+    Returns:
+        The smallest diverging item found
+    """
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        for smaller in shrink(item):
+            if diverges(smaller):
+                item, shrunk = smaller, True
+                break
+    return item
+
+
+def compare(
+    reference: Callable,
+    candidate: Callable,
+    items: Iterable,
+    name: str = "candidate",
+    prepare: Optional[Callable] = None,
+    shrink: Optional[Callable] = None,
+) -> Report:
+    """Runs items through two engines, until their outputs differ
+
+    Args:
+        reference: the reference engine
+        candidate: the candidate engine (e.g. an optimized path)
+        items: the items (e.g. cases, see generate_case())
+        name: the name of the comparison (in the report)
+        prepare: a context manager of the argument of the engines for an
+            item (e.g. case_files()), not timed; defaults to the item
+        shrink: the smaller variants of an item, to minimize divergences
+            with (e.g. Case.shrink)
+
+    Returns:
+        The report: the throughput of both engines, and the first
+        divergence (minimized), if any
+    """
+
+    @contextmanager
+    def as_is(item):
+        yield item
+
+    prepare = prepare or as_is
+
+    def outcomes(item) -> Tuple[Tuple[Any, float], Tuple[Any, float]]:
+        with prepare(item) as arg:
+            expected = _outcome(reference, arg)
+        with prepare(item) as arg:
+            actual = _outcome(candidate, arg)
+        return expected, actual
+
+    report = Report(name)
+    for index, item in enumerate(items):
+        (expected, expected_seconds), (actual, actual_seconds) = outcomes(item)
+        report.items += 1
+        report.reference_seconds += expected_seconds
+        report.candidate_seconds += actual_seconds
+
+        if expected != actual:
+
+            def diverges(smaller) -> bool:
+                (expected, _), (actual, _) = outcomes(smaller)
+                return expected != actual
+
+            minimized = minimize(item, diverges, shrink) if shrink else item
+            (expected, _), (actual, _) = outcomes(minimized)
+            report.divergence = Divergence(index, item, minimized, expected, actual)
+            break
+
+    return report
+
+
+def compare_documents(
+    candidate: Engine,
+    cases: int,
+    seed: int = 0,
+    name: str = "candidate",
+    reference: Engine = baseline_engine,
+) -> Report:
+    """Compares the documents of random cases (see compare())"""
+    return compare(
+        reference,
+        candidate,
+        (generate_case(seed + i) for i in range(cases)),
+        name=name,
+        prepare=case_files,
+        shrink=Case.shrink,
+    )
+
+
+def compare_markdown(
+    candidate: Callable[[str], str],
+    count: int,
+    seed: int = 0,
+    name: str = "markdown",
+    reference: Callable[[str], str] = baseline_markdown,
+) -> Report:
+    """Compares the conversions of random descriptions (see compare())"""
+    rng = random.Random(seed)
+    return compare(
+        reference,
+        candidate,
+        (generate_markdown(rng) for _ in range(count)),
+        name=name,
+        shrink=_shrink_text,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compares an engine to its reference on random cases"
+    )
+    # (engines used as references only aren't candidates)
+    candidates = [name for name in ENGINES if name not in REFERENCES.values()]
+    parser.add_argument(
+        "--candidate",
+        choices=sorted(candidates + ["markdown", "parallel"]),
+        default="generate",
+        help="the engine to compare to its reference (default: %(default)s)",
+    )
+    parser.add_argument("--cases", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file to write the report to")
+    args = parser.parse_args(argv)
+
+    if args.candidate == "markdown":
+        report = compare_markdown(
+            markdown_to_github_html_for_table, args.cases, args.seed
+        )
+    elif args.candidate == "parallel":
+        with ParallelConverter(threshold=1, chunk_size=2) as converter:
+            report = compare_documents(
+                parallel_engine(converter), args.cases, args.seed, name="parallel"
+            )
+    else:
+        reference = ENGINES.get(REFERENCES.get(args.candidate), baseline_engine)
+        report = compare_documents(
+            ENGINES[args.candidate],
+            args.cases,
+            args.seed,
+            name=args.candidate,
+            reference=reference,
+        )
+
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report.to_dict(), f, indent=2)
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,132 @@
+import pytest
+
+from actiondocs.__main__ import main
+from actiondocs.batch import BatchJob, jobs_from_glob, load_manifest, run_batch
+
+ACTION_YAML = """
+inputs:
+  in1:
+    description: desc
+outputs:
+  out1:
+    description: desc
+"""
+
+TEMPLATE = """Text before
+<!--doc_begin-->
+<!--doc_end-->
+Text after"""
+
+EXPECTED_DOC = """Text before
+<!--doc_begin-->
+### Inputs
+|Input|Description|Default|Required|
+|-----|-----------|-------|:------:|
+|`in1`|desc|n/a|no|
+### Outputs
+|Output|Description|
+|------|-----------|
+|`out1`|desc|
+<!--doc_end-->
+Text after"""
+
+
+@pytest.fixture()
+def actions_dir(tmp_path):
+    """Generate a directory of 3 actions, each with a template README.md"""
+    for name in ["a", "b", "c"]:
+        action_dir = tmp_path / "actions" / name
+        action_dir.mkdir(parents=True)
+        (action_dir / "action.yml").write_text(ACTION_YAML)
+        (action_dir / "README.md").write_text(TEMPLATE)
+    return tmp_path / "actions"
+
+
+def test_jobs_from_glob(actions_dir):
+    """Test one job per action file, with the template next to it"""
+    jobs = jobs_from_glob(str(actions_dir / "*" / "action.yml"))
+
+    assert [j.action_file for j in jobs] == [
+        str(actions_dir / name / "action.yml") for name in ["a", "b", "c"]
+    ]
+    assert all(j.template_file == j.target_file for j in jobs)
+    assert jobs[0].template_file == str(actions_dir / "a" / "README.md")
+
+
+def test_load_manifest(tmp_path):
+    """Test manifest defaults and per-job overrides"""
+    manifest = tmp_path / "manifest.yml"
+    manifest.write_text("""
+defaults:
+  heading_size: 2
+jobs:
+  - action_file: a/action.yml
+    template_file: a/README.md
+  - action_file: b/action.yml
+    template_file: b/README.tpl.md
+    target_file: b/README.md
+    heading_size: 4
+""")
+    jobs = load_manifest(str(manifest))
+
+    assert jobs[0].target_file == "a/README.md"
+    assert jobs[0].options == {"heading_size": 2}
+    assert jobs[1].target_file == "b/README.md"
+    assert jobs[1].options == {"heading_size": 4}
+
+
+def test_job_illegal_option():
+    """Test unknown job options are rejected"""
+    with pytest.raises(ValueError):
+        BatchJob("action.yml", "README.md", "README.md", foo="bar")
+
+
+def test_run_batch(actions_dir):
+    """Test all jobs are run, and a failing job doesn't stop the others"""
+    jobs = jobs_from_glob(str(actions_dir / "*" / "action.yml"))
+    jobs.insert(1, BatchJob("missing.yml", "missing.md", "missing.md"))
+
+    results = run_batch(jobs, workers=2)
+
+    assert [r.job for r in results] == jobs
+    assert [r.ok for r in results] == [True, False, True, True]
+    assert [r.changed for r in results] == [True, False, True, True]
+    assert isinstance(results[1].error, OSError)
+    for name in ["a", "b", "c"]:
+        assert (actions_dir / name / "README.md").read_text() == EXPECTED_DOC
+
+    # Second run: nothing changed
+    results = run_batch(jobs, workers=2)
+    assert [r.changed for r in results] == [False, False, False, False]
+
+
+def test_main_batch_glob(actions_dir):
+    """Test the batch entrypoint"""
+    main(["--glob", str(actions_dir / "**" / "action.yml"), "--workers", "2"])
+
+    for name in ["a", "b", "c"]:
+        assert (actions_dir / name / "README.md").read_text() == EXPECTED_DOC
+
+
+def test_main_batch_failure(tmp_path):
+    """Test the batch entrypoint exits 1 when a job failed"""
+    manifest = tmp_path / "manifest.yml"
+    manifest.write_text("jobs:\n  - {action_file: x, template_file: y}\n")
+
+    with pytest.raises(SystemExit) as e:
+        main(["--manifest", str(manifest)])
+    assert e.value.code == 1
+
+
+def test_main_batch_check(actions_dir):
+    """Test the batch entrypoint exits 1 when checking stale docs"""
+    template = (actions_dir / "a" / "README.md").read_text()
+    glob = str(actions_dir / "**" / "action.yml")
+
+    with pytest.raises(SystemExit) as e:
+        main(["--glob", glob, "--check"])
+    assert e.value.code == 1
+    assert (actions_dir / "a" / "README.md").read_text() == template
+
+    main(["--glob", glob])
+    main(["--glob", glob, "--check"])
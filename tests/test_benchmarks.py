@@ -0,0 +1,211 @@
+import json
+import os
+import re
+import timeit
+
+import benchmark
+import corpus
+import markdown
+import yaml
+
+from actiondocs import ActionDocs, fastmarkdown
+from actiondocs.cache import ConfigCache
+from actiondocs.main import yaml_safe_loader
+from actiondocs.markers import substitute
+from actiondocs.utils import MarkdownConverter, ParallelConverter
+
+# Number of table cells converted per benchmark run
+CELLS = 200
+
+# If timings are compared (e.g. ACTIONDOCS_TIMINGS=1 pytest -vv), which
+# is flaky on shared runners: outputs are always compared
+TIMINGS = os.environ.get("ACTIONDOCS_TIMINGS") == "1"
+
+
+def _naive_markdown_to_github_html_for_table(md: str) -> str:
+    """markdown_to_github_html_for_table, before MarkdownConverter
+
+    A new python-markdown instance (and its extensions)
+    for each conversion and non-precompiled patterns.
+    """
+    if len(md.splitlines()) == 1:
+        return md
+    md = markdown.markdown(md, extensions=["fenced_code"])
+    md = re.sub(r">\s*<", "><", md)
+    md = re.sub(r"(?<=<pre>)<code.*?>|<\/code>(?=<\/pre>)", "", md)
+    return "<br />".join(md.splitlines())
+
+
+def _best_of(fn, repeat: int = 3) -> float:
+    """Best time of <repeat> runs of <fn> (in seconds)"""
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def _assert_faster(seconds: float, than: float) -> None:
+    """Asserts a timing is faster than another one (only if TIMINGS)"""
+    if TIMINGS:
+        assert seconds < than
+
+
+def test_benchmark_converter():
+    """Benchmark MarkdownConverter against per-cell python-markdown instances"""
+    cells = [
+        f"Cell {i}:\n\n```yaml\nfoo: {i}\n```\n\n**Some** `code`" for i in range(CELLS)
+    ]
+    converter = MarkdownConverter()
+
+    # Same output
+    expected = [_naive_markdown_to_github_html_for_table(c) for c in cells]
+    assert converter.convert_many(cells) == expected
+
+    naive = _best_of(
+        lambda: [_naive_markdown_to_github_html_for_table(c) for c in cells]
+    )
+    reused = _best_of(lambda: converter.convert_many(cells))
+
+    print(
+        f"\nPer cell: naive {naive / CELLS * 1e6:.1f}µs, "
+        f"converter {reused / CELLS * 1e6:.1f}µs ({reused / naive:.0%})"
+    )
+    _assert_faster(reused, naive)
+
+
+def test_benchmark_fastmarkdown():
+    """Benchmark fastmarkdown against python-markdown, on supported descriptions"""
+    cells = [
+        md for md in corpus.generate_markdown(CELLS * 5) if fastmarkdown.render(md)
+    ][:CELLS]
+    md = markdown.Markdown(extensions=["fenced_code"])
+
+    # Same output
+    assert [fastmarkdown.render(c) for c in cells] == [
+        md.reset().convert(c) for c in cells
+    ]
+
+    python_markdown = _best_of(lambda: [md.reset().convert(c) for c in cells])
+    fast = _best_of(lambda: [fastmarkdown.render(c) for c in cells])
+
+    print(
+        f"\nPer cell: python-markdown {python_markdown / CELLS * 1e6:.1f}µs, "
+        f"fastmarkdown {fast / CELLS * 1e6:.1f}µs ({fast / python_markdown:.0%})"
+    )
+    _assert_faster(fast, python_markdown)
+
+
+def test_benchmark_parallel_converter():
+    """Benchmark ParallelConverter against serial conversions"""
+    cells = [
+        f"Cell {i}:\n\n```yaml\nfoo: {i}\n```\n\n**Some** `code`"
+        for i in range(CELLS * 10)
+    ]
+    serial = MarkdownConverter()
+
+    with ParallelConverter(threshold=0) as parallel:
+        # Same output (also starts the worker processes)
+        assert parallel.convert_many(cells) == serial.convert_many(cells)
+
+        serial_time = _best_of(lambda: serial.convert_many(cells))
+        parallel_time = _best_of(lambda: parallel.convert_many(cells))
+
+    # (no speedup is expected with a single processor)
+    print(
+        f"\n{len(cells)} cells on {os.cpu_count()} processors: "
+        f"serial {serial_time * 1e3:.1f}ms, parallel {parallel_time * 1e3:.1f}ms "
+        f"({parallel_time / serial_time:.0%})"
+    )
+
+
+def test_benchmark_markers():
+    """Benchmark the marker scanner against the regex, on a large template"""
+    template = ("Some text\n" * 100_000) + "<s>\nold\n<e>\n" + ("More text\n" * 100_000)
+    marker_regex = re.compile(r"(?<=<s>).*(?=<e>)", re.DOTALL)
+
+    # Same output
+    expected = marker_regex.sub("\nnew\n", template)
+    assert substitute(template, "<s>", "<e>", "\nnew\n") == expected
+
+    regex = _best_of(lambda: marker_regex.sub("\nnew\n", template))
+    scanner = _best_of(lambda: substitute(template, "<s>", "<e>", "\nnew\n"))
+
+    print(
+        f"\n{len(template) / 1e6:.1f}MB template: regex {regex * 1e3:.1f}ms, "
+        f"scanner {scanner * 1e3:.1f}ms ({scanner / regex:.0%})"
+    )
+    _assert_faster(scanner, regex)
+
+
+def test_benchmark_yaml(tmp_path):
+    """Benchmark loading a large action file: pure-Python, libyaml and cached"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text(
+        "inputs:\n"
+        + "".join(
+            f"  in{i}:\n"
+            f"    description: |\n"
+            f"      Input {i}\n"
+            f"      description\n"
+            f"    required: false\n"
+            f"    default: value{i}\n"
+            for i in range(1000)
+        )
+    )
+    os.utime(action_file, (1000, 1000))
+    cache = ConfigCache(str(tmp_path / "cache"))
+
+    def _pure():
+        with open(action_file, "rb") as f:
+            return yaml.load(f, Loader=yaml.SafeLoader)
+
+    expected = _pure()
+    assert ActionDocs._parse_yaml(action_file.read_bytes()) == expected
+    assert cache.load(str(action_file), ActionDocs._parse_yaml) == expected
+    assert cache.load(str(action_file), ActionDocs._parse_yaml) == expected
+
+    pure = _best_of(_pure)
+    libyaml = _best_of(lambda: ActionDocs._parse_yaml(action_file.read_bytes()))
+    cached = _best_of(lambda: cache.load(str(action_file), ActionDocs._parse_yaml))
+
+    print(
+        f"\n1000 inputs: pure-Python {pure * 1e3:.1f}ms, "
+        f"{yaml_safe_loader().__name__} {libyaml * 1e3:.1f}ms ({libyaml / pure:.0%}), "
+        f"cached {cached * 1e3:.1f}ms ({cached / pure:.0%})"
+    )
+    _assert_faster(cached, pure)
+
+
+def test_benchmark_suite(tmp_path):
+    """Test the benchmark suite (smallest sizes)"""
+    output = tmp_path / "results.json"
+    benchmark.main(
+        ["--inputs", "10", "--template-sizes", "1KB", "--output", str(output)]
+    )
+
+    results = json.loads(output.read_text())["results"]
+    assert len(results) == 1
+    assert results[0]["inputs"] == 10
+    assert list(results[0]["phases"].keys()) == [
+        "load_yaml",
+        "load_template",
+        "render_tables",
+        "substitute",
+        "save",
+    ]
+    for phase in results[0]["phases"].values():
+        assert phase["seconds"] >= 0
+        assert phase["peak_bytes"] >= 0
+
+
+def test_corpus():
+    """Test synthetic action files are valid, with every kind of description"""
+    config = yaml.safe_load(corpus.generate_action_yaml(inputs=100, outputs=10))
+
+    assert len(config["inputs"]) == 100
+    assert len(config["outputs"]) == 10
+    descs = [v["description"] for v in config["inputs"].values()]
+    assert any("\n" not in d for d in descs)
+    assert any("```yaml" in d for d in descs)
+    assert any("deprecationMessage" in v for v in config["inputs"].values())
+
+    template = corpus.generate_template(1024)
+    assert 900 < len(template) < 1100
+    assert "<!--doc_begin-->" in template
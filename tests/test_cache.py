@@ -0,0 +1,220 @@
+import os
+import threading
+
+import yaml
+
+from actiondocs import ActionDocs
+from actiondocs.cache import ConfigCache, DescriptionCache
+from actiondocs.utils import MarkdownConverter, markdown_to_github_html_for_table
+
+MULTILINE_DESC = "line 1\nline 2"
+MULTILINE_HTML = "<p>line 1<br />line 2</p>"
+
+
+class CountingRenderer:
+    """A render function that counts its calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, md: str) -> str:
+        self.calls += 1
+        return markdown_to_github_html_for_table(md)
+
+
+def _cache_files(cache_dir):
+    return [
+        os.path.join(root, name)
+        for root, _, files in os.walk(cache_dir)
+        for name in files
+    ]
+
+
+def test_memory_cache():
+    """Test identical descriptions are only rendered once"""
+    cache = DescriptionCache()
+    render = CountingRenderer()
+
+    for _ in range(3):
+        assert cache.render(MULTILINE_DESC, render) == MULTILINE_HTML
+
+    assert render.calls == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_memory_cache_bounded():
+    """Test the least recently used descriptions are evicted from memory"""
+    cache = DescriptionCache(memo_size=2)
+    render = CountingRenderer()
+
+    cache.render("a\n1", render)
+    cache.render("b\n2", render)
+    cache.render("a\n1", render)
+    cache.render_many(["c\n3"], lambda mds: [render(md) for md in mds])
+    assert [text for _, text in cache._memo] == ["a\n1", "c\n3"]
+
+    cache.render("b\n2", render)
+    assert render.calls == 4
+    assert len(cache._memo) == 2
+
+
+def test_disk_cache(tmp_path):
+    """Test rendered descriptions are persisted between caches (i.e. runs)"""
+    render = CountingRenderer()
+
+    cache = DescriptionCache(cache_dir=str(tmp_path))
+    assert cache.render(MULTILINE_DESC, render) == MULTILINE_HTML
+    assert len(_cache_files(tmp_path)) == 1
+
+    cache = DescriptionCache(cache_dir=str(tmp_path))
+    assert cache.render(MULTILINE_DESC, render) == MULTILINE_HTML
+    assert render.calls == 1
+
+
+def test_disk_cache_key(tmp_path):
+    """Test the cache key changes with the description"""
+    cache = DescriptionCache(cache_dir=str(tmp_path))
+    cache.render("a\nb", markdown_to_github_html_for_table)
+    cache.render("a\nc", markdown_to_github_html_for_table)
+
+    assert len(_cache_files(tmp_path)) == 2
+
+
+def test_cache_key_extensions(tmp_path):
+    """Test descriptions are cached by the extensions they're rendered with"""
+    cache = DescriptionCache(cache_dir=str(tmp_path))
+    render = CountingRenderer()
+    cache.render(MULTILINE_DESC, render)
+    cache.render(MULTILINE_DESC, render, extensions=["fenced_code", "tables"])
+    assert render.calls == 2
+    assert len(_cache_files(tmp_path)) == 2
+
+    cache = DescriptionCache(cache_dir=str(tmp_path))
+    cache.render(MULTILINE_DESC, render, extensions=["fenced_code", "tables"])
+    assert render.calls == 2
+
+
+def test_cache_shared_converters(tmp_path):
+    """Test a cache shared by converters of other extensions"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text("inputs:\n  in1:\n    description: |\n      a\n      b\n")
+    cache = DescriptionCache()
+
+    for extensions, html in [
+        (["fenced_code"], "<p>a<br />b</p>"),
+        (["fenced_code", "nl2br"], "<p>a<br /><br />b</p>"),
+    ]:
+        ad = ActionDocs(
+            str(action_file), cache=cache, converter=MarkdownConverter(extensions)
+        )
+        assert f"|{html}|" in ad.render("markdown")
+
+
+def test_cache_threads():
+    """Test hits and misses are counted from concurrent threads"""
+    cache = DescriptionCache()
+    texts = [f"desc\n{i % 10}" for i in range(100)]
+
+    def render_many(_):
+        for _ in range(20):
+            cache.render_many(texts, lambda mds: list(mds))
+
+    threads = [threading.Thread(target=render_many, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.hits + cache.misses == 8 * 20 * 100
+
+
+def test_disk_cache_prune(tmp_path):
+    """Test least recently used entries are evicted first"""
+    cache = DescriptionCache(cache_dir=str(tmp_path))
+    for i in range(3):
+        cache.render(f"desc\n{i}", markdown_to_github_html_for_table)
+
+    # Make entries used (oldest to newest): 1, 2, 0
+    for age, i in [(30, 1), (20, 2), (10, 0)]:
+        path = cache._path(cache._key(f"desc\n{i}"))
+        mtime = os.stat(path).st_mtime - age
+        os.utime(path, (mtime, mtime))
+
+    entry_size = os.stat(cache._path(cache._key("desc\n0"))).st_size
+    cache.max_size = entry_size * 2
+    cache.prune()
+
+    assert not os.path.exists(cache._path(cache._key("desc\n1")))
+    assert os.path.exists(cache._path(cache._key("desc\n2")))
+    assert os.path.exists(cache._path(cache._key("desc\n0")))
+
+
+class CountingParser:
+    """A YAML parse function that counts its calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, content: bytes) -> dict:
+        self.calls += 1
+        return yaml.safe_load(content)
+
+
+def test_config_cache(tmp_path):
+    """Test action files are only parsed when their content changes"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text("inputs:\n  in1:\n    description: desc\n")
+    os.utime(action_file, (1000, 1000))
+    parse = CountingParser()
+    expected_config = {"inputs": {"in1": {"description": "desc"}}}
+
+    cache = ConfigCache(str(tmp_path / "cache"))
+    assert cache.load(str(action_file), parse) == expected_config
+    assert parse.calls == 1
+
+    # Unchanged (stat)
+    assert ConfigCache(str(tmp_path / "cache")).load(str(action_file), parse) == (
+        expected_config
+    )
+    assert parse.calls == 1
+
+    # Unchanged (content), e.g. after a fresh checkout
+    os.utime(action_file, (2000, 2000))
+    assert cache.load(str(action_file), parse) == expected_config
+    assert parse.calls == 1
+
+    # Changed
+    action_file.write_text("inputs:\n  in2:\n    description: desc\n")
+    assert cache.load(str(action_file), parse) == {
+        "inputs": {"in2": {"description": "desc"}}
+    }
+    assert parse.calls == 2
+
+
+def test_config_cache_racy(tmp_path):
+    """Test files modified right before being cached are checked by content"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text("a: 1\n")
+    parse = CountingParser()
+
+    cache = ConfigCache(str(tmp_path / "cache"))
+    assert cache.load(str(action_file), parse) == {"a": 1}
+
+    # Same size and mtime, different content
+    st = os.stat(action_file)
+    action_file.write_text("a: 2\n")
+    os.utime(action_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    assert cache.load(str(action_file), parse) == {"a": 2}
+
+
+def test_config_cache_unserializable(tmp_path):
+    """Test configurations that can't be serialized are parsed every time"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text("date: 2024-01-01\n")
+    parse = CountingParser()
+
+    cache = ConfigCache(str(tmp_path / "cache"))
+    cache.load(str(action_file), parse)
+    cache.load(str(action_file), parse)
+
+    assert parse.calls == 2
@@ -0,0 +1,109 @@
+import differential
+import pytest
+
+from actiondocs import markers
+from actiondocs.utils import ParallelConverter, markdown_to_github_html_for_table
+
+# Number of random cases per comparison
+CASES = 100
+
+
+@pytest.mark.parametrize(
+    "name", ["generate", "save", "save_in_place", "streaming", "shared", "from_text"]
+)
+def test_documents(name):
+    """Test every render path outputs the same bytes as the reference"""
+    report = differential.compare_documents(
+        differential.ENGINES[name], CASES, name=name
+    )
+    print(report)
+    assert report.ok, str(report)
+
+
+def test_documents_parallel():
+    """Test documents converted in parallel are the same as the reference"""
+    with ParallelConverter(threshold=1, chunk_size=2, workers=2) as converter:
+        report = differential.compare_documents(
+            differential.parallel_engine(converter), CASES, name="parallel"
+        )
+    print(report)
+    assert report.ok, str(report)
+
+
+def test_documents_incremental():
+    """Test reused rows are the same as rendered ones"""
+    report = differential.compare_documents(
+        differential.ENGINES["incremental_reused"],
+        CASES,
+        name="incremental",
+        reference=differential.ENGINES[differential.REFERENCES["incremental_reused"]],
+    )
+    print(report)
+    assert report.ok, str(report)
+
+
+def test_markdown():
+    """Test table cells are the same as python-markdown's"""
+    report = differential.compare_markdown(markdown_to_github_html_for_table, 1000)
+    print(report)
+    assert report.ok, str(report)
+
+
+def test_cases():
+    """Test cases are reproducible and valid"""
+    case = differential.generate_case(42)
+    assert str(case) == str(differential.generate_case(42))
+
+    reports = differential.compare_documents(
+        differential.baseline_engine, 50, reference=differential.baseline_engine
+    )
+    assert reports.ok and reports.items == 50
+
+
+def test_baseline_oracle(monkeypatch):
+    """Test the oracle doesn't share code with the tree (e.g. its scanner)"""
+
+    def find_first_blocks(buf, marker_start, marker_end):
+        # (a bug: the first closing marker, instead of the last one)
+        start = buf.find(marker_start)
+        end = buf.find(marker_end, start + len(marker_start))
+        return [] if -1 in [start, end] else [(start + len(marker_start), end)]
+
+    monkeypatch.setattr(markers, "find_blocks", find_first_blocks)
+    report = differential.compare_documents(differential.ENGINES["generate"], CASES)
+    assert not report.ok
+    assert report.divergence.minimized.inputs is None
+
+
+def test_divergence_minimized():
+    """Test divergences are reported with a minimized reproducer"""
+
+    def candidate(files):
+        # (a bug: deprecated inputs lose their message)
+        output = differential.baseline_engine(files)
+        return output.replace(b"<strong>Depricated:</strong>", b"")
+
+    report = differential.compare_documents(candidate, CASES, name="buggy")
+    assert not report.ok
+    divergence = report.divergence
+    assert b"<strong>Depricated:</strong>" in divergence.reference
+    assert "Divergence on item" in str(report)
+
+    # Down to a single input, with its message
+    case = divergence.minimized
+    assert case.outputs is None
+    assert [list(d) for _, d in case.inputs] == [["description", "deprecationMessage"]]
+    assert len(case.action_yaml()) < len(divergence.item.action_yaml())
+    assert not (case.crlf or case.bom or case.action_crlf or case.action_bom)
+
+
+def test_markdown_divergence_minimized():
+    """Test Markdown divergences are minimized to a few characters"""
+    report = differential.compare_markdown(
+        lambda md: markdown_to_github_html_for_table(md).replace("<em>", "<i>"), 1000
+    )
+    assert not report.ok
+    # (Markdown of two lines, i.e. converted)
+    minimized = report.divergence.minimized
+    assert len(minimized) <= 5 and "\n" in minimized
+    assert report.throughput()["reference"] > 0
@@ -0,0 +1,93 @@
+import corpus
+import markdown
+import pytest
+
+from actiondocs import fastmarkdown
+from actiondocs.utils import MARKDOWN_EXTENSIONS, MarkdownConverter, html_for_table
+
+# Number of descriptions of the differential test
+CORPUS_SIZE = 5000
+
+
+def _python_markdown(md: str) -> str:
+    return markdown.markdown(md, extensions=MARKDOWN_EXTENSIONS)
+
+
+def test_render():
+    """Test the supported subset"""
+    md = (
+        "Path to **some** *yaml*, see [the `docs`](https://github.com/a?b=1&c=2):\n"
+        "\n"
+        "```yaml\n"
+        'foo: "<bar>"\n'
+        "```\n"
+        "\n"
+        "* item `1`\n"
+        "* item 2\n"
+        "\n"
+        "> a > b\n"
+        "> c\n"
+    )
+    expected_html = (
+        "<p>Path to <strong>some</strong> <em>yaml</em>, see "
+        '<a href="https://github.com/a?b=1&amp;c=2">the <code>docs</code></a>:</p>\n'
+        '<pre><code class="language-yaml">foo: &quot;&lt;bar&gt;&quot;\n</code></pre>\n'
+        "<ul>\n<li>item <code>1</code></li>\n<li>item 2</li>\n</ul>\n"
+        "<blockquote>\n<p>a &gt; b\nc</p>\n</blockquote>"
+    )
+
+    assert fastmarkdown.render(md) == expected_html
+    assert fastmarkdown.render(md) == _python_markdown(md)
+
+
+@pytest.mark.parametrize(
+    "md",
+    [
+        "<b>html</b>\nb",
+        "a &amp; b\nc",
+        "\\*escaped\\*\nb",
+        "snake_case\nb",
+        "[ref][1]\n\n[1]: https://github.com",
+        "![image](a.png)\nb",
+        "# Header\nb",
+        "Header\n---",
+        "a\n\n    indented",
+        "a  \nb",
+        "a * b\nc",
+        "**a *b* c**\nd",
+        "``a`` `b`\nc",
+        "- a\n\n- b",
+        "> a\n\n> b",
+        "a\n> b",
+        "```{.python}\na\n```",
+        "a\tb\nc",
+    ],
+)
+def test_render_unsupported(md):
+    """Test unsupported constructs are left to python-markdown"""
+    assert fastmarkdown.render(md) is None
+
+
+def test_render_corpus():
+    """Test the same HTML as python-markdown is rendered, on a large corpus"""
+    mds = corpus.generate_markdown(CORPUS_SIZE)
+
+    rendered = 0
+    for md in mds:
+        html = fastmarkdown.render(md)
+        if html is not None:
+            assert html == _python_markdown(md), md
+            rendered += 1
+
+    # Most of the corpus is rendered by fastmarkdown
+    assert rendered > CORPUS_SIZE // 2
+
+
+def test_converter_fallback():
+    """Test the converter renders supported Markdown without python-markdown"""
+    converter = MarkdownConverter()
+    assert converter.convert("**a**\nb") == "<p><strong>a</strong><br />b</p>"
+    assert converter._md is None
+
+    assert converter.convert("a_b\nc") == html_for_table(_python_markdown("a_b\nc"))
+    assert converter._md is not None
@@ -0,0 +1,152 @@
+import io
+import logging
+
+import pytest
+
+from actiondocs.gha import (
+    GHAFormatter,
+    GHAHandler,
+    append_step_summary,
+    is_debug,
+    set_output,
+)
+
+
+def test_set_output(tmp_path, monkeypatch):
+    """Test step outputs are appended to $GITHUB_OUTPUT"""
+    output_file = tmp_path / "output"
+    monkeypatch.setenv("GITHUB_OUTPUT", str(output_file))
+
+    set_output("changed", "true")
+    set_output("other", "abc")
+
+    assert output_file.read_text() == "changed=true\nother=abc\n"
+
+    with pytest.raises(ValueError):
+        set_output("multi", "a\nb")
+
+
+def test_set_output_outside_actions(tmp_path, monkeypatch):
+    """Test step outputs are ignored outside of GitHub Actions"""
+    monkeypatch.delenv("GITHUB_OUTPUT", raising=False)
+    set_output("changed", "true")
+
+
+def test_append_step_summary(tmp_path, monkeypatch):
+    """Test the job summary is appended to $GITHUB_STEP_SUMMARY"""
+    summary_file = tmp_path / "summary"
+    monkeypatch.setenv("GITHUB_STEP_SUMMARY", str(summary_file))
+
+    append_step_summary("# One\n")
+    append_step_summary("# Two\n")
+
+    assert summary_file.read_text() == "# One\n# Two\n"
+
+
+class CountingFormatter(GHAFormatter):
+    """A GHAFormatter that counts the records it formats"""
+
+    def __init__(self):
+        super().__init__(fmt="%(levelname)s %(message)s")
+        self.calls = 0
+
+    def format(self, record):
+        self.calls += 1
+        return super().format(record)
+
+
+@pytest.fixture()
+def gha_logger():
+    """A logger with a GHAHandler writing to a string"""
+    stream = io.StringIO()
+    handler = GHAHandler(stream, capacity=3)
+    handler.setFormatter(CountingFormatter())
+
+    logger = logging.getLogger("test_gha")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    yield logger, handler, stream
+    logger.removeHandler(handler)
+
+
+def test_formatter():
+    """Test records are formatted as workflow commands, by level"""
+    formatter = GHAFormatter(fmt="%(message)s")
+
+    def fmt(level):
+        return formatter.format(logging.makeLogRecord({"levelno": level, "msg": "m"}))
+
+    assert fmt(logging.DEBUG) == "::debug::m"
+    assert fmt(logging.INFO) == "m"
+    assert fmt(logging.WARNING) == "::warning::m"
+    assert fmt(logging.ERROR) == "::error::m"
+    assert fmt(logging.CRITICAL) == "::error::m"
+
+
+def test_formatter_plain_debug():
+    """Test debug records can be plain lines (e.g. with the 'debug' input)"""
+    formatter = GHAFormatter(fmt="%(message)s", plain_debug=True)
+
+    def fmt(level):
+        return formatter.format(logging.makeLogRecord({"levelno": level, "msg": "m"}))
+
+    assert fmt(logging.DEBUG) == "m"
+    assert fmt(logging.WARNING) == "::warning::m"
+
+
+def test_handler_plain_debug(gha_logger):
+    """Test plain debug records are still folded into groups"""
+    logger, handler, stream = gha_logger
+    handler.setFormatter(GHAFormatter(fmt="%(message)s", plain_debug=True))
+
+    logger.debug("d1")
+    logger.info("i1")
+    assert stream.getvalue() == "::group::Debug\nd1\n::endgroup::\ni1\n"
+
+
+def test_handler_buffer(gha_logger):
+    """Test debug records are buffered and folded into groups"""
+    logger, handler, stream = gha_logger
+
+    logger.debug("d1")
+    logger.debug("d2")
+    assert stream.getvalue() == ""
+
+    # Capacity reached
+    logger.debug("d3")
+    assert stream.getvalue() == (
+        "::group::Debug\n::debug::DEBUG d1\n::debug::DEBUG d2\n::debug::DEBUG d3\n"
+    )
+
+    # Flushed by (and out of the group for) an info record
+    logger.info("i1")
+    assert stream.getvalue().endswith("::debug::DEBUG d3\n::endgroup::\nINFO i1\n")
+
+    # Group closed on close
+    logger.debug("d4")
+    handler.close()
+    assert stream.getvalue().endswith(
+        "::group::Debug\n::debug::DEBUG d4\n::endgroup::\n"
+    )
+
+
+def test_handler_disabled_levels(gha_logger):
+    """Test records of disabled levels aren't formatted"""
+    logger, handler, stream = gha_logger
+    logger.setLevel(logging.INFO)
+
+    for i in range(10):
+        logger.debug(f"d{i}")
+    logger.info("i1")
+
+    assert handler.formatter.calls == 1
+    assert stream.getvalue() == "INFO i1\n"
+
+
+def test_is_debug(monkeypatch):
+    """Test debug logging follows the workflow run's"""
+    monkeypatch.setenv("RUNNER_DEBUG", "1")
+    assert is_debug()
+    monkeypatch.delenv("RUNNER_DEBUG")
+    assert not is_debug()
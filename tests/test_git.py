@@ -0,0 +1,129 @@
+import subprocess
+
+import pytest
+
+from actiondocs.__main__ import main
+from actiondocs.git import Git, GitError
+
+ACTION_YAML = "inputs:\n  in1:\n    description: desc\n"
+
+TEMPLATE = "# Title\n<!--doc_begin-->\n<!--doc_end-->\n"
+
+
+def _git(repo_dir, *args):
+    return subprocess.run(
+        ["git", *args], cwd=repo_dir, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def _log(repo_dir):
+    """The commits of the remote (subjects, newest first)"""
+    return _git(repo_dir, "log", "--format=%s", "main").splitlines()
+
+
+@pytest.fixture()
+def repo(tmp_path):
+    """A clone of a bare repository (the remote), with 2 actions"""
+    remote = tmp_path / "remote.git"
+    _git(tmp_path, "init", "-q", "--bare", "-b", "main", str(remote))
+    clone = tmp_path / "clone"
+    _git(tmp_path, "clone", "-q", str(remote), str(clone))
+    _git(clone, "checkout", "-q", "-b", "main")
+
+    for name in ["a", "b"]:
+        (clone / name).mkdir()
+        (clone / name / "action.yml").write_text(ACTION_YAML)
+        (clone / name / "README.md").write_text(TEMPLATE)
+    _git(clone, "add", ".")
+    _git(clone, "-c", "user.name=Me", "-c", "user.email=me@x", "commit", "-qm", "Init")
+    _git(clone, "push", "-q", "-u", "origin", "main")
+    return clone
+
+
+def test_commit_changes(repo):
+    """Test changed files are committed and pushed together"""
+    git = Git(str(repo), user_name="Bot", user_email="bot@x")
+    for name in ["a", "b"]:
+        (repo / name / "README.md").write_text("changed\n")
+    # Other staged changes aren't committed
+    (repo / "other.txt").write_text("other\n")
+    _git(repo, "add", "other.txt")
+
+    assert git.commit_changes(["a/README.md", "b/README.md"], message="Docs")
+    assert _log(repo.parent / "remote.git") == ["Docs", "Init"]
+    assert _git(repo, "log", "-1", "--format=%an <%ae>") == "Bot <bot@x>\n"
+    assert _git(repo, "show", "--name-only", "--format=") == (
+        "a/README.md\nb/README.md\n"
+    )
+    assert _git(repo, "diff", "--cached", "--name-only") == "other.txt\n"
+
+
+def test_commit_changes_unchanged(repo):
+    """Test nothing is committed without changes"""
+    git = Git(str(repo), user_name="Bot", user_email="bot@x")
+    assert not git.commit_changes([])
+
+    # Written again, but the same as HEAD
+    (repo / "a" / "README.md").write_text(TEMPLATE)
+    assert not git.commit_changes(["a/README.md"])
+    assert _log(repo.parent / "remote.git") == ["Init"]
+
+
+def test_commit_changes_error(repo):
+    """Test git failures are raised"""
+    _git(repo, "remote", "set-url", "origin", str(repo.parent / "missing.git"))
+    (repo / "a" / "README.md").write_text("changed\n")
+
+    git = Git(str(repo), user_name="Bot", user_email="bot@x")
+    with pytest.raises(GitError, match="'git push' failed"):
+        git.commit_changes(["a/README.md"])
+
+
+def test_commit_error(repo):
+    """Test failures are reported with the git subcommand (not its options)"""
+    git = Git(str(repo), user_name="Bot", user_email="bot@x")
+    with pytest.raises(GitError, match="'git commit' failed"):
+        git.commit(["missing.md"], "Docs")
+
+
+def test_main_batch_git_push(repo, monkeypatch):
+    """Test a batch makes one commit of every changed target"""
+    monkeypatch.chdir(repo)
+    argv = ["--glob", "*/action.yml", "--git-push", "--git-user-name", "Bot"]
+    argv += ["--git-user-email", "bot@x", "--git-commit-message", "Batch docs"]
+
+    main(argv)
+    assert _log(repo.parent / "remote.git") == ["Batch docs", "Init"]
+    assert "|`in1`|" in (repo / "b" / "README.md").read_text()
+
+    # Nothing changed, nothing committed
+    main(argv)
+    assert _log(repo.parent / "remote.git") == ["Batch docs", "Init"]
+
+
+def test_main_git_push(repo, monkeypatch):
+    """Test the target file is committed (with env. vars.) only when changed"""
+    monkeypatch.chdir(repo)
+    env_vars = {
+        "ACTION_YAML_FILE": "a/action.yml",
+        "INCLUDE_INPUTS": "true",
+        "INCLUDE_OUTPUTS": "true",
+        "HEADING_SIZE": "3",
+        "TEMPLATE_FILE": "a/README.md",
+        "TARGET_FILE": "a/README.md",
+        "MARKER_START": "<!--doc_begin-->",
+        "MARKER_END": "<!--doc_end-->",
+        "GIT_PUSH": "true",
+        "GIT_PUSH_USER_NAME": "Bot",
+        "GIT_PUSH_USER_EMAIL": "bot@x",
+        "GIT_COMMIT_SIGNOFF": "true",
+    }
+    for var, value in env_vars.items():
+        monkeypatch.setenv(var, value)
+
+    main([])
+    assert _log(repo.parent / "remote.git") == ["GitHub Action Auto-Docs", "Init"]
+    assert "Signed-off-by: Bot <bot@x>" in _git(repo, "log", "-1", "--format=%b")
+
+    main([])
+    assert len(_log(repo.parent / "remote.git")) == 2
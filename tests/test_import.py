@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Modules the entrypoint imported before they were only imported on first use
+BASELINE_MODULES = ["json", "logging", "re", "yaml", "markdown"]
+
+# Cold start budget of 'python -m actiondocs', relative to the import time of
+# BASELINE_MODULES (measured in the same conditions)
+# i.e. the cumulative import time of actiondocs.__main__
+COLD_START_RATIO = 0.8
+
+# Measures per import (the fastest one is kept, the others being noise)
+RUNS = 10
+
+# Modules that must only be imported on first use
+HEAVY_MODULES = [
+    "markdown",
+    "yaml",
+    "argparse",
+    "http.client",
+    "subprocess",
+    "urllib.parse",
+]
+
+
+def _importtime(code: str) -> dict:
+    """Runs <code> in a new interpreter, with -X importtime
+
+    Returns:
+        The cumulative import time (in µs) of each imported module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # import time: <self [us]> | <cumulative> | <imported package>
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def test_cold_start_lazy():
+    """Test the entrypoint doesn't import heavy modules"""
+    modules = _importtime("import actiondocs.__main__")
+    for module in HEAVY_MODULES:
+        assert module not in modules
+
+
+@pytest.mark.skipif(
+    os.environ.get("ACTIONDOCS_TIMINGS") != "1",
+    reason="timings are only compared with ACTIONDOCS_TIMINGS=1",
+)
+def test_cold_start():
+    """Test the entrypoint's import time is within budget"""
+    cold_start, baseline = [], []
+    for _ in range(RUNS):
+        modules = _importtime("import actiondocs.__main__")
+        cold_start.append(modules["actiondocs.__main__"])
+        modules = _importtime(f"import {', '.join(BASELINE_MODULES)}")
+        baseline.append(sum(modules.get(m, 0) for m in BASELINE_MODULES))
+    assert min(cold_start) < COLD_START_RATIO * min(baseline)
+
+
+def test_one_line_descriptions_no_markdown(tmp_path):
+    """Test python-markdown isn't imported for one-line descriptions"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text("inputs:\n  in1:\n    description: desc\n")
+    template_file = tmp_path / "README.md"
+    template_file.write_text("<!--doc_begin-->\n<!--doc_end-->\n")
+
+    modules = _importtime(
+        "from actiondocs import ActionDocs;"
+        f"ActionDocs(action_file={str(action_file)!r},"
+        f"template_file={str(template_file)!r}).save({str(template_file)!r})"
+    )
+
+    assert "yaml" in modules
+    assert "markdown" not in modules
+    assert "`in1`" in template_file.read_text()
@@ -0,0 +1,121 @@
+from actiondocs.__main__ import main
+from actiondocs.batch import jobs_from_glob
+from actiondocs.index import DependencyIndex
+
+ACTION_YAML = "inputs:\n  in1:\n    description: desc\n"
+
+TEMPLATE = "# Title\n<!--doc_begin-->\n<!--doc_end-->\n"
+
+# Documents another action in a named block
+TEMPLATE_SHARED = (
+    TEMPLATE + "<!--doc_begin:all path=shared/action.yml-->\n<!--doc_end:all-->\n"
+)
+
+
+def _actions(root):
+    """3 actions (a, b and c), b also documenting a shared action"""
+    for name in ["a", "b", "c", "shared"]:
+        (root / name).mkdir()
+        (root / name / "action.yml").write_text(ACTION_YAML)
+        (root / name / "README.md").write_text(TEMPLATE)
+    (root / "b" / "README.md").write_text(TEMPLATE_SHARED)
+
+
+def _affected(index, changed):
+    jobs = jobs_from_glob("*/action.yml")
+    return [job.action_file for job in index.affected(jobs, changed)]
+
+
+def test_affected(tmp_path, monkeypatch):
+    """Test only the jobs of changed files are affected"""
+    monkeypatch.chdir(tmp_path)
+    _actions(tmp_path)
+    index = DependencyIndex()
+
+    assert _affected(index, ["a/action.yml"]) == ["a/action.yml"]
+    assert index.scanned == 4
+    assert _affected(index, ["./shared/action.yml"]) == [
+        "b/action.yml",
+        "shared/action.yml",
+    ]
+    assert _affected(index, ["c/README.md", "other.txt"]) == ["c/action.yml"]
+    assert _affected(index, []) == []
+    # Only the changed template was scanned again
+    assert index.scanned == 5
+
+
+def test_affected_template_changed(tmp_path, monkeypatch):
+    """Test changed templates are scanned again (e.g. for new named blocks)"""
+    monkeypatch.chdir(tmp_path)
+    _actions(tmp_path)
+    index = DependencyIndex()
+    assert _affected(index, ["shared/action.yml"]) == [
+        "b/action.yml",
+        "shared/action.yml",
+    ]
+
+    (tmp_path / "b" / "README.md").write_text(TEMPLATE)
+    (tmp_path / "c" / "README.md").write_text(TEMPLATE_SHARED)
+    assert _affected(index, ["b/README.md", "c/README.md"]) == [
+        "b/action.yml",
+        "c/action.yml",
+    ]
+    assert _affected(index, ["shared/action.yml"]) == [
+        "c/action.yml",
+        "shared/action.yml",
+    ]
+
+
+def test_affected_layout(tmp_path, monkeypatch):
+    """Test the jobs of a changed layout file are affected"""
+    monkeypatch.chdir(tmp_path)
+    _actions(tmp_path)
+    (tmp_path / "layout.yml").write_text(
+        'inputs:\n  header: "|Name|"\n  separator: "|-|"\n  row: "|{name}|"\n'
+    )
+    index = DependencyIndex()
+
+    jobs = jobs_from_glob("*/action.yml", layout="./layout.yml")
+    affected = index.affected(jobs, ["layout.yml"])
+    assert [job.action_file for job in affected] == [job.action_file for job in jobs]
+    assert _affected(index, ["layout.yml"]) == []
+
+
+def test_index_persisted(tmp_path, monkeypatch):
+    """Test the index is kept between runs, without scanning templates"""
+    monkeypatch.chdir(tmp_path)
+    _actions(tmp_path)
+
+    index = DependencyIndex("index.json")
+    _affected(index, [])
+    index.save()
+
+    index = DependencyIndex("index.json")
+    assert _affected(index, ["shared/action.yml"]) == [
+        "b/action.yml",
+        "shared/action.yml",
+    ]
+    assert index.scanned == 0
+
+    # Forgotten targets (e.g. of deleted actions), unreadable indexes
+    (tmp_path / "a" / "action.yml").unlink()
+    _affected(index, [])
+    index.save()
+    assert "a/README.md" not in DependencyIndex("index.json")._entries
+
+    (tmp_path / "index.json").write_text("{")
+    assert DependencyIndex("index.json")._entries == {}
+
+
+def test_main_changed_files(tmp_path, monkeypatch):
+    """Test a batch only documents the actions affected by changed files"""
+    monkeypatch.chdir(tmp_path)
+    _actions(tmp_path)
+    (tmp_path / "changed.txt").write_text("shared/action.yml\n\n")
+
+    argv = ["--glob", "*/action.yml", "--changed-files", "changed.txt"]
+    main(argv + ["--index", "index.json"])
+
+    assert "|`in1`|" in (tmp_path / "b" / "README.md").read_text()
+    assert (tmp_path / "a" / "README.md").read_text() == TEMPLATE
+    assert (tmp_path / "index.json").exists()
@@ -4,6 +4,7 @@ from tempfile import NamedTemporaryFile
 import pytest
 
 from actiondocs import ActionDocs
+from actiondocs.__main__ import OPTIONAL_ENV_VARS, REQUIRED_ENV_VARS, main
 
 # Default options to use when they're not directly tested
 DEFAULT_OPTIONS = {
@@ -213,3 +214,151 @@ Text after"""
     ad.template = template_doc  # Override template
 
     assert ad.generate() == expected_doc
+
+
+def test_description_cache(dummy_action_file, dummy_template_file):
+    """Test identical multi-line descriptions are only converted once"""
+    action_config = {
+        "inputs": {
+            "in1": {"description": "shared\ndesc"},
+            "in2": {"description": "shared\ndesc"},
+        },
+        "outputs": {"out1": {"description": "shared\ndesc"}},
+    }
+
+    ad = ActionDocs(
+        action_file=dummy_action_file,
+        template_file=dummy_template_file,
+        **DEFAULT_OPTIONS,
+    )
+    ad._get_markdown_table_inputs(action_config)
+    ad._get_markdown_table_outputs(action_config)
+
+    assert (ad.cache.hits, ad.cache.misses) == (2, 1)
+
+
+def test_save_unchanged(dummy_action_file, dummy_template_file, tmp_path):
+    """Test save() only writes the target file when the document changed"""
+    target_file = tmp_path / "README.md"
+
+    ad = ActionDocs(
+        action_file=dummy_action_file,
+        template_file=dummy_template_file,
+        **DEFAULT_OPTIONS,
+    )
+    ad.action_config = {"inputs": {"in1": {"description": "desc"}}}
+    ad.template = "<!--start_test-->\n<!--end_test-->"
+
+    assert ad.save(str(target_file))
+    assert target_file.read_text() == ad.generate()
+
+    os.utime(target_file, (0, 0))
+    assert not ad.save(str(target_file))
+    assert target_file.stat().st_mtime == 0
+
+    ad.action_config = {"inputs": {"in2": {"description": "desc"}}}
+    assert ad.save(str(target_file))
+    assert "`in2`" in target_file.read_text()
+
+
+def test_substitution_named_blocks(tmp_path, monkeypatch):
+    """Test named blocks: each action file is parsed, each block rendered once"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text("inputs:\n  in1:\n    description: desc\n")
+    sub_action_file = tmp_path / "sub.yml"
+    sub_action_file.write_text("outputs:\n  out1:\n    description: desc\n")
+
+    template_doc = f"""Text before
+<!--doc_begin:inputs-->
+<!--doc_end:inputs-->
+Text between
+<!--doc_begin:outputs path={sub_action_file} heading_size=2-->
+old
+<!--doc_end:outputs-->
+<!--doc_begin:inputs-->
+<!--doc_end:inputs-->
+<!--doc_begin:unknown-->
+untouched
+<!--doc_end:unknown-->
+<!--doc_begin:outputs path={sub_action_file} heading_size=2-->
+<!--doc_end:outputs-->"""
+    expected_doc = f"""Text before
+<!--doc_begin:inputs-->
+### Inputs
+|Input|Description|Default|Required|
+|-----|-----------|-------|:------:|
+|`in1`|desc|n/a|no|
+<!--doc_end:inputs-->
+Text between
+<!--doc_begin:outputs path={sub_action_file} heading_size=2-->
+## Outputs
+|Output|Description|
+|------|-----------|
+|`out1`|desc|
+<!--doc_end:outputs-->
+<!--doc_begin:inputs-->
+### Inputs
+|Input|Description|Default|Required|
+|-----|-----------|-------|:------:|
+|`in1`|desc|n/a|no|
+<!--doc_end:inputs-->
+<!--doc_begin:unknown-->
+untouched
+<!--doc_end:unknown-->
+<!--doc_begin:outputs path={sub_action_file} heading_size=2-->
+## Outputs
+|Output|Description|
+|------|-----------|
+|`out1`|desc|
+<!--doc_end:outputs-->"""
+
+    ad = ActionDocs(action_file=str(action_file))
+    ad.template = template_doc  # Override template
+
+    loaded, rendered = [], []
+    load_yaml = ad._load_yaml
+    get_full_markdown = ad._get_full_markdown
+    monkeypatch.setattr(ad, "_load_yaml", lambda f: loaded.append(f) or load_yaml(f))
+    monkeypatch.setattr(
+        ad,
+        "_get_full_markdown",
+        lambda *a, **kw: rendered.append(a) or get_full_markdown(*a, **kw),
+    )
+
+    assert ad.generate() == expected_doc
+    assert loaded == [str(action_file), str(sub_action_file)]
+    assert len(rendered) == 2
+
+
+def test_lazy_loading(tmp_path):
+    """Test files are only loaded when needed"""
+    template_file = tmp_path / "README.md"
+    template_file.write_text("<!--doc_begin-->\n<!--doc_end-->\n")
+
+    ad = ActionDocs(
+        action_file=str(tmp_path / "missing.yml"),
+        template_file=str(template_file),
+        include_inputs=False,
+        include_outputs=False,
+    )
+    assert ad._template is None
+
+    # Nothing to document: the (missing) action file is never loaded
+    assert ad.generate() == "<!--doc_begin-->\n\n<!--doc_end-->\n"
+
+    ad.include_inputs = True
+    with pytest.raises(OSError):
+        ad.generate()
+
+
+def test_load_env_vars_missing(monkeypatch, caplog):
+    """Test only missing required env. vars. are reported (not optional ones)"""
+    for var in REQUIRED_ENV_VARS[1:]:
+        monkeypatch.setenv(var, "x")
+    monkeypatch.delenv(REQUIRED_ENV_VARS[0], raising=False)
+    for var in OPTIONAL_ENV_VARS:
+        monkeypatch.delenv(var, raising=False)
+
+    with pytest.raises(SystemExit):
+        main([])
+    assert f"Missing environment variable: {REQUIRED_ENV_VARS[0]}" in caplog.text
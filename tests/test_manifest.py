@@ -0,0 +1,262 @@
+from actiondocs import ActionDocs
+from actiondocs.cache import DescriptionCache
+from actiondocs.manifest import BlockManifest, previous_rows, row_check, row_hash
+
+INPUTS_HEADER = "|Input|Description|Default|Required|"
+
+ACTION_YAML = """inputs:
+  in1:
+    description: |
+      desc
+      in1
+  in2:
+    description: |
+      desc
+      in2
+    default: foo
+outputs:
+  out1:
+    description: |
+      desc
+      out1
+"""
+
+TEMPLATE = "# Title\n<!--doc_begin-->\n<!--doc_end-->\n"
+
+
+def _action_docs(action_file, template_file, **options):
+    return ActionDocs(
+        action_file=str(action_file),
+        template_file=str(template_file),
+        cache=DescriptionCache(),
+        incremental=True,
+        **options,
+    )
+
+
+def test_manifest_comment():
+    """Test manifests are parsed back from their comment"""
+    manifest = BlockManifest({"inputs": ["aa", "bb"], "outputs": []})
+    comment = manifest.to_comment()
+    assert comment == "<!--actiondocs inputs=aa,bb outputs=-->"
+
+    parsed = BlockManifest.parse(f"\n{comment}\n### Inputs\n")
+    assert parsed.rows == manifest.rows
+    assert BlockManifest.parse("\n### Inputs\n") is None
+
+
+def test_row_hash():
+    """Test row hashes change with the definition of rows"""
+    definition = {"description": "desc", "default": "foo"}
+    assert row_hash("inputs", "in1", definition) == row_hash(
+        "inputs", "in1", dict(reversed(definition.items()))
+    )
+    assert row_hash("inputs", "in1", definition) != row_hash(
+        "inputs", "in2", definition
+    )
+    assert row_hash("inputs", "in1", definition) != row_hash(
+        "outputs", "in1", definition
+    )
+
+
+def test_previous_rows_edited():
+    """Test tables and rows that don't match their manifest aren't reused"""
+    row = "|`in1`|desc|n/a|no|"
+    manifest = BlockManifest({"inputs": [f"aa:{row_check(row)}"]})
+    content = f"\n{manifest.to_comment()}\n{INPUTS_HEADER}\n|-|-|-|-|\n{row}\n"
+    assert previous_rows(content, manifest, "inputs", INPUTS_HEADER) == {"aa": row}
+
+    # Rows added, or edited, by hand
+    added = content + "|`in2`|added by hand|n/a|no|\n"
+    assert previous_rows(added, manifest, "inputs", INPUTS_HEADER) == {}
+    edited = content.replace("|desc|", "|edited by hand|")
+    assert previous_rows(edited, manifest, "inputs", INPUTS_HEADER) == {}
+
+    # Without the check of the row
+    manifest = BlockManifest({"inputs": ["aa"]})
+    assert previous_rows(content, manifest, "inputs", INPUTS_HEADER) == {}
+
+
+def test_previous_rows_generated():
+    """Test tables are only read from the generated Markdown"""
+    row = "|`in1`|desc|n/a|no|"
+    manifest = BlockManifest({"inputs": [f"aa:{row_check(row)}"]})
+    table = f"{INPUTS_HEADER}\n|-|-|-|-|\n{row}\n"
+    content = f"\n{table}\n{manifest.to_comment()}\n### Inputs\nNone\n"
+    assert previous_rows(content, manifest, "inputs", INPUTS_HEADER) == {}
+
+    # (the header on its own line)
+    content = f"\n{manifest.to_comment()}\n|`in0`{table}"
+    assert previous_rows(content, manifest, "inputs", INPUTS_HEADER) == {}
+
+
+def test_incremental(tmp_path):
+    """Test only changed rows are rendered again, the same as a full run"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text(ACTION_YAML)
+    readme = tmp_path / "README.md"
+    readme.write_text(TEMPLATE)
+
+    ad = _action_docs(action_file, readme)
+    assert ad.save(str(readme))
+    assert ad.cache.misses == 3
+    assert "<!--actiondocs inputs=" in readme.read_text()
+
+    # Unchanged
+    ad = _action_docs(action_file, readme)
+    assert not ad.save(str(readme))
+    assert ad.cache.misses == 0
+
+    # One changed input
+    action_file.write_text(ACTION_YAML.replace("in2\n", "in2 (changed)\n"))
+    ad = _action_docs(action_file, readme)
+    assert ad.save(str(readme))
+    assert ad.cache.misses == 1
+
+    # Same as rendering everything
+    full = tmp_path / "full.md"
+    full.write_text(TEMPLATE)
+    _action_docs(action_file, full).save(str(full))
+    assert readme.read_text() == full.read_text()
+
+
+def test_incremental_edited(tmp_path):
+    """Test tables edited by hand are rendered again entirely (only them)"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text(ACTION_YAML)
+    readme = tmp_path / "README.md"
+    readme.write_text(TEMPLATE)
+    _action_docs(action_file, readme).save(str(readme))
+    expected = readme.read_text()
+
+    readme.write_text(expected.replace("|`in1`|", "|`in0`|no|n/a|no|\n|`in1`|"))
+    ad = _action_docs(action_file, readme)
+    assert ad.save(str(readme))
+    assert ad.cache.misses == 2
+    assert readme.read_text() == expected
+
+
+def test_incremental_edited_row(tmp_path):
+    """Test rows edited by hand are rendered again (only them)"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text(ACTION_YAML)
+    readme = tmp_path / "README.md"
+    readme.write_text(TEMPLATE)
+    _action_docs(action_file, readme).save(str(readme))
+    expected = readme.read_text()
+
+    readme.write_text(expected.replace("desc<br />in2", "edited by hand"))
+    ad = _action_docs(action_file, readme)
+    assert ad.save(str(readme))
+    assert ad.cache.misses == 1
+    assert readme.read_text() == expected
+
+
+def test_incremental_target(tmp_path):
+    """Test rows are reused from the target file, when not in-place"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text(ACTION_YAML)
+    template = tmp_path / "README.tpl.md"
+    template.write_text(TEMPLATE)
+    readme = tmp_path / "README.md"
+
+    _action_docs(action_file, template).save(str(readme))
+
+    ad = _action_docs(action_file, template)
+    assert not ad.save(str(readme))
+    assert ad.cache.misses == 0
+
+
+def test_incremental_multiline_rows(tmp_path):
+    """Test rows of several lines aren't reused (they can't be read back)"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text('inputs:\n  in1:\n    description: ""\n    default: "\\n"\n')
+    readme = tmp_path / "README.md"
+    readme.write_text(TEMPLATE)
+
+    _action_docs(action_file, readme).save(str(readme))
+    expected = readme.read_text()
+    assert "<!--actiondocs -->" in expected
+
+    assert not _action_docs(action_file, readme).save(str(readme))
+    assert readme.read_text() == expected
+
+
+def _fail(*args):
+    raise AssertionError("Generated")
+
+
+def test_fingerprint(tmp_path, monkeypatch):
+    """Test fingerprinted documents aren't generated again while unchanged"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text(ACTION_YAML)
+    readme = tmp_path / "README.md"
+    readme.write_text(TEMPLATE)
+
+    ad = ActionDocs(str(action_file), template_file=str(readme), fingerprint=True)
+    assert not ad.is_up_to_date(str(readme))
+    assert ad.save(str(readme))
+    assert f"<!--actiondocs fingerprint={ad.get_fingerprint()}-->" in (
+        readme.read_text()
+    )
+
+    # Unchanged, without parsing anything
+    with monkeypatch.context() as m:
+        m.setattr(ActionDocs, "_load_yaml", _fail)
+        m.setattr(ActionDocs, "_get_block_markdown", _fail)
+        ad = ActionDocs(str(action_file), template_file=str(readme), fingerprint=True)
+        assert ad.is_up_to_date(str(readme))
+        assert not ad.save(str(readme))
+
+    # Changed template (outside of the block), action file, or options
+    readme.write_text(readme.read_text().replace("# Title", "# New title"))
+    ad = ActionDocs(str(action_file), template_file=str(readme), fingerprint=True)
+    assert ad.save(str(readme))
+
+    action_file.write_text(ACTION_YAML.replace("in2", "in3"))
+    ad = ActionDocs(str(action_file), template_file=str(readme), fingerprint=True)
+    assert not ad.is_up_to_date(str(readme))
+    assert ad.save(str(readme))
+
+    ad = ActionDocs(
+        str(action_file), template_file=str(readme), fingerprint=True, heading_size=2
+    )
+    assert ad.save(str(readme))
+    assert "\n## Inputs\n" in readme.read_text()
+
+
+def test_fingerprint_named_blocks(tmp_path):
+    """Test the action files of named blocks are fingerprinted"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text(ACTION_YAML)
+    sub_action_file = tmp_path / "sub.yml"
+    sub_action_file.write_text(ACTION_YAML)
+    readme = tmp_path / "README.md"
+    readme.write_text(
+        "<!--doc_begin:inputs-->\n<!--doc_end:inputs-->\n"
+        f"<!--doc_begin:outputs path={sub_action_file}-->\n<!--doc_end:outputs-->\n"
+    )
+
+    ad = ActionDocs(str(action_file), template_file=str(readme), fingerprint=True)
+    assert ad.save(str(readme))
+
+    sub_action_file.write_text(ACTION_YAML.replace("out1", "out2"))
+    ad = ActionDocs(str(action_file), template_file=str(readme), fingerprint=True)
+    assert ad.save(str(readme))
+    assert "|`out2`|" in readme.read_text()
+
+
+def test_is_up_to_date(tmp_path):
+    """Test checking documents without fingerprints"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text(ACTION_YAML)
+    readme = tmp_path / "README.md"
+    readme.write_text(TEMPLATE)
+
+    ad = ActionDocs(str(action_file), template_file=str(readme))
+    assert not ad.is_up_to_date(str(readme))
+    assert readme.read_text() == TEMPLATE
+
+    ad.save(str(readme))
+    ad = ActionDocs(str(action_file), template_file=str(readme))
+    assert ad.is_up_to_date(str(readme))
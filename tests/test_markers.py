@@ -0,0 +1,188 @@
+import io
+import random
+import re
+
+import pytest
+
+from actiondocs import ActionDocs
+from actiondocs.markers import (
+    find_all_blocks,
+    find_blocks,
+    find_named_blocks,
+    is_streamable,
+    stream_substitute,
+    substitute,
+)
+
+
+def _regex_substitute(text, marker_start, marker_end, replacement):
+    """Marker substitution, as ActionDocs.generate() did with a regex"""
+    marker_regex = re.compile(
+        rf"(?<={re.escape(marker_start)}).*(?={re.escape(marker_end)})", re.DOTALL
+    )
+    return marker_regex.sub(lambda m: replacement, text)
+
+
+@pytest.mark.parametrize(
+    "marker_start,marker_end",
+    [("<s>", "<e>"), ("<!--x-->", "-->"), ("aa", "a"), ("ab", "b"), ("xx", "xx")],
+)
+def test_substitute_same_as_regex(marker_start, marker_end):
+    """Test substitution on random strings is the same as the regex"""
+    rng = random.Random(0)
+    alphabet = list(set(marker_start + marker_end)) + ["z", "\n"]
+
+    for _ in range(5000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        assert substitute(text, marker_start, marker_end, "R") == _regex_substitute(
+            text, marker_start, marker_end, "R"
+        )
+
+
+def test_find_blocks_greedy():
+    """Test the content spans from the first start marker to the last end marker"""
+    text = "a<s>b<e>c<s>d<e>e"
+    assert find_blocks(text, "<s>", "<e>") == [(4, 13)]
+    assert find_blocks(text.encode(), b"<s>", b"<e>") == [(4, 13)]
+    assert find_blocks("a<e>b<s>c", "<s>", "<e>") == []
+    assert find_blocks("no markers", "<s>", "<e>") == []
+
+
+def test_substitute_literal():
+    """Test the replacement is inserted literally (e.g. backslashes)"""
+    assert substitute("<s><e>", "<s>", "<e>", r"C:\path\1") == r"<s>C:\path\1<e>"
+
+
+def test_stream_substitute(tmp_path):
+    """Test streamed substitution is the same as in-memory substitution"""
+    template = "Text before\n<s>\nold\n<e>\nText after é\n" * 3
+    template_file = tmp_path / "template.md"
+    template_file.write_text(template, encoding="utf-8")
+
+    f = io.BytesIO()
+    stream_substitute(str(template_file), f, "<s>", "<e>", "\nnew é\n".encode())
+
+    assert f.getvalue().decode() == substitute(template, "<s>", "<e>", "\nnew é\n")
+
+
+def test_stream_substitute_empty(tmp_path):
+    """Test streamed substitution of an empty template"""
+    template_file = tmp_path / "template.md"
+    template_file.write_text("")
+
+    f = io.BytesIO()
+    stream_substitute(str(template_file), f, "<s>", "<e>", b"new")
+
+    assert f.getvalue() == b""
+    assert is_streamable(str(template_file))
+
+
+def test_save_streamed_crlf(tmp_path):
+    """Test '\\r\\n' templates are saved the same as before streaming"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text("inputs:\n  in1:\n    description: desc\n")
+    template_file = tmp_path / "README.md"
+    template_file.write_bytes(b"before\r\n<s>\r\n<e>\r\nafter\r\n")
+    assert not is_streamable(str(template_file))
+
+    ad = ActionDocs(
+        action_file=str(action_file),
+        template_file=str(template_file),
+        include_outputs=False,
+        marker_start="<s>",
+        marker_end="<e>",
+    )
+    ad.save(str(tmp_path / "target.md"))
+
+    assert (tmp_path / "target.md").read_bytes() == ad.generate().encode()
+    assert b"\r" not in (tmp_path / "target.md").read_bytes()
+
+
+def test_save_streamed(tmp_path):
+    """Test streamed saves are the same as in-memory saves"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text("inputs:\n  in1:\n    description: desc\n")
+    template_file = tmp_path / "README.md"
+    template_file.write_text("before\n<s>\nold\n<e>\nafter\n")
+
+    def _ad():
+        return ActionDocs(
+            action_file=str(action_file),
+            template_file=str(template_file),
+            marker_start="<s>",
+            marker_end="<e>",
+        )
+
+    # Streamed (template not loaded)
+    ad = _ad()
+    assert ad.save(str(tmp_path / "streamed.md"))
+    assert ad._template is None
+
+    # In-memory
+    ad = _ad()
+    ad.template
+    assert ad.save(str(tmp_path / "in_memory.md"))
+
+    assert (tmp_path / "streamed.md").read_bytes() == (
+        tmp_path / "in_memory.md"
+    ).read_bytes()
+
+    # In-place, unchanged on the second run
+    assert _ad().save(str(template_file))
+    assert not _ad().save(str(template_file))
+    assert template_file.read_bytes() == (tmp_path / "streamed.md").read_bytes()
+
+
+def test_find_named_blocks():
+    """Test named blocks, with options, are found in order"""
+    text = (
+        "<!--doc_begin:inputs-->old<!--doc_end:inputs-->\n"
+        "<!--doc_begin:outputs path=sub/action.yml heading_size=2-->\n"
+        "<!--doc_end:outputs-->\n"
+        "<!--doc_begin:inputs-->unclosed\n"
+    )
+    blocks = find_named_blocks(text, "<!--doc_begin-->", "<!--doc_end-->")
+
+    assert [(b.name, b.options) for b in blocks] == [
+        ("inputs", {}),
+        ("outputs", {"path": "sub/action.yml", "heading_size": "2"}),
+    ]
+    assert text[blocks[0].start : blocks[0].end] == "old"
+    assert text[blocks[1].start : blocks[1].end] == "\n"
+
+    # Same in bytes
+    bin_blocks = find_named_blocks(text.encode(), "<!--doc_begin-->", "<!--doc_end-->")
+    assert [(b.start, b.end, b.name) for b in bin_blocks] == [
+        (b.start, b.end, b.name) for b in blocks
+    ]
+
+
+def test_find_all_blocks_unnamed_precedence():
+    """Test named blocks within the unnamed block are ignored"""
+    text = "<!--s--><!--s:a-->x<!--e:a--><!--e--> <!--s:b-->y<!--e:b-->"
+    blocks = find_all_blocks(text, "<!--s-->", "<!--e-->")
+
+    assert [(b.name, text[b.start : b.end]) for b in blocks] == [
+        (None, "<!--s:a-->x<!--e:a-->"),
+        ("b", "y"),
+    ]
+
+
+def test_save_streamed_named_blocks(tmp_path):
+    """Test streamed saves of named blocks are the same as in-memory saves"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text(
+        "inputs:\n  in1:\n    description: desc\n"
+        "outputs:\n  out1:\n    description: desc\n"
+    )
+    template_file = tmp_path / "README.md"
+    template_file.write_text(
+        "é\n<!--doc_begin:outputs-->\n<!--doc_end:outputs-->\n"
+        "<!--doc_begin:all heading_size=1-->\n<!--doc_end:all-->\n"
+    )
+
+    ad = ActionDocs(action_file=str(action_file), template_file=str(template_file))
+    assert ad.save(str(tmp_path / "streamed.md"))
+    assert ad._template is None
+
+    assert (tmp_path / "streamed.md").read_text() == ad.generate()
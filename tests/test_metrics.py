@@ -0,0 +1,83 @@
+import json
+
+from actiondocs import ActionDocs
+from actiondocs.metrics import Metrics
+
+ACTION_YAML = """inputs:
+  in1:
+    description: |
+      desc
+      in1
+  in2:
+    description: desc
+outputs:
+  out1:
+    description: desc
+"""
+
+
+def test_metrics():
+    """Test spans and counters are aggregated, and passed to hooks"""
+    metrics = Metrics()
+    spans = []
+    metrics.add_hook(lambda name, seconds, attrs: spans.append((name, attrs)))
+
+    with metrics.span("phase", file="a"):
+        pass
+    metrics.record("phase", 1.0)
+    metrics.count("rows", 2)
+    metrics.count("rows")
+    metrics.conversion("slow\nmd", 0.5)
+    metrics.conversion("fast\nmd", 0.1)
+
+    assert spans[0] == ("phase", {"file": "a"})
+    assert len(spans) == 4
+
+    data = metrics.to_dict()
+    assert data["spans"]["phase"]["count"] == 2
+    assert data["spans"]["phase"]["seconds"] >= 1.0
+    assert data["spans"]["convert"]["count"] == 2
+    assert data["counters"] == {"rows": 3}
+    assert data["slowest_conversion"] == {"seconds": 0.5, "excerpt": "slow\nmd"}
+
+    summary = metrics.to_markdown()
+    assert "|phase|2|" in summary
+    assert "Slowest conversion: 500.0ms (`slow`)" in summary
+
+
+def test_action_docs_metrics(tmp_path):
+    """Test every phase of a run is recorded"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text(ACTION_YAML)
+    template_file = tmp_path / "README.md"
+    template_file.write_text("<!--doc_begin-->\n<!--doc_end-->\n")
+
+    metrics = Metrics()
+    ad = ActionDocs(
+        action_file=str(action_file),
+        template_file=str(template_file),
+        metrics=metrics,
+    )
+
+    # Streamed
+    ad.save(str(tmp_path / "streamed.md"))
+    assert set(metrics.spans) == {
+        "load_yaml",
+        "render_inputs",
+        "render_outputs",
+        "convert",
+        "substitute",
+        "write",
+    }
+    assert metrics.counters == {"inputs": 2, "outputs": 1}
+    assert metrics.spans["convert"][0] == 1
+
+    # From the template loaded in memory
+    ad.template
+    ad.save(str(tmp_path / "loaded.md"))
+    assert "load_template" in metrics.spans
+    assert metrics.spans["write"][0] == 2
+
+    metrics.write_json(str(tmp_path / "metrics.json"))
+    with open(tmp_path / "metrics.json") as f:
+        assert json.load(f)["counters"] == {"inputs": 2, "outputs": 1}
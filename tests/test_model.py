@@ -0,0 +1,46 @@
+import pytest
+
+from actiondocs.model import ActionSpec
+
+
+def test_from_config():
+    """Test an action configuration is modelled in order, as written"""
+    config = {
+        "name": "Action",
+        "description": "An action",
+        "inputs": {
+            "in1": {"description": "desc1", "default": 3, "required": True},
+            "in2": {"description": "desc2", "deprecationMessage": "Use in1"},
+        },
+        "outputs": {"out1": {"description": "desc3", "value": "x"}},
+    }
+
+    spec = ActionSpec.from_config(config)
+    assert (spec.name, spec.description) == ("Action", "An action")
+    assert [i.name for i in spec.inputs] == ["in1", "in2"]
+    assert (spec.inputs[0].default, spec.inputs[0].required) == ("3", True)
+    assert (spec.inputs[1].default, spec.inputs[1].required) == (None, False)
+    assert spec.inputs[1].deprecation_message == "Use in1"
+    assert [(o.name, o.description) for o in spec.outputs] == [("out1", "desc3")]
+
+
+def test_from_config_sections():
+    """Test missing sections are None, and empty sections empty"""
+    spec = ActionSpec.from_config({"inputs": None})
+    assert (spec.inputs, spec.outputs) == ([], None)
+
+
+@pytest.mark.parametrize(
+    "config,error",
+    [
+        ([], "not a mapping"),
+        ({"inputs": ["in1"]}, "Invalid 'inputs'"),
+        ({"inputs": {"in1": "desc"}}, "Invalid input 'in1'"),
+        ({"inputs": {"in1": {"default": "x"}}}, "'description' must be a string"),
+        ({"outputs": {"out1": {"description": None}}}, "Invalid output 'out1'"),
+    ],
+)
+def test_from_config_invalid(config, error):
+    """Test invalid configurations are rejected"""
+    with pytest.raises(ValueError, match=error):
+        ActionSpec.from_config(config)
@@ -0,0 +1,246 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from actiondocs import ActionDocs
+from actiondocs.remote import (
+    ActionRef,
+    RemoteActions,
+    RemoteError,
+    find_workflow_uses,
+)
+
+SHA = "0123456789abcdef0123456789abcdef01234567"
+
+# Action files served by the stand-in server (by path)
+FILES = {
+    "/actions/checkout/v4/action.yml": "inputs:\n  ref:\n    description: The ref\n",
+    "/actions/setup-python/v5/action.yml": (
+        "inputs:\n  python-version:\n    description: The version\n"
+        "outputs:\n  python-path:\n    description: The path\n"
+    ),
+    f"/owner/repo/{SHA}/sub/action.yaml": "inputs:\n  in1:\n    description: d\n",
+}
+
+WORKFLOW = """on: push
+jobs:
+  test:
+    runs-on: ubuntu-latest
+    steps:
+    - uses: actions/setup-python@v5
+    - uses: ./
+    - uses: docker://alpine:3
+    - run: echo
+    - uses: actions/checkout@v4
+  other:
+    uses: owner/repo/.github/workflows/reusable.yml@v1
+"""
+
+
+class StandIn(ThreadingHTTPServer):
+    """A stand-in for raw.githubusercontent.com (keep-alive, ETags)"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.requests = []
+        self.clients = set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests.append(self.path)
+            self.server.clients.add(self.client_address)
+
+        body = FILES.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        etag = '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = StandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize(
+    "uses, expected",
+    [
+        ("actions/checkout@v4", ("actions", "checkout", "", "v4")),
+        (f"owner/repo/sub/dir@{SHA}", ("owner", "repo", "sub/dir", SHA)),
+        ("./local", None),
+        ("docker://alpine:3", None),
+        ("owner/repo/.github/workflows/reusable.yml@v1", None),
+    ],
+)
+def test_action_ref(uses, expected):
+    """Test 'uses' of remote actions are parsed (and others rejected)"""
+    if expected is None:
+        with pytest.raises(ValueError):
+            ActionRef.from_uses(uses)
+        return
+
+    ref = ActionRef.from_uses(uses)
+    assert (ref.owner, ref.repo, ref.path, ref.ref) == expected
+    assert ref.uses == uses
+    assert ref.pinned == (ref.ref == SHA)
+
+
+def test_find_workflow_uses(tmp_path):
+    """Test remote actions of workflows are found, once each, sorted"""
+    (tmp_path / "test.yml").write_text(WORKFLOW)
+    (tmp_path / "other.yaml").write_text(WORKFLOW)
+    (tmp_path / "empty.yml").write_text("")
+
+    refs = find_workflow_uses(str(tmp_path))
+    assert [r.uses for r in refs] == ["actions/checkout@v4", "actions/setup-python@v5"]
+
+
+def test_fetch_all_pooled(monkeypatch, server):
+    """Test remote actions are fetched once, on reused connections"""
+    remote = RemoteActions(base_url=server.url, workers=2)
+    refs = [ActionRef("actions", "pooled", "", f"v{n}") for n in range(10)]
+    for n in range(10):
+        monkeypatch.setitem(FILES, f"/actions/pooled/v{n}/action.yml", "{}")
+    try:
+        remote.fetch_all(refs + refs)
+    finally:
+        remote.close()
+
+    assert remote.requests == 10
+    assert len(server.requests) == 10
+    # (at most one connection per worker)
+    assert len(server.clients) <= 2
+    assert remote.pool.connections == len(server.clients)
+
+
+def test_fetch_cached(tmp_path, server):
+    """Test repeat runs make conditional requests, or none when pinned"""
+    uses = ["actions/checkout@v4", f"owner/repo/sub@{SHA}"]
+    refs = [ActionRef.from_uses(u) for u in uses]
+
+    remote = RemoteActions(cache_dir=str(tmp_path), base_url=server.url)
+    remote.fetch_all(refs)
+    # (action.yml wasn't found for the pinned one)
+    assert remote.requests == 3
+    assert remote.load(refs[1]) == {"inputs": {"in1": {"description": "d"}}}
+
+    remote = RemoteActions(cache_dir=str(tmp_path), base_url=server.url)
+    remote.fetch_all(refs)
+    assert remote.requests == 1
+    assert remote.not_modified == 1
+    assert remote.cache_hits == 2
+    assert remote.load(refs[0]) == {"inputs": {"ref": {"description": "The ref"}}}
+
+
+def test_fetch_cache_unwritable(tmp_path, server):
+    """Test a cache that can't be written to isn't fatal"""
+    cache_dir = tmp_path / "cache"
+    cache_dir.write_text("not a directory")
+    ref = ActionRef.from_uses("actions/checkout@v4")
+
+    remote = RemoteActions(cache_dir=str(cache_dir), base_url=server.url)
+    remote.fetch_all([ref])
+    assert remote.load(ref) == {"inputs": {"ref": {"description": "The ref"}}}
+
+
+def test_fetch_errors(server):
+    """Test missing remote actions fail when loaded"""
+    remote = RemoteActions(base_url=server.url)
+    ref = ActionRef.from_uses("actions/missing@v1")
+    remote.fetch_all([ref])
+    with pytest.raises(RemoteError, match="actions/missing@v1"):
+        remote.load(ref)
+
+    remote = RemoteActions(base_url="http://127.0.0.1:1")
+    with pytest.raises(RemoteError):
+        remote.load(ActionRef.from_uses("actions/checkout@v4"))
+
+
+TEMPLATE = """# Title
+<!--doc_begin:inputs uses=actions/checkout@v4-->
+<!--doc_end:inputs-->
+<!--doc_begin:workflows heading_size=2-->
+<!--doc_end:workflows-->
+"""
+
+EXPECTED = """# Title
+<!--doc_begin:inputs uses=actions/checkout@v4-->
+### Inputs
+|Input|Description|Default|Required|
+|-----|-----------|-------|:------:|
+|`ref`|The ref|n/a|no|
+<!--doc_end:inputs-->
+<!--doc_begin:workflows heading_size=2-->
+## `actions/checkout@v4`
+### Inputs
+|Input|Description|Default|Required|
+|-----|-----------|-------|:------:|
+|`ref`|The ref|n/a|no|
+### Outputs
+None
+## `actions/setup-python@v5`
+### Inputs
+|Input|Description|Default|Required|
+|-----|-----------|-------|:------:|
+|`python-version`|The version|n/a|no|
+### Outputs
+|Output|Description|
+|------|-----------|
+|`python-path`|The path|
+<!--doc_end:workflows-->
+"""
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_save_remote(tmp_path, monkeypatch, server, streaming):
+    """Test remote actions are documented with the same tables"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".github" / "workflows").mkdir(parents=True)
+    (tmp_path / ".github" / "workflows" / "test.yml").write_text(WORKFLOW)
+    (tmp_path / "README.md").write_text(TEMPLATE)
+
+    remote = RemoteActions(base_url=server.url)
+    ad = ActionDocs(action_file="action.yml", remote=remote, streaming=streaming)
+    assert ad.save("README.md")
+    assert (tmp_path / "README.md").read_text() == EXPECTED
+
+    # Fetched concurrently, once each (the local action file isn't read)
+    assert remote.requests == 2
+    assert ad.get_action_files() == [".github/workflows/test.yml"]
+    assert ".github/workflows/test.yml" in ad.source_files
@@ -0,0 +1,200 @@
+import json
+
+import corpus
+import pytest
+
+from actiondocs import ActionDocs
+from actiondocs.renderers import DEFAULT_LAYOUT, TableLayout, compile_row, load_layout
+from actiondocs.utils import is_multiline, markdown_to_github_html_for_table
+
+ACTION_CONFIG = {
+    "name": "Action",
+    "description": "An action",
+    "inputs": {
+        "in1": {"description": "multi\n`line`", "default": "x<y"},
+        "in2": {"description": "one *line*", "required": True},
+    },
+    "outputs": {"out1": {"description": "multi\n`line`"}},
+}
+
+
+@pytest.fixture()
+def action_doc(tmp_path):
+    ad = ActionDocs(
+        action_file=str(tmp_path / "action.yml"),
+        template_file=str(tmp_path / "README.md"),
+    )
+    ad.action_config = ACTION_CONFIG
+    return ad
+
+
+def test_render_markdown(action_doc):
+    """Test the Markdown format is the documentation's tables"""
+    assert action_doc.render("markdown") == (
+        "### Inputs\n"
+        f"{action_doc._get_markdown_table_inputs(ACTION_CONFIG)}\n"
+        "### Outputs\n"
+        f"{action_doc._get_markdown_table_outputs(ACTION_CONFIG)}"
+    )
+
+
+def test_render_html(action_doc):
+    """Test the HTML format, with every description converted"""
+    html = action_doc.render("html")
+    assert html.startswith("<h3>Inputs</h3>\n<table>\n<thead>\n")
+    assert (
+        "<tr><td><code>in1</code></td><td><p>multi<br /><code>line</code></p></td>"
+        "<td><code>x&lt;y</code></td><td>no</td></tr>"
+    ) in html
+    assert "<td><p>one <em>line</em></p></td><td>n/a</td><td>yes</td>" in html
+    assert "<h3>Outputs</h3>" in html
+
+    action_doc.action_config = {"name": "Action"}
+    assert action_doc.render("html") == (
+        "<h3>Inputs</h3>\n<p>None</p>\n<h3>Outputs</h3>\n<p>None</p>\n"
+    )
+
+
+def test_render_json(action_doc):
+    """Test the JSON format, with descriptions as written and converted"""
+    action = json.loads(action_doc.render("json"))
+    assert (action["name"], action["description"]) == ("Action", "An action")
+    assert action["inputs"][1] == {
+        "name": "in2",
+        "description": "one *line*",
+        "description_html": "<p>one <em>line</em></p>",
+        "default": None,
+        "required": True,
+        "deprecation_message": None,
+    }
+    assert action["outputs"][0]["description_html"] == (
+        "<p>multi<br /><code>line</code></p>"
+    )
+
+    action_doc.include_outputs = False
+    assert "outputs" not in json.loads(action_doc.render("json"))
+
+
+def test_render_shared_conversions(action_doc):
+    """Test descriptions converted for a format are reused by the others"""
+    action_doc.render("markdown")
+    misses = action_doc.cache.misses
+
+    action_doc.render("html")
+    action_doc.render("json")
+    assert action_doc.cache.misses == misses
+    assert action_doc.cache.hits > 0
+
+
+def test_render_same_descriptions(action_doc):
+    """Test every format has the same HTML of multi-line descriptions"""
+    descs = corpus.generate_markdown(200, seed=1) + ["```\ncode\n    indented\n```"]
+    action_doc.action_config = {
+        "inputs": {f"in{i}": {"description": d} for i, d in enumerate(descs)}
+    }
+    md = action_doc.render("markdown")
+    html = action_doc.render("html")
+    inputs = json.loads(action_doc.render("json"))["inputs"]
+
+    for desc, item in zip(descs, inputs):
+        if not is_multiline(desc):
+            continue
+        expected = markdown_to_github_html_for_table(desc)
+        assert f"|{expected}|" in md
+        assert f"<td>{expected}</td>" in html
+        assert item["description_html"] == expected
+
+
+def test_render_unknown(action_doc):
+    """Test unknown formats are rejected"""
+    with pytest.raises(ValueError, match="Unknown format 'xml'"):
+        action_doc.render("xml")
+
+
+def test_export(action_doc, tmp_path):
+    """Test export() only writes files when they changed"""
+    json_file = tmp_path / "action.json"
+
+    assert action_doc.export(str(json_file), "json")
+    assert json.loads(json_file.read_text())["name"] == "Action"
+    assert not action_doc.export(str(json_file), "json")
+
+
+LAYOUT_YAML = """inputs:
+  header: "|Name|Required|Default|"
+  separator: "|-|-|-|"
+  row: "|{name}|{required}|{default_value}{{x}}|"
+"""
+
+
+def test_compile_row():
+    """Test row templates are compiled to functions of their fields"""
+    row = compile_row("|`{name}`|{{{required}}}|'\"\\|", "inputs")
+    assert row("in1", "desc", "`x`", "x", "yes", "") == "|`in1`|{yes}|'\"\\|"
+    assert compile_row("|{name}|", "outputs") is compile_row("|{name}|", "outputs")
+
+
+@pytest.mark.parametrize(
+    "inputs",
+    [
+        {"row": "|{unknown}|"},
+        {"row": "|{name!r}|"},
+        {"row": "|{name:>10}|"},
+        {"row": "|{name|"},
+        {"row": "no pipe"},
+        {"header": "|a|\n|b|"},
+        {"other": "|a|"},
+        {"row": 1},
+    ],
+)
+def test_layout_invalid(inputs):
+    """Test invalid layouts are rejected"""
+    with pytest.raises(ValueError):
+        TableLayout(inputs=inputs)
+
+
+def test_layout(tmp_path, action_doc):
+    """Test tables are laid out as per the layout (default when missing)"""
+    (tmp_path / "layout.yml").write_text(LAYOUT_YAML)
+    layout = load_layout(str(tmp_path / "layout.yml"))
+    # (loaded once while unchanged)
+    assert load_layout(str(tmp_path / "layout.yml")) is layout
+    assert DEFAULT_LAYOUT.key == "" and layout.key != ""
+
+    ad = ActionDocs(action_file=action_doc.action_file, layout=layout)
+    ad.action_config = ACTION_CONFIG
+    assert ad._get_markdown_table_inputs(ACTION_CONFIG) == (
+        "|Name|Required|Default|\n|-|-|-|\n|in1|no|x<y{x}|\n|in2|yes|{x}|"
+    )
+    assert ad._get_markdown_table_outputs(
+        ACTION_CONFIG
+    ) == action_doc._get_markdown_table_outputs(ACTION_CONFIG)
+
+
+@pytest.mark.parametrize(
+    "layout_yaml",
+    # (incl. only the rows, for the default header to be found)
+    [LAYOUT_YAML, 'inputs:\n  row: "|{name}|{required}|{default_value}{{x}}|"\n'],
+)
+@pytest.mark.parametrize("incremental", [False, True])
+@pytest.mark.parametrize("streaming", [False, True])
+def test_save_layout(tmp_path, layout_yaml, incremental, streaming):
+    """Test documents are saved with the layout (rows of others never reused)"""
+    (tmp_path / "action.yml").write_text(json.dumps(ACTION_CONFIG))
+    (tmp_path / "layout.yml").write_text(layout_yaml)
+    (tmp_path / "README.md").write_text("<!--doc_begin-->\n<!--doc_end-->\n")
+
+    documents = []
+    for layout in [None, str(tmp_path / "layout.yml")]:
+        ActionDocs(
+            action_file=str(tmp_path / "action.yml"),
+            template_file=str(tmp_path / "README.md"),
+            incremental=incremental,
+            streaming=streaming,
+            layout=layout,
+        ).save(str(tmp_path / "README.md"))
+        documents.append((tmp_path / "README.md").read_text())
+
+    assert "|`in1`|" in documents[0]
+    assert "|in1|no|x<y{x}|" in documents[1]
+    assert "|`in1`|" not in documents[1]
@@ -0,0 +1,169 @@
+import io
+import json
+import socket
+import threading
+
+import pytest
+
+from actiondocs import generate_document
+from actiondocs import server as server_module
+from actiondocs.server import (
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    RENDER_ERROR,
+    RenderServer,
+)
+
+ACTION_YAML = "inputs:\n  in1:\n    description: |\n      a\n      b\n"
+
+TEMPLATE = "# Title\n<!--doc_begin-->\n<!--doc_end-->\n"
+
+
+def _request(request_id, method, **params):
+    return json.dumps(
+        {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+    )
+
+
+def test_generate_document(tmp_path, monkeypatch):
+    """Test documents are generated from text, without reading any file"""
+    monkeypatch.chdir(tmp_path)
+    document = generate_document(ACTION_YAML, TEMPLATE, include_outputs=False)
+    assert document == (
+        "# Title\n<!--doc_begin-->\n### Inputs\n"
+        "|Input|Description|Default|Required|\n"
+        "|-----|-----------|-------|:------:|\n"
+        "|`in1`|<p>a<br />b</p>|n/a|no|\n\n"
+        "<!--doc_end-->\n"
+    )
+    assert list(tmp_path.iterdir()) == []
+
+    # Empty action files have neither inputs nor outputs
+    assert "### Outputs\nNone\n" in generate_document("", TEMPLATE)
+
+    with pytest.raises(ValueError, match="Fingerprints"):
+        generate_document(ACTION_YAML, TEMPLATE, fingerprint=True)
+
+
+def test_handle():
+    """Test requests share parsed configurations and converted descriptions"""
+    server = RenderServer()
+    options = {"include_outputs": False}
+
+    for request_id in [1, 2]:
+        response = json.loads(
+            server.handle(
+                _request(
+                    request_id,
+                    "generate",
+                    action_yaml=ACTION_YAML,
+                    template=TEMPLATE,
+                    options=options,
+                )
+            )
+        )
+        assert response["id"] == request_id
+        assert response["result"] == generate_document(ACTION_YAML, TEMPLATE, **options)
+
+    response = json.loads(
+        server.handle(_request(3, "render", action_yaml=ACTION_YAML, format="json"))
+    )
+    assert json.loads(response["result"])["inputs"][0]["name"] == "in1"
+
+    stats = json.loads(server.handle(_request(4, "stats")))["result"]
+    assert stats["requests"] == 4
+    assert (stats["cache_hits"], stats["cache_misses"], stats["configs"]) == (2, 1, 1)
+
+    # Notifications (without id) aren't responded to
+    assert server.handle('{"jsonrpc": "2.0", "method": "stats"}') is None
+
+
+@pytest.mark.parametrize(
+    "line,code",
+    [
+        ("{", PARSE_ERROR),
+        ('{"id": 1, "method": "stats"}', INVALID_REQUEST),
+        (_request(1, "save"), METHOD_NOT_FOUND),
+        (_request(1, "generate", action_yaml=ACTION_YAML), INVALID_PARAMS),
+        (
+            _request(1, "generate", action_yaml="", template="", options={"x": 1}),
+            INVALID_PARAMS,
+        ),
+        (_request(1, "generate", action_yaml="a: [", template=""), RENDER_ERROR),
+        (_request(1, "generate", action_yaml="- a", template=TEMPLATE), RENDER_ERROR),
+        (_request(1, "render", action_yaml="", format="xml"), RENDER_ERROR),
+    ],
+)
+def test_handle_error(line, code):
+    """Test failed requests are responded to with an error"""
+    server = RenderServer()
+    response = json.loads(server.handle(line))
+    assert response["error"]["code"] == code
+    assert server.errors == 1
+
+
+def test_handle_bounded(monkeypatch):
+    """Test converted descriptions kept in memory are bounded in number"""
+    monkeypatch.setattr(server_module, "DESCRIPTIONS_SIZE", 5)
+    server = RenderServer()
+    for i in range(20):
+        action_yaml = ACTION_YAML.replace("b\n", f"b{i}\n")
+        server.handle(
+            _request(i, "generate", action_yaml=action_yaml, template=TEMPLATE)
+        )
+    assert server.errors == 0
+    assert len(server.cache._memo) == 5
+
+
+def test_serve():
+    """Test requests of a stream are all responded to"""
+    server = RenderServer()
+    requests = [
+        _request(i, "generate", action_yaml=ACTION_YAML, template=TEMPLATE)
+        for i in range(20)
+    ]
+    wfile = io.StringIO()
+    server.serve(io.StringIO("\n".join(requests) + "\n\n"), wfile)
+
+    responses = [json.loads(line) for line in wfile.getvalue().splitlines()]
+    assert sorted(r["id"] for r in responses) == list(range(20))
+    assert len({r["result"] for r in responses}) == 1
+
+
+def test_serve_unix(tmp_path):
+    """Test clients of a Unix socket are handled concurrently"""
+    server = RenderServer()
+    path = str(tmp_path / "actiondocs.sock")
+    unix_server = server.unix_server(path)
+    thread = threading.Thread(target=unix_server.serve_forever)
+    thread.start()
+
+    def client(n, results):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(path)
+            rfile = sock.makefile("r")
+            for i in range(5):
+                sock.sendall(
+                    _request(
+                        i, "generate", action_yaml=ACTION_YAML, template=TEMPLATE
+                    ).encode("utf-8")
+                    + b"\n"
+                )
+                results[n].append(json.loads(rfile.readline())["result"])
+
+    try:
+        results = [[] for _ in range(4)]
+        clients = [threading.Thread(target=client, args=(n, results)) for n in range(4)]
+        for t in clients:
+            t.start()
+        for t in clients:
+            t.join()
+    finally:
+        unix_server.shutdown()
+        unix_server.server_close()
+        thread.join()
+
+    expected = generate_document(ACTION_YAML, TEMPLATE)
+    assert results == [[expected] * 5] * 4
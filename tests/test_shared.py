@@ -0,0 +1,130 @@
+import subprocess
+import sys
+import threading
+
+from actiondocs import ActionDocs
+from actiondocs.utils import FileLock, lock_filename
+
+WRITERS = 8
+ITERATIONS = 5
+
+
+def _template(n: int) -> str:
+    """A template with a named block per action (a0/action.yml, ...)"""
+    blocks = [
+        f"## Action {i}\n"
+        f"<!--doc_begin:inputs path=a{i}/action.yml-->\n"
+        "<!--doc_end:inputs-->\n"
+        for i in range(n)
+    ]
+    return "# Actions\n" + "".join(blocks)
+
+
+def _action(i: int, k: int) -> str:
+    return f"inputs:\n  in_{i}_{k}:\n    description: Input {k} of {i}\n"
+
+
+def _save(i: int, target: str = "README.md") -> bool:
+    return ActionDocs(
+        action_file=f"a{i}/action.yml",
+        template_file="README.md",
+        shared=True,
+    ).save(target)
+
+
+def test_save_shared(tmp_path, monkeypatch):
+    """Test only the blocks of the action file are replaced"""
+    monkeypatch.chdir(tmp_path)
+    for i in range(2):
+        (tmp_path / f"a{i}").mkdir()
+        (tmp_path / f"a{i}" / "action.yml").write_text(_action(i, 0))
+    (tmp_path / "README.md").write_text(_template(2))
+
+    assert _save(0)
+    text = (tmp_path / "README.md").read_text()
+    assert "`in_0_0`" in text
+    assert "`in_1_0`" not in text
+
+    # (edited by another writer since)
+    (tmp_path / "README.md").write_text(text.replace("Action 1", "Action One"))
+    (tmp_path / "a0" / "action.yml").write_text(_action(0, 1))
+    assert _save(0)
+    text = (tmp_path / "README.md").read_text()
+    assert "`in_0_1`" in text
+    assert "Action One" in text
+    assert not _save(0)
+
+
+def test_save_shared_target(tmp_path, monkeypatch):
+    """Test other writers' blocks are kept in a target (not the template)"""
+    monkeypatch.chdir(tmp_path)
+    for i in range(2):
+        (tmp_path / f"a{i}").mkdir()
+        (tmp_path / f"a{i}" / "action.yml").write_text(_action(i, 0))
+    (tmp_path / "README.md").write_text(_template(2))
+
+    assert _save(1, "DOCS.md")
+    assert _save(0, "DOCS.md")
+    text = (tmp_path / "DOCS.md").read_text()
+    assert "`in_0_0`" in text and "`in_1_0`" in text
+    # The template is left as-is
+    assert (tmp_path / "README.md").read_text() == _template(2)
+
+
+def test_file_lock(tmp_path):
+    """Test the lock is exclusive between threads"""
+    lock_file = lock_filename(str(tmp_path / "README.md"))
+    assert lock_file == str(tmp_path / ".README.md.lock")
+
+    counter = tmp_path / "counter"
+    counter.write_text("0")
+
+    def increment():
+        for _ in range(50):
+            with FileLock(lock_file):
+                n = int(counter.read_text())
+                counter.write_text(str(n + 1))
+
+    threads = [threading.Thread(target=increment) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.read_text() == "200"
+
+
+# A writer process: documents its action, changed <iterations> times
+WRITER = """
+import sys
+from actiondocs import ActionDocs
+
+i, iterations = int(sys.argv[1]), int(sys.argv[2])
+for k in range(iterations):
+    with open(f"a{i}/action.yml", "w") as f:
+        f.write(f"inputs:\\n  in_{i}_{k}:\\n    description: Input {k} of {i}\\n")
+    ActionDocs(
+        action_file=f"a{i}/action.yml", template_file="README.md", shared=True
+    ).save("README.md")
+"""
+
+
+def test_save_shared_stress(tmp_path):
+    """Test concurrent writer processes never lose each other's blocks"""
+    for i in range(WRITERS):
+        (tmp_path / f"a{i}").mkdir()
+    (tmp_path / "README.md").write_text(_template(WRITERS))
+
+    writers = [
+        subprocess.Popen(
+            [sys.executable, "-c", WRITER, str(i), str(ITERATIONS)], cwd=tmp_path
+        )
+        for i in range(WRITERS)
+    ]
+    for writer in writers:
+        assert writer.wait(timeout=60) == 0
+
+    text = (tmp_path / "README.md").read_text()
+    for i in range(WRITERS):
+        assert f"`in_{i}_{ITERATIONS - 1}`" in text
+        assert f"`in_{i}_0`" not in text
+    assert text.count("|Input|") == WRITERS
@@ -1,6 +1,13 @@
 import os
 
-from actiondocs.utils import markdown_to_github_html_for_table
+from actiondocs.utils import (
+    UMASK,
+    MarkdownConverter,
+    ParallelConverter,
+    is_multiline,
+    markdown_to_github_html_for_table,
+    write_if_changed,
+)
 
 
 def test_table_markdown():
@@ -32,3 +39,109 @@ Text
     )
 
     assert markdown_to_github_html_for_table(input_md) == expected_html
+
+
+def test_is_multiline():
+    """Test is_multiline matches str.splitlines()"""
+    for md in ["", "a", "a\n", "\n", "a\r\n", "a\nb", "a\rb", "a\u2028", "\n\n"]:
+        assert is_multiline(md) == (len(md.splitlines()) != 1)
+
+
+def test_converter_convert_many():
+    """Test the converter is reset between cells"""
+    cells = [
+        "[link][ref]\n\n[ref]: https://github.com",
+        "[link][ref]\n",
+        "one line",
+        "[link][ref]\ntwo lines",
+    ]
+    expected_html = [
+        '<p><a href="https://github.com">link</a></p>',
+        "[link][ref]\n",
+        "one line",
+        "<p>[link][ref]<br />two lines</p>",
+    ]
+
+    assert MarkdownConverter().convert_many(cells) == expected_html
+
+
+def test_parallel_converter():
+    """Test parallel conversions are in order, and the same as serial ones"""
+    cells = [
+        f"Cell {i}:\n\n```yaml\nfoo: {i}\n```" if i % 3 else f"one line {i}"
+        for i in range(50)
+    ]
+    expected_html = MarkdownConverter().convert_many(cells)
+
+    observed = []
+    with ParallelConverter(workers=2, threshold=10, chunk_size=7) as converter:
+        assert (
+            converter.convert_many(
+                cells, observe=lambda md, seconds: observed.append(md)
+            )
+            == expected_html
+        )
+        assert converter._executor is not None
+
+    assert observed == [c for c in cells if is_multiline(c)]
+    assert converter._executor is None
+
+
+def test_parallel_converter_threshold():
+    """Test few conversions are serial (without worker processes)"""
+    converter = ParallelConverter(threshold=10)
+    assert converter.convert_many(["a\nb"] * 9) == ["<p>a<br />b</p>"] * 9
+    assert converter._executor is None
+
+
+def test_write_if_changed(tmp_path):
+    """Test files are only written to when their content changes"""
+    target = tmp_path / "target.md"
+
+    # New file
+    assert write_if_changed(str(target), b"abc")
+    assert target.read_bytes() == b"abc"
+
+    # Same content: untouched
+    os.chmod(target, 0o640)
+    os.utime(target, (0, 0))
+    assert not write_if_changed(str(target), b"abc")
+    assert target.stat().st_mtime == 0
+
+    # Same size, different content; mode is kept
+    assert write_if_changed(str(target), b"abd")
+    assert target.read_bytes() == b"abd"
+    assert target.stat().st_mode & 0o777 == 0o640
+
+    # No temporary file left behind
+    assert os.listdir(tmp_path) == ["target.md"]
+
+
+def test_write_if_changed_umask(tmp_path, monkeypatch):
+    """Test new files get the umask's mode, without setting the umask"""
+    umask = os.umask(0)
+    os.umask(umask)
+    assert UMASK == umask
+
+    def set_umask(mask):
+        raise AssertionError("umask set")
+
+    monkeypatch.setattr(os, "umask", set_umask)
+    target = tmp_path / "target.md"
+    assert write_if_changed(str(target), b"abc")
+    assert target.stat().st_mode & 0o777 == 0o666 & ~umask
+
+
+def test_write_if_changed_symlink(tmp_path):
+    """Test symbolic links are written through (i.e. kept as links)"""
+    (tmp_path / "docs").mkdir()
+    target = tmp_path / "docs" / "README.md"
+    target.write_bytes(b"abc")
+    link = tmp_path / "README.md"
+    link.symlink_to(os.path.join("docs", "README.md"))
+
+    assert write_if_changed(str(link), b"abd")
+    assert link.is_symlink()
+    assert target.read_bytes() == b"abd"
+    assert not write_if_changed(str(link), b"abd")
+    assert os.listdir(tmp_path / "docs") == ["README.md"]
@@ -0,0 +1,173 @@
+import os
+import statistics
+import threading
+import time
+
+import pytest
+
+from actiondocs import ActionDocs
+from actiondocs.watch import DEBOUNCE, POLL_INTERVAL, Watcher
+
+TEMPLATE = "# Title\n<!--doc_begin-->\n<!--doc_end-->\n"
+
+
+def _touch(path, content):
+    """Writes a file, making sure its mtime changes"""
+    mtime = os.stat(path).st_mtime_ns + 10**9 if os.path.exists(path) else None
+    path.write_text(content)
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def _watcher(tmp_path, target="README.md", **options):
+    action_file = tmp_path / "action.yml"
+    action_file.write_text("inputs:\n  in1:\n    description: |\n      a\n      b\n")
+    template_file = tmp_path / "README.md"
+    template_file.write_text(TEMPLATE)
+
+    ad = ActionDocs(
+        action_file=str(action_file),
+        template_file=str(template_file),
+        include_outputs=False,
+    )
+    options = {"interval": 0.01, "debounce": 0.01, **options}
+    return Watcher(ad, str(tmp_path / target), **options)
+
+
+def test_watch_check(tmp_path):
+    """Test only changed files are loaded again"""
+    watcher = _watcher(tmp_path)
+    ad = watcher.action_docs
+    watcher.render()
+    assert "|`in1`|" in (tmp_path / "README.md").read_text()
+
+    # Nothing changed (incl. the template, saved in-place)
+    assert not watcher.check()
+
+    # Action file changed, the template is kept
+    template = ad._template
+    _touch(
+        tmp_path / "action.yml",
+        "inputs:\n  in1:\n    description: |\n      a\n      b\n"
+        "  in2:\n    description: c\n",
+    )
+    assert watcher.check()
+    assert ad._template is template
+    assert "|`in2`|" in (tmp_path / "README.md").read_text()
+    assert (ad.cache.hits, ad.cache.misses) == (1, 1)
+
+    # Template changed, the action file is kept
+    action_config = ad.action_config
+    _touch(tmp_path / "README.md", "# New title\n<!--doc_begin-->\n<!--doc_end-->\n")
+    assert watcher.check()
+    assert ad.action_config is action_config
+    assert (tmp_path / "README.md").read_text().startswith("# New title\n")
+
+
+def test_watch_invalid(tmp_path):
+    """Test errors while rendering don't stop watching"""
+    watcher = _watcher(tmp_path, target="OUT.md")
+    watcher.render()
+    expected = (tmp_path / "OUT.md").read_text()
+
+    _touch(tmp_path / "action.yml", "inputs: [")
+    assert watcher.check()
+    assert (tmp_path / "OUT.md").read_text() == expected
+
+
+def test_watch_changed_while_rendering(tmp_path):
+    """Test files changed while rendering are rendered again"""
+    watcher = _watcher(tmp_path, target="OUT.md")
+    watcher.render()
+
+    ad = watcher.action_docs
+    save = ad.save
+
+    def save_then_edit(filename):
+        changed = save(filename)
+        _touch(tmp_path / "action.yml", "inputs:\n  in3:\n    description: c\n")
+        return changed
+
+    ad.save = save_then_edit
+    _touch(tmp_path / "action.yml", "inputs:\n  in2:\n    description: c\n")
+    assert watcher.check()
+    assert "|`in2`|" in (tmp_path / "OUT.md").read_text()
+
+    ad.save = save
+    assert watcher.check()
+    assert "|`in3`|" in (tmp_path / "OUT.md").read_text()
+
+
+def test_watch_burst(tmp_path):
+    """Test saves in a row (e.g. format-on-save) are rendered once"""
+    watcher = _watcher(tmp_path, target="OUT.md", debounce=0.2)
+    watcher.render()
+
+    def save():
+        for i in range(2, 5):
+            time.sleep(0.01)
+            _touch(tmp_path / "action.yml", f"inputs:\n  in{i}:\n    description: c\n")
+
+    _touch(tmp_path / "action.yml", "inputs:\n  in1:\n    description: c\n")
+    thread = threading.Thread(target=save)
+    thread.start()
+    try:
+        assert watcher.check()
+    finally:
+        thread.join(5)
+
+    assert watcher.renders == 2
+    assert "|`in4`|" in (tmp_path / "OUT.md").read_text()
+    assert not watcher.check()
+
+
+def test_watch_run(tmp_path):
+    """Test watching renders again on changes, until stopped"""
+    watcher = _watcher(tmp_path, target="OUT.md")
+    stop = threading.Event()
+    thread = threading.Thread(target=watcher.run, args=(stop,))
+    thread.start()
+    try:
+        while watcher.renders < 1:
+            stop.wait(0.01)
+        _touch(tmp_path / "action.yml", "inputs:\n  in2:\n    description: c\n")
+        while watcher.renders < 2:
+            stop.wait(0.01)
+    finally:
+        stop.set()
+        thread.join(5)
+
+    assert not thread.is_alive()
+    assert "|`in2`|" in (tmp_path / "OUT.md").read_text()
+
+
+@pytest.mark.skipif(
+    os.environ.get("ACTIONDOCS_TIMINGS") != "1",
+    reason="timings are only compared with ACTIONDOCS_TIMINGS=1",
+)
+def test_watch_latency(tmp_path):
+    """Test documents are written well within 100ms of a change"""
+    watcher = _watcher(
+        tmp_path, target="OUT.md", interval=POLL_INTERVAL, debounce=DEBOUNCE
+    )
+    out = tmp_path / "OUT.md"
+    stop = threading.Event()
+    thread = threading.Thread(target=watcher.run, args=(stop,))
+    thread.start()
+    latencies = []
+    try:
+        while watcher.renders < 1:
+            stop.wait(0.01)
+        for i in range(5):
+            _touch(tmp_path / "action.yml", f"inputs:\n  in{i}:\n    description: c\n")
+            start = time.perf_counter()
+            while f"|`in{i}`|" not in out.read_text():
+                assert time.perf_counter() - start < 5
+                time.sleep(0.001)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        stop.set()
+        thread.join(5)
+
+    print(f"Latency: {statistics.median(latencies) * 1e3:.1f}ms (median)")
+    assert statistics.median(latencies) < 0.1
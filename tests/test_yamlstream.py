@@ -0,0 +1,129 @@
+import pytest
+import yaml
+
+from actiondocs import ActionDocs
+from actiondocs.yamlstream import StreamingUnsupported, iter_section
+
+ACTION_YAMLS = [
+    # Sections in any order, any types of keys
+    "outputs:\n  out1:\n    description: |\n      a\n      b\n"
+    "inputs:\n  1: {description: one}\n  in2: {description: '*two*', default: 2}\n",
+    # Anchors (incl. of skipped nodes), merge keys, tags
+    "defs: [&d {description: shared, required: yes}]\n"
+    "inputs:\n  in1:\n    <<: *d\n    default: !!str 1.5\n  in2: *d\n",
+    # Empty (null) and missing sections
+    "name: Action\ninputs:\n",
+    "name: Action\n",
+]
+
+TEMPLATE = """Text before
+<!--doc_begin-->
+<!--doc_end-->
+<!--doc_begin:outputs heading_size=2-->
+<!--doc_end:outputs-->
+<!--doc_begin:other-->
+<!--doc_end:other-->
+Text after
+"""
+
+
+@pytest.mark.parametrize("action_yaml", ACTION_YAMLS)
+@pytest.mark.parametrize("loader_class", [yaml.SafeLoader, yaml.CSafeLoader])
+def test_iter_section(tmp_path, action_yaml, loader_class):
+    """Test sections are streamed as they're loaded"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text(action_yaml)
+    config = yaml.load(action_yaml, Loader=loader_class)
+
+    for section in ["inputs", "outputs"]:
+        items = iter_section(str(action_file), section, loader_class)
+        if section in config:
+            assert list(items) == list((config[section] or {}).items())
+        else:
+            assert items is None
+
+
+@pytest.mark.parametrize(
+    "action_yaml",
+    [
+        "",
+        "- inputs\n",
+        "inputs: &i\n  in1: {description: desc}\n",
+        "inputs:\n  <<: {in1: {description: desc}}\n",
+        "inputs:\n  in1: {description: a}\n  in1: {description: b}\n",
+        # (the last one being documented by a full load)
+        "inputs:\n  in1: {description: old}\nname: A\ninputs:\n  in2: {}\n",
+        "inputs:\nname: A\ninputs:\n  in2: {description: new}\n",
+    ],
+)
+def test_iter_section_unsupported(tmp_path, action_yaml):
+    """Test what can't be streamed is reported"""
+    action_file = tmp_path / "action.yml"
+    action_file.write_text(action_yaml)
+    with pytest.raises(StreamingUnsupported):
+        list(iter_section(str(action_file), "inputs", yaml.SafeLoader) or [])
+
+
+@pytest.mark.parametrize("action_yaml", ACTION_YAMLS[:3] + ["inputs: &i {}\n"])
+@pytest.mark.parametrize("fingerprint", [False, True])
+def test_save_streaming(tmp_path, monkeypatch, action_yaml, fingerprint):
+    """Test streamed documents are the same as generated ones"""
+    monkeypatch.setattr("actiondocs.main.STREAM_CHUNK_SIZE", 1)
+    (tmp_path / "action.yml").write_text(action_yaml)
+    (tmp_path / "README.md").write_text(TEMPLATE)
+
+    documents = []
+    for streaming in [False, True]:
+        ad = ActionDocs(
+            action_file=str(tmp_path / "action.yml"),
+            template_file=str(tmp_path / "README.md"),
+            fingerprint=fingerprint,
+            streaming=streaming,
+        )
+        target_file = tmp_path / f"README.{streaming}.md"
+        assert ad.save(str(target_file))
+        documents.append(target_file.read_text())
+        # The action configuration was never loaded (unless unsupported)
+        if streaming:
+            assert ad._action_config is None or "&i" in action_yaml
+
+    assert documents[0] == documents[1]
+
+
+def test_save_streaming_duplicate_key(tmp_path):
+    """Test a duplicated section is documented as when loaded (the last one)"""
+    action_yaml = (
+        "inputs:\n  in1: {description: old}\ninputs:\n  in1: {description: new}\n"
+    )
+    (tmp_path / "action.yml").write_text(action_yaml)
+    (tmp_path / "README.md").write_text(TEMPLATE)
+
+    documents = []
+    for streaming in [False, True]:
+        ad = ActionDocs(
+            action_file=str(tmp_path / "action.yml"),
+            template_file=str(tmp_path / "README.md"),
+            streaming=streaming,
+        )
+        target_file = tmp_path / f"README.{streaming}.md"
+        assert ad.save(str(target_file))
+        documents.append(target_file.read_text())
+
+    assert "|new|" in documents[1] and "|old|" not in documents[1]
+    assert documents[0] == documents[1]
+
+
+def test_save_streaming_memo(tmp_path):
+    """Test streamed descriptions aren't kept in memory (by the cache)"""
+    (tmp_path / "action.yml").write_text(ACTION_YAMLS[0])
+    (tmp_path / "README.md").write_text(TEMPLATE)
+
+    ad = ActionDocs(
+        action_file=str(tmp_path / "action.yml"),
+        template_file=str(tmp_path / "README.md"),
+        streaming=True,
+    )
+    ad.save(str(tmp_path / "README.md"))
+    # (converted again for the named block)
+    assert ad.cache.misses == 2
+    assert ad.cache._memo == {}